@@ -0,0 +1,311 @@
+import asyncio
+import contextlib
+import logging
+import os
+import aiohttp
+from aiohttp import web
+from llm_stream import DONE, parse_openai_sse_line, sse_event
+from prompt_assembly import assemble_context
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+
+
+class AsyncPipelineConfig:
+    """
+    Configuration for the asyncio request pipeline.
+    """
+    VECTARA_API_URL = os.getenv('VECTARA_API_URL', 'https://api.vectara.io')
+    VECTARA_API_KEY = os.getenv('VECTARA_API_KEY')
+    VECTARA_CUSTOMER_ID = os.getenv('VECTARA_CUSTOMER_ID')
+    VECTARA_CORPUS_ID = os.getenv('VECTARA_CORPUS_ID')
+    OPENAI_API_URL = os.getenv('OPENAI_API_URL', 'https://api.openai.com')
+    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+    OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4')
+    VECTARA_TIMEOUT = float(os.getenv('VECTARA_TIMEOUT', '30'))
+    LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', '60'))
+    HISTORY_TIMEOUT = float(os.getenv('HISTORY_TIMEOUT', '5'))
+    REQUEST_QUEUE_TIMEOUT = float(os.getenv('REQUEST_QUEUE_TIMEOUT', '10'))
+    MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', '256'))
+    MAX_CONCURRENT_VECTARA = int(os.getenv('MAX_CONCURRENT_VECTARA', '64'))
+    MAX_CONCURRENT_LLM = int(os.getenv('MAX_CONCURRENT_LLM', '32'))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '100'))
+    CHAT_HISTORY_ENABLED = os.getenv('CHAT_HISTORY_ENABLED', 'false').lower() == 'true'
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of pipeline configuration parameters.
+        """
+        return {name.lower(): getattr(cls, name) for name in dir(cls) if name.isupper()}
+
+
+async def query_vectara_async(session, query, config):
+    """
+    Queries Vectara with the provided query string over the shared session and returns the results.
+    """
+    headers = {
+        "x-api-key": config["vectara_api_key"],
+        "customer-id": config["vectara_customer_id"],
+        "Content-Type": "application/json",
+    }
+    payload = {
+        "customerId": config["vectara_customer_id"],
+        "corpusId": config["vectara_corpus_id"],
+        "query": query,
+        "page": 1,
+        "pageSize": 10
+    }
+    async with session.post(f"{config['vectara_api_url']}/v1/query", headers=headers, json=payload) as response:
+        if response.status == 200:
+            return (await response.json())['results']
+        logging.error(f"Error querying Vectara: {await response.text()}")
+        return []
+
+
+async def generate_response_with_openai_async(session, prompt, config):
+    """
+    Generates a completion for the prompt with the OpenAI chat completions API.
+    """
+    headers = {"Authorization": f"Bearer {config['openai_api_key']}"}
+    payload = {
+        "model": config["openai_model"],
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0
+    }
+    async with session.post(f"{config['openai_api_url']}/v1/chat/completions", headers=headers, json=payload) as response:
+        response.raise_for_status()
+        body = await response.json()
+        return body["choices"][0]["message"]["content"]
+
+
+async def insert_chat_history_async(db_pool, username, message, response):
+    """
+    Inserts a new chat record into the chat_history table through the asyncpg pool.
+    """
+    await db_pool.execute(
+        "INSERT INTO chat_history (timestamp, username, message, response) VALUES (NOW(), $1, $2, $3);",
+        username, message, response
+    )
+
+
+def results_to_text(vectara_results):
+    return assemble_context(vectara_results).text
+
+
+@contextlib.asynccontextmanager
+async def acquire_within(semaphore, timeout):
+    """
+    Holds the semaphore, waiting at most timeout seconds for it (asyncio.TimeoutError).
+    """
+    await asyncio.wait_for(semaphore.acquire(), timeout)
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+async def run_limited(semaphore, timeout, fn, *args):
+    """
+    Awaits fn(*args) under the semaphore; the timeout covers the wait for the semaphore too.
+    """
+    async def call():
+        async with semaphore:
+            return await fn(*args)
+    return await asyncio.wait_for(call(), timeout)
+
+
+async def generate_response(request):
+    app = request.app
+    config = app["config"]
+    try:
+        await asyncio.wait_for(app["request_limit"].acquire(), config["request_queue_timeout"])
+    except asyncio.TimeoutError:
+        logging.error("Timed out waiting for a request slot.")
+        return web.json_response({"error": "Server is busy, try again later."}, status=503)
+    try:
+        return await handle_generate_response(request)
+    finally:
+        app["request_limit"].release()
+
+
+async def handle_generate_response(request):
+    app = request.app
+    config = app["config"]
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        return web.json_response({"error": "Request body must be a JSON object."}, status=400)
+    vectara_query = data.get('query')
+    if not vectara_query:
+        return web.json_response({"error": "No query provided."}, status=400)
+    if data.get('stream'):
+        return await stream_generate_response(request, data)
+
+    try:
+        # Query Vectara
+        logging.info(f"Querying Vectara with query: '{vectara_query}'")
+        vectara_results = await run_limited(app["vectara_limit"], config["vectara_timeout"],
+                                            query_vectara_async, app["http"], vectara_query, config)
+        if not vectara_results:
+            logging.error("No results returned from Vectara. Check your query or configuration.")
+            return web.json_response({"error": "No results returned from Vectara."}, status=500)
+
+        # Prepare prompt for OpenAI based on Vectara results
+        prompt_for_openai = ("Based on the following qualities of great accommodations, generate a summary: "
+                             + results_to_text(vectara_results))
+
+        # Generate response using OpenAI
+        openai_response = await run_limited(app["llm_limit"], config["llm_timeout"],
+                                            generate_response_with_openai_async, app["http"], prompt_for_openai, config)
+    except asyncio.TimeoutError:
+        logging.error("Timed out waiting for an upstream service.")
+        return web.json_response({"error": "Upstream service timed out."}, status=504)
+    except Exception as e:
+        logging.exception("An error occurred:", exc_info=e)
+        return web.json_response({"error": "An internal error occurred."}, status=500)
+
+    schedule_history_write(app, data.get('username'), vectara_query, openai_response)
+    return web.json_response({"response": openai_response}, status=200)
+
+
+async def stream_generate_response(request, data):
+    """
+    Streams SSE events: "metadata" with the Vectara results, one "token" per LLM token, then
+    "done" (or "error"). If the client disconnects, the upstream LLM request is closed and
+    no chat history is written.
+    """
+    app = request.app
+    config = app["config"]
+    vectara_query = data['query']
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+    tokens = []
+    try:
+        vectara_results = await run_limited(app["vectara_limit"], config["vectara_timeout"],
+                                            query_vectara_async, app["http"], vectara_query, config)
+        if not vectara_results:
+            await response.write(sse_event("error", {"error": "No results returned from Vectara."}).encode())
+            return response
+        await response.write(sse_event("metadata", {"results": vectara_results}).encode())
+
+        prompt_for_openai = ("Based on the following qualities of great accommodations, generate a summary: "
+                             + results_to_text(vectara_results))
+        payload = {
+            "model": config["openai_model"],
+            "messages": [{"role": "user", "content": prompt_for_openai}],
+            "temperature": 0,
+            "stream": True
+        }
+        async with acquire_within(app["llm_limit"], config["llm_timeout"]):
+            async with app["http"].post(f"{config['openai_api_url']}/v1/chat/completions",
+                                        headers={"Authorization": f"Bearer {config['openai_api_key']}"},
+                                        json=payload,
+                                        timeout=aiohttp.ClientTimeout(sock_read=config["llm_timeout"])) as upstream:
+                upstream.raise_for_status()
+                async for line in upstream.content:
+                    token = parse_openai_sse_line(line)
+                    if token is DONE:
+                        break
+                    if token:
+                        tokens.append(token)
+                        await response.write(sse_event("token", {"token": token}).encode())
+    except ConnectionResetError:
+        # Leaving the upstream context manager closed the LLM connection.
+        logging.info("Client disconnected, cancelled upstream generation.")
+        return response
+    except asyncio.TimeoutError:
+        logging.error("Timed out waiting for an upstream service.")
+        await write_event_if_connected(response, "error", {"error": "Upstream service timed out."})
+        return response
+    except Exception as e:
+        logging.exception("An error occurred:", exc_info=e)
+        await write_event_if_connected(response, "error", {"error": "An internal error occurred."})
+        return response
+
+    openai_response = "".join(tokens)
+    if not await write_event_if_connected(response, "done", {"response": openai_response}):
+        return response
+    await response.write_eof()
+    schedule_history_write(app, data.get('username'), vectara_query, openai_response)
+    return response
+
+
+async def write_event_if_connected(response, event, data):
+    """
+    Writes one SSE event, returning False instead of raising if the client has disconnected.
+    """
+    try:
+        await response.write(sse_event(event, data).encode())
+        return True
+    except ConnectionResetError:
+        logging.info(f"Client disconnected before the {event} event was sent.")
+        return False
+
+
+def schedule_history_write(app, username, message, response):
+    """
+    Writes the chat turn in the background; pending writes are awaited on shutdown.
+    """
+    if app["db_pool"] is None or not username:
+        return
+    task = asyncio.create_task(asyncio.wait_for(
+        insert_chat_history_async(app["db_pool"], username, message, response),
+        app["config"]["history_timeout"]))
+    app["background_tasks"].add(task)
+    task.add_done_callback(_finish_history_write(app))
+
+
+def _finish_history_write(app):
+    def done(task):
+        app["background_tasks"].discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Failed to write chat history: {task.exception()}")
+    return done
+
+
+async def on_startup(app):
+    config = app["config"]
+    connector = aiohttp.TCPConnector(limit=config["http_pool_size"], keepalive_timeout=60)
+    app["http"] = aiohttp.ClientSession(connector=connector)
+    app["db_pool"] = None
+    if config["chat_history_enabled"]:
+        import asyncpg
+        from database.postgres.postgres_service import DatabaseConfig
+        db_config = DatabaseConfig.get_db_config()
+        app["db_pool"] = await asyncpg.create_pool(
+            host=db_config["host"], port=db_config["port"], database=db_config["dbname"],
+            user=db_config["user"], password=db_config["password"], ssl=db_config["sslmode"],
+            min_size=1, max_size=config["max_concurrent_requests"] // 8 or 1
+        )
+
+
+async def on_cleanup(app):
+    if app["background_tasks"]:
+        await asyncio.gather(*app["background_tasks"], return_exceptions=True)
+    await app["http"].close()
+    if app["db_pool"] is not None:
+        await app["db_pool"].close()
+
+
+def create_app(config=None):
+    """
+    Builds the aiohttp application serving the same /generate-response contract as main.py.
+    """
+    config = {**AsyncPipelineConfig.get_config(), **(config or {})}
+    app = web.Application()
+    app["config"] = config
+    app["request_limit"] = asyncio.Semaphore(config["max_concurrent_requests"])
+    app["vectara_limit"] = asyncio.Semaphore(config["max_concurrent_vectara"])
+    app["llm_limit"] = asyncio.Semaphore(config["max_concurrent_llm"])
+    app["background_tasks"] = set()
+    app.router.add_post('/generate-response', generate_response)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+if __name__ == '__main__':
+    web.run_app(create_app(), port=int(os.getenv('PORT', '5000')))
@@ -0,0 +1,68 @@
+"""
+Compares full-history reads with keyset pages, server-side streaming and the last-N fast path.
+
+Populates chat_history with a synthetic multi-million-row data set, so point the DB_*
+environment variables at a scratch database. Run from the backend directory:
+    python -m benchmarks.bench_chat_history_pagination --rows 2000000 --users 200
+"""
+import argparse
+import time
+import tracemalloc
+from database.postgres.postgres_service import DatabaseConfig, PostgresService
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} rows={count:<8} time={elapsed * 1000:9.1f} ms  peak={peak / 2**20:8.1f} MiB")
+
+
+def populate(service, rows, users):
+    service.execute_generic_query(
+        """
+        INSERT INTO chat_history (timestamp, username, message, response)
+        SELECT NOW() - (g || ' seconds')::interval, 'user_' || (g %% %s),
+               repeat('message ', 40), repeat('response ', 120)
+        FROM generate_series(1, %s) AS g;
+        """,
+        (users, rows)
+    )
+    service.execute_generic_query(
+        "CREATE INDEX IF NOT EXISTS ix_chat_history_username_timestamp_id ON chat_history (username, timestamp, id);"
+    )
+    service.execute_generic_query("ANALYZE chat_history;")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--skip-populate", action="store_true")
+    args = parser.parse_args()
+
+    service = PostgresService(DatabaseConfig.get_db_config())
+    if not args.skip_populate:
+        populate(service, args.rows, args.users)
+    username = "user_1"
+
+    measure("get_chat_history (full)", lambda: len(service.get_chat_history(username)))
+
+    def paged():
+        count, after = 0, None
+        while True:
+            rows, after = service.get_chat_history_page(username, limit=500, after=after)
+            count += len(rows)
+            if after is None:
+                return count
+
+    measure("keyset pages of 500", paged)
+    measure("server-side cursor stream", lambda: sum(1 for _ in service.iter_chat_history(username)))
+    measure("last 20 turns", lambda: len(service.get_recent_chat_history(username, turns=20)))
+
+
+if __name__ == "__main__":
+    main()
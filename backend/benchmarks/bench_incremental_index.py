@@ -0,0 +1,112 @@
+"""
+Reports full rebuild vs incremental update time of the persisted index after changing
+1% of the files in a synthetic data directory.
+
+The manifest scan (full hashing vs stat-only rescan) always runs. The index timings need
+llama_index; they use its MockEmbedding with a simulated per-call latency, so the numbers
+reflect how many embedding calls each path makes rather than a real model's speed.
+
+Run from the backend directory:
+    python -m benchmarks.bench_incremental_index --files 5000 --embed-latency 0.05
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from llm_censor.index_manifest import diff_manifests, scan_directory
+
+WORDS = ("invoice refund account billing customer ticket escalation priority agent policy "
+         "shipment warranty password login subscription renewal discount region support").split()
+
+
+def write_file(path, rng, paragraphs=6):
+    with open(path, "w") as f:
+        for _ in range(paragraphs):
+            f.write(" ".join(rng.choice(WORDS) for _ in range(80)) + "\n\n")
+
+
+def make_data_dir(data_dir, files, rng):
+    for number in range(files):
+        folder = os.path.join(data_dir, f"part-{number // 1000:03d}")
+        os.makedirs(folder, exist_ok=True)
+        write_file(os.path.join(folder, f"doc-{number:06d}.txt"), rng)
+
+
+def change_one_percent(data_dir, rng):
+    paths = sorted(os.path.join(root, name) for root, _, names in os.walk(data_dir) for name in names)
+    picked = rng.sample(paths, max(1, len(paths) // 100))
+    for position, path in enumerate(picked):
+        if position % 3 == 0:
+            os.remove(path)
+        elif position % 3 == 1:
+            write_file(path, rng)
+        else:
+            write_file(path.replace(".txt", "-new.txt"), rng)
+    return len(picked)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def bench_manifest(data_dir, rng):
+    full, full_seconds = timed(lambda: scan_directory(data_dir))
+    _, rescan_seconds = timed(lambda: scan_directory(data_dir, full))
+    changed = change_one_percent(data_dir, rng)
+    diff, diff_seconds = timed(lambda: diff_manifests(full, scan_directory(data_dir, full)))
+    print(f"manifest: full hash {full_seconds:.2f}s, unchanged rescan {rescan_seconds:.2f}s, "
+          f"rescan after changing {changed} files {diff_seconds:.2f}s -> {diff}")
+
+
+def bench_index(data_dir, persist_dir, rng, embed_latency, embed_batch_size):
+    try:
+        from llama_index.core import Settings
+        from llama_index.core.embeddings import MockEmbedding
+    except ImportError:
+        print("index: llama_index is not installed, skipping the rebuild vs incremental timings")
+        return
+    from llm_censor.censor_entity_service import create_and_persist_index
+
+    calls = {"count": 0}
+
+    class SlowMockEmbedding(MockEmbedding):
+        def _get_text_embeddings(self, texts):
+            calls["count"] += 1
+            time.sleep(embed_latency)
+            return super()._get_text_embeddings(texts)
+
+    Settings.embed_model = SlowMockEmbedding(embed_dim=384)
+    shutil.rmtree(persist_dir, ignore_errors=True)
+    _, rebuild_seconds = timed(lambda: create_and_persist_index(data_dir, persist_dir, embed_batch_size))
+    rebuild_calls, calls["count"] = calls["count"], 0
+    change_one_percent(data_dir, rng)
+    _, update_seconds = timed(lambda: create_and_persist_index(data_dir, persist_dir, embed_batch_size))
+    print(f"index: rebuild {rebuild_seconds:.1f}s ({rebuild_calls} embedding calls), "
+          f"incremental 1% update {update_seconds:.1f}s ({calls['count']} embedding calls), "
+          f"speedup {rebuild_seconds / update_seconds:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="Seconds per embedding call")
+    parser.add_argument("--embed-batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tmp = tempfile.mkdtemp()
+    try:
+        data_dir = os.path.join(tmp, "data")
+        make_data_dir(data_dir, args.files, rng)
+        bench_manifest(data_dir, rng)
+        bench_index(data_dir, os.path.join(tmp, "storage"), rng, args.embed_latency, args.embed_batch_size)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
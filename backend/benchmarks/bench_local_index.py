@@ -0,0 +1,91 @@
+"""
+Reports build time, query latency and recall@10 of the local vector index (flat vs IVF at
+several nprobe values) on synthetic clustered embeddings. Recall is measured against the
+exact flat search.
+
+Run from the backend directory:
+    python -m benchmarks.bench_local_index --sizes 100000 1000000 --dim 128
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from vectara.local_index import LocalVectorIndex
+
+
+def write_embeddings(path, count, dim, clusters, rng, block_rows=100000):
+    """
+    Writes clustered float32 embeddings to a .npy file block by block and memory-maps it.
+    """
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(count, dim))
+    for start in range(0, count, block_rows):
+        rows = min(block_rows, count - start)
+        vectors[start:start + rows] = (centers[rng.integers(clusters, size=rows)]
+                                       + 2.0 * rng.normal(size=(rows, dim)).astype(np.float32))
+    vectors.flush()
+    return np.load(path, mmap_mode="r")
+
+
+def latency_ms(index, queries, batch, **kwargs):
+    start = time.perf_counter()
+    for offset in range(0, len(queries), batch):
+        index.search(queries[offset:offset + batch], top_k=10, **kwargs)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def ids_of(index, rows):
+    return [{index.records[row] for row in query_rows if row >= 0} for query_rows in rows]
+
+
+def recall(found, truth):
+    return sum(len(f & t) for f, t in zip(found, truth)) / sum(len(t) for t in truth)
+
+
+def bench(tmp, count, dim, nlist, nprobes, queries_count, dtype, rng):
+    embeddings = write_embeddings(os.path.join(tmp, "embeddings.npy"), count, dim, 256, rng)
+    texts = [""] * count
+    queries = np.asarray(embeddings[rng.choice(count, queries_count, replace=False)]) \
+        + rng.normal(size=(queries_count, dim)).astype(np.float32)
+
+    start = time.perf_counter()
+    flat = LocalVectorIndex.build(os.path.join(tmp, "flat"), embeddings, texts, dtype=dtype)
+    flat_build = time.perf_counter() - start
+    start = time.perf_counter()
+    ivf = LocalVectorIndex.build(os.path.join(tmp, "ivf"), embeddings, texts, dtype=dtype, nlist=nlist)
+    ivf_build = time.perf_counter() - start
+
+    truth = ids_of(flat, flat.search(queries, top_k=10)[1])
+    print(f"{count} vectors x {dim} ({dtype}), build flat {flat_build:.1f}s, ivf (nlist={nlist}) {ivf_build:.1f}s")
+    print(f"  flat        : {latency_ms(flat, queries, 1):7.2f} ms/query single, "
+          f"{latency_ms(flat, queries, 64):7.2f} ms/query batched x64, recall@10 1.000")
+    for nprobe in nprobes:
+        found = ids_of(ivf, ivf.search(queries, top_k=10, nprobe=nprobe)[1])
+        print(f"  ivf nprobe={nprobe:<3}: {latency_ms(ivf, queries, 1, nprobe=nprobe):7.2f} ms/query single, "
+              f"{latency_ms(ivf, queries, 64, nprobe=nprobe):7.2f} ms/query batched x64, "
+              f"recall@10 {recall(found, truth):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--dtype", default="float16", choices=["float16", "float32"])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32, 64])
+    parser.add_argument("--queries", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for count in args.sizes:
+        tmp = tempfile.mkdtemp()
+        try:
+            nlist = int(4 * np.sqrt(count))
+            bench(tmp, count, args.dim, nlist, args.nprobe, args.queries, args.dtype, rng)
+        finally:
+            shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
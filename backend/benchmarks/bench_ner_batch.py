@@ -0,0 +1,62 @@
+"""
+Reports NER throughput (docs/sec) on a synthetic chat corpus: one nlp() call per text
+vs extract_entities_batch with 1 and N processes.
+
+Run from the backend directory (needs spaCy and the NER_MODEL model installed):
+    python -m benchmarks.bench_ner_batch --docs 5000 --processes 4
+"""
+import argparse
+import random
+import time
+from llm_censor import censor_entity_service as service
+
+NAMES = "Alice Johnson,Bob Smith,Carlos Diaz,Dana Lee,Emeka Obi,Fatima Khan,Grace Kim,Hiro Tanaka".split(",")
+PLACES = "Berlin,New York,Lagos,Madrid,Tokyo,Toronto,Mumbai,Sydney".split(",")
+COMPANIES = "Acme Corp,Globex,Initech,Umbrella,Vectara,Stark Industries".split(",")
+TEMPLATES = [
+    "{name} from {company} asked to move the {place} meeting to Friday.",
+    "Please send the invoice for {company} to {name} before the end of March.",
+    "{name} will fly to {place} next week to review the contract with {company}.",
+    "Can you remind {name} that the {place} office closes at 5pm on Monday?",
+]
+
+
+def make_corpus(docs, rng):
+    corpus = []
+    for _ in range(docs):
+        sentences = [rng.choice(TEMPLATES).format(name=rng.choice(NAMES), place=rng.choice(PLACES),
+                                                  company=rng.choice(COMPANIES)) for _ in range(rng.randint(1, 4))]
+        corpus.append(" ".join(sentences))
+    return corpus
+
+
+def timed(label, fn, docs):
+    start = time.perf_counter()
+    results = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {docs / elapsed:>10.0f} docs/sec")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs, random.Random(7))
+    print(f"Disabled components: {service.get_ner_pipeline()[1]}")
+    nlp = service.get_ner_pipeline()[0]
+    baseline = timed("nlp() per text (full pipeline)", lambda: [service.doc_entities(nlp(text)) for text in corpus],
+                     args.docs)
+    single = timed("batch, 1 process", lambda: service.extract_entities_batch(corpus, args.batch_size, 1), args.docs)
+    multi = timed(f"batch, {args.processes} processes",
+                  lambda: service.extract_entities_batch(corpus, args.batch_size, args.processes), args.docs)
+    assert single == multi, "batch results differ between 1 and N processes"
+    mismatches = sum(a != b for a, b in zip(baseline, single))
+    print(f"Documents whose entities differ from the full pipeline: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
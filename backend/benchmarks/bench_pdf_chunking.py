@@ -0,0 +1,95 @@
+"""
+Reports pages/sec and peak RSS of streaming PDF chunking (iter_pdf_documents) on
+synthetic PDFs of increasing size. Each size runs in a fresh process so peak RSS is
+per run; with streaming it should stay roughly flat as the page count grows.
+
+Run from the backend directory (needs pypdf):
+    python -m benchmarks.bench_pdf_chunking --pages 1000 4000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+WORDS = ("invoice refund account billing customer ticket escalation priority agent policy "
+         "shipment warranty password login subscription renewal discount region support").split()
+
+
+def write_synthetic_pdf(path, pages, lines_per_page=45):
+    """
+    Writes an uncompressed text PDF page by page, with a numbered section heading every
+    ten pages.
+    """
+    offsets = {}
+    with open(path, "wb") as f:
+        def obj(number, body):
+            offsets[number] = f.tell()
+            f.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        kids = []
+        for page in range(pages):
+            page_id, content_id = 4 + 2 * page, 5 + 2 * page
+            lines = []
+            if page % 10 == 0:
+                lines.append(f"{page // 10 + 1}. SECTION {page // 10 + 1}")
+                lines.append("")
+            for line in range(lines_per_page):
+                words = [WORDS[(page * 7 + line * 3 + i) % len(WORDS)] for i in range(12)]
+                lines.append(" ".join(words) + ("." if line % 5 == 4 else ""))
+                if line % 5 == 4:
+                    lines.append("")
+            stream = "BT /F1 9 Tf 40 800 Td 11 TL " + " ".join(f"({text}) '" for text in lines) + " ET"
+            obj(content_id, f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+            obj(page_id, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {content_id} 0 R "
+                         f"/Resources << /Font << /F1 3 0 R >> >> >>".encode())
+            kids.append(f"{page_id} 0 R")
+        obj(2, f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode())
+        xref = f.tell()
+        count = max(offsets) + 1
+        f.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode())
+        for number in range(1, count):
+            f.write(f"{offsets[number]:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def run_one(path, pages):
+    from vectara.pdf_chunker import iter_pdf_documents
+    start = time.perf_counter()
+    parts = chars = 0
+    for document in iter_pdf_documents([path]):
+        parts += 1
+        chars += len(document["content"])
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"pages": pages, "parts": parts, "chars": chars, "seconds": elapsed,
+                      "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument("--run-one", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_one:
+        run_one(args.run_one[0], int(args.run_one[1]))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = os.path.join(tmp, f"synthetic-{pages}.pdf")
+            write_synthetic_pdf(path, pages)
+            output = subprocess.run([sys.executable, "-m", "benchmarks.bench_pdf_chunking", "--run-one", path,
+                                     str(pages)], capture_output=True, text=True, check=True).stdout
+            result = json.loads(output)
+            print(f"{pages:>6} pages ({os.path.getsize(path) / 1e6:5.1f} MB PDF): {result['parts']:>6} parts, "
+                  f"{pages / result['seconds']:7.1f} pages/sec, peak RSS {result['peak_rss_mb']:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compares connect-per-call and pooled PostgresService round-trips.
+
+Uses the DB_* environment variables. Run from the backend directory:
+    python -m benchmarks.bench_postgres_pool --calls 500 --threads 8
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from database.postgres.postgres_service import DatabaseConfig, PostgresService
+
+
+def run(service, calls, threads):
+    latencies = []
+
+    def one_call(_):
+        start = time.perf_counter()
+        service.execute_generic_query("SELECT 1;")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(one_call, range(calls)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "calls_per_second": calls / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    db_config = DatabaseConfig.get_db_config()
+    print("connect-per-call:", run(PostgresService(db_config), args.calls, args.threads))
+
+    pool_config = {"min_size": 1, "max_size": args.threads, "timeout": 30.0, "max_idle": 300.0,
+                   "health_check_interval": 30.0}
+    pooled = PostgresService(db_config, pool_config)
+    try:
+        print("pooled:", run(pooled, args.calls, args.threads))
+        print("pool metrics:", pooled.pool_metrics())
+    finally:
+        pooled.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Reports prompt tokens and assembly time per request on a synthetic corpus.
+
+Each synthetic request returns --results passages, a share of which are near-duplicates
+of each other (the same passage with a few words changed), mimicking overlapping chunks.
+Run from the backend directory:
+    python -m benchmarks.bench_prompt_assembly --requests 500 --results 50
+"""
+import argparse
+import random
+import time
+from prompt_assembly import SnippetCache, assemble_context
+
+VOCABULARY = ("room clean staff friendly breakfast pool view quiet location parking wifi bed shower "
+              "spacious checkin checkout price value family pet restaurant bar gym spa beach city").split()
+
+
+def make_passage(rng, words=120):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def perturb(rng, passage, changes=3):
+    words = passage.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return " ".join(words)
+
+
+def make_request(rng, corpus, results, duplicate_share):
+    request = []
+    for _ in range(results):
+        passage = rng.choice(corpus)
+        if rng.random() < duplicate_share and request:
+            passage = perturb(rng, rng.choice(request)["text"])
+        request.append({"text": passage, "score": rng.random()})
+    return request
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--results", type=int, default=50)
+    parser.add_argument("--corpus", type=int, default=2000)
+    parser.add_argument("--duplicate-share", type=float, default=0.3)
+    parser.add_argument("--token-budget", type=int, default=3000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    corpus = [make_passage(rng) for _ in range(args.corpus)]
+    requests = [make_request(rng, corpus, args.results, args.duplicate_share) for _ in range(args.requests)]
+    cache = SnippetCache()
+
+    naive_tokens = sum(cache.count_tokens(" ".join(r["text"] for r in request)) for request in requests)
+    for label in ("cold cache", "warm cache"):
+        tokens = duplicates = 0
+        start = time.perf_counter()
+        for request in requests:
+            context = assemble_context(request, token_budget=args.token_budget, cache=cache)
+            tokens += context.tokens
+            duplicates += context.dropped_duplicates
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {elapsed / args.requests * 1000:.2f} ms/request, "
+              f"{tokens / args.requests:.0f} prompt tokens/request, {duplicates / args.requests:.1f} duplicates dropped")
+    print(f"naive join: {naive_tokens / args.requests:.0f} prompt tokens/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Reports redaction throughput in MB/s on a synthetic chat corpus with structured PII:
+the regex scan alone, and the full redact() with NER entity spans supplied (as
+censor_sensitive_information does after running spaCy).
+
+Run from the backend directory:
+    python -m benchmarks.bench_redaction --messages 20000 --terms 1000
+"""
+import argparse
+import random
+import re
+import time
+from llm_censor.redaction import RedactionEngine
+
+NAMES = "Alice Johnson,Bob Smith,Carlos Diaz,Dana Lee,Emeka Obi,Fatima Khan,Grace Kim,Hiro Tanaka".split(",")
+PLACES = "Berlin,New York,Lagos,Madrid,Tokyo,Toronto".split(",")
+TEMPLATES = [
+    "Hi {name}, please email {email} about the {place} invoice before Friday.",
+    "{name} called from +1 415-555-{four} and asked to update card 4111 1111 1111 1111.",
+    "Wire the refund to IBAN GB82 WEST 1234 5698 7654 32 for {name} in {place}.",
+    "The task for {name} is due on 2024-03-{day}; ticket id 1234567890{four}.",
+    "Meeting notes: {name} will present the {place} roadmap, 3 slides, 20 minutes.",
+]
+
+
+def make_corpus(messages, rng):
+    corpus = []
+    for _ in range(messages):
+        name = rng.choice(NAMES)
+        corpus.append(rng.choice(TEMPLATES).format(
+            name=name, place=rng.choice(PLACES), email=f"{name.split()[0].lower()}@example.com",
+            four=f"{rng.randint(0, 9999):04d}", day=f"{rng.randint(1, 28):02d}"))
+    return corpus
+
+
+def entity_spans(text):
+    spans = [(m.start(), m.end(), "PERSON") for m in re.finditer("|".join(NAMES), text)]
+    spans += [(m.start(), m.end(), "GPE") for m in re.finditer("|".join(PLACES), text)]
+    return spans
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--terms", type=int, default=1000, help="custom terms compiled into the scan")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    corpus = make_corpus(args.messages, rng)
+    megabytes = sum(len(text.encode()) for text in corpus) / 1e6
+    spans = [entity_spans(text) for text in corpus]
+    terms = {f"customer-{i:05d}": "CUSTOMER" for i in range(args.terms)}
+
+    for label, engine in [("no custom terms", RedactionEngine()), (f"{args.terms} custom terms", RedactionEngine(terms=terms))]:
+        start = time.perf_counter()
+        for text in corpus:
+            engine.find_pii(text)
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        for text, text_spans in zip(corpus, spans):
+            engine.redact(text, text_spans)
+        full = time.perf_counter() - start
+        print(f"{label:<20} regex scan {megabytes / scan:6.1f} MB/s   redact with NER spans {megabytes / full:6.1f} MB/s")
+    print(f"Corpus: {args.messages} messages, {megabytes:.2f} MB")
+    print(f"Example: {RedactionEngine().redact(corpus[1], spans[1]).text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Reports schema prompt size and prompt build time, full JSON schema vs relevance-pruned
+context, on a synthetic 500-table SQLite schema with foreign keys.
+
+LLM generation latency grows with prompt tokens, so the token reduction is the main
+latency win; the build time shows what the retrieval stage adds per SQL generation.
+Run from the backend directory:
+    python -m benchmarks.bench_schema_retrieval --tables 500
+"""
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from sqlalchemy import create_engine, text
+from sql_agent.schema_catalog import SchemaCatalog
+from sql_agent.schema_retrieval import build_schema_context
+
+ENTITIES = ("customer order invoice payment product shipment warehouse supplier employee task project "
+            "ticket refund discount campaign region store account contract subscription review").split()
+ATTRIBUTES = ("name status amount created updated due priority owner email phone address city country "
+              "quantity price total notes description category rating balance start end").split()
+
+
+def approximate_tokens(prompt):
+    return len(re.findall(r"\w+|[^\w\s]", prompt))
+
+
+def create_schema(engine, tables, rng):
+    names = []
+    with engine.begin() as connection:
+        for i in range(tables):
+            name = f"{rng.choice(ENTITIES)}_{rng.choice(ENTITIES)}_{i}"
+            columns = [f"{attribute} VARCHAR(64)" for attribute in rng.sample(ATTRIBUTES, 10)]
+            if names:
+                parent = rng.choice(names)
+                columns.append(f"{parent}_id INTEGER REFERENCES {parent}(id)")
+            connection.execute(text(f"CREATE TABLE {name} (id INTEGER PRIMARY KEY, {', '.join(columns)})"))
+            names.append(name)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    tmp = tempfile.TemporaryDirectory()
+    url = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+    engine = create_engine(url)
+    create_schema(engine, args.tables, rng)
+    catalog = SchemaCatalog(url, ttl=3600, engine=engine)
+    catalog.get_schema()
+
+    questions = [f"show the {rng.choice(ATTRIBUTES)} of every {rng.choice(ENTITIES)} with {rng.choice(ATTRIBUTES)} "
+                 f"above 100 for {rng.choice(ENTITIES)}s" for _ in range(args.questions)]
+
+    start = time.perf_counter()
+    full_tokens = sum(approximate_tokens(json.dumps(catalog.get_schema(), indent=2)) for _ in questions)
+    full_time = time.perf_counter() - start
+
+    build_schema_context(questions[0], catalog)  # builds the index once
+    start = time.perf_counter()
+    pruned_tokens = sum(approximate_tokens(build_schema_context(question, catalog)) for question in questions)
+    pruned_time = time.perf_counter() - start
+
+    n = len(questions)
+    print(f"full JSON schema: {full_tokens / n:.0f} tokens/prompt, {full_time / n * 1000:.2f} ms/prompt")
+    print(f"pruned schema:    {pruned_tokens / n:.0f} tokens/prompt, {pruned_time / n * 1000:.2f} ms/prompt")
+    print(f"reduction: {100 * (1 - pruned_tokens / full_tokens):.1f}%")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares per-call requests.post with the pooled VectaraClient against a local keep-alive stub.
+
+The stub is plain HTTP, so the difference shown is TCP connection setup only; against
+api.vectara.io the per-call path also pays a TLS handshake. Run from the backend directory:
+    python -m benchmarks.bench_vectara_client --calls 2000
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from vectara.vectara_client import VectaraClient
+
+
+class StubQueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps({"results": [{"text": "Clean rooms."}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def percentiles(latencies):
+    latencies.sort()
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubQueryHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    headers = {"x-api-key": "stub", "customer-id": "1", "Content-Type": "application/json"}
+
+    latencies = []
+    for i in range(args.calls):
+        start = time.perf_counter()
+        payload = {"customerId": "1", "corpusId": "2", "query": f"q{i}", "page": 1, "pageSize": 10}
+        requests.post(f"{url}/v1/query", headers=headers, data=json.dumps(payload), timeout=250).json()
+        latencies.append(time.perf_counter() - start)
+    print("per-call requests.post:", percentiles(latencies))
+
+    client = VectaraClient("stub", "1", "2", api_url=url)
+    latencies = []
+    for i in range(args.calls):
+        start = time.perf_counter()
+        client.query(f"q{i}")
+        latencies.append(time.perf_counter() - start)
+    print("pooled VectaraClient:  ", percentiles(latencies))
+    print("client histograms:", client.metrics())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Load test for the /generate-response pipeline against local Vectara and OpenAI stub servers.
+
+Starts both stubs (with configurable latency) and the async app in-process, then fires
+--requests requests with --concurrency in flight and reports requests/sec and latency
+percentiles. For comparison, the same load is then sent to a sync baseline: a threaded
+HTTP server running the same pipeline with blocking requests calls, limited to
+--sync-workers concurrent requests like a sync deployment with that many worker threads
+(0 skips it). Run from the backend directory:
+    python -m benchmarks.load_test_async --requests 2000 --concurrency 200 --sync-workers 16
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import aiohttp
+import requests
+from aiohttp import web
+from requests.adapters import HTTPAdapter
+from async_main import create_app
+from prompt_assembly import assemble_context
+
+
+def make_stub_app(vectara_delay, llm_delay):
+    async def vectara_query(request):
+        await asyncio.sleep(vectara_delay)
+        return web.json_response({"results": [{"text": "Clean rooms."}, {"text": "Friendly staff."}]})
+
+    async def chat_completions(request):
+        await asyncio.sleep(llm_delay)
+        return web.json_response({"choices": [{"message": {"content": "Guests value clean rooms."}}]})
+
+    app = web.Application()
+    app.router.add_post('/v1/query', vectara_query)
+    app.router.add_post('/v1/chat/completions', chat_completions)
+    return app
+
+
+def start_sync_server(stub_url, port, workers):
+    """
+    Serves /generate-response with the blocking pipeline, at most workers requests at a time.
+    """
+    worker_slots = threading.BoundedSemaphore(workers)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+
+    class SyncPipelineHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["query"]
+            with worker_slots:
+                try:
+                    vectara = session.post(f"{stub_url}/v1/query", json={"query": query}, timeout=30)
+                    vectara.raise_for_status()
+                    prompt = ("Based on the following qualities of great accommodations, generate a summary: "
+                              + assemble_context(vectara.json()["results"]).text)
+                    completion = session.post(f"{stub_url}/v1/chat/completions", timeout=60,
+                                              json={"messages": [{"role": "user", "content": prompt}]})
+                    completion.raise_for_status()
+                    status = 200
+                    body = {"response": completion.json()["choices"][0]["message"]["content"]}
+                except (requests.RequestException, KeyError, ValueError) as e:
+                    status, body = 500, {"error": str(e)}
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), SyncPipelineHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def start(app, port):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    return runner
+
+
+async def run_load(url, total, concurrency):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                async with session.post(url, json={"query": f"question {i}"}) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests_per_second": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p99_ms": round(latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000, 1),
+        "errors": errors,
+    }
+
+
+async def main(args):
+    stub = await start(make_stub_app(args.vectara_delay, args.llm_delay), args.stub_port)
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    app = create_app({
+        "vectara_api_url": stub_url,
+        "openai_api_url": stub_url,
+        "vectara_api_key": "stub",
+        "vectara_customer_id": "stub",
+        "vectara_corpus_id": "stub",
+        "openai_api_key": "stub",
+        "chat_history_enabled": False,
+    })
+    runner = await start(app, args.app_port)
+    sync_server = start_sync_server(stub_url, args.sync_port, args.sync_workers) if args.sync_workers else None
+    try:
+        print("stubs listening on", stub_url)
+        print("async:", await run_load(f"http://127.0.0.1:{args.app_port}/generate-response",
+                                       args.requests, args.concurrency))
+        if sync_server is not None:
+            print(f"sync ({args.sync_workers} workers):",
+                  await run_load(f"http://127.0.0.1:{args.sync_port}/generate-response",
+                                 args.requests, args.concurrency))
+    finally:
+        if sync_server is not None:
+            sync_server.shutdown()
+        await runner.cleanup()
+        await stub.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--vectara-delay", type=float, default=0.2)
+    parser.add_argument("--llm-delay", type=float, default=0.5)
+    parser.add_argument("--stub-port", type=int, default=8081)
+    parser.add_argument("--app-port", type=int, default=8080)
+    parser.add_argument("--sync-port", type=int, default=8082)
+    parser.add_argument("--sync-workers", type=int, default=16, help="Sync baseline workers (0 to skip)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,6 @@
+-- Composite index for keyset-paginated chat history reads:
+--   WHERE username = ? AND (timestamp, id) > (?, ?) ORDER BY timestamp, id
+--   WHERE username = ? ORDER BY timestamp DESC, id DESC LIMIT ?
+-- CONCURRENTLY avoids locking chat_history for writes; run it outside a transaction.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chat_history_username_timestamp_id
+    ON chat_history (username, timestamp, id);
@@ -1,6 +1,6 @@
 from datetime import datetime
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from src.config import DATABASE_URL
@@ -37,6 +37,11 @@ class ChatHistory(Base):
     response = Column(String, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    # Serves keyset pagination and "last N turns" lookups (see migrations/001_chat_history_keyset_index.sql)
+    __table_args__ = (
+        Index('ix_chat_history_username_timestamp_id', 'username', 'timestamp', 'id'),
+    )
+
     def __repr__(self):
         return f"<ChatHistory(username='{self.username}', message='{self.message}', response='{self.response}', timestamp='{self.timestamp}')>"
 
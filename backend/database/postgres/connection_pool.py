@@ -0,0 +1,254 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """
+    Raised when no connection could be checked out within the pool timeout.
+    """
+
+
+class PoolMetrics:
+    """
+    Thread-safe counters describing how a ConnectionPool is being used.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all counters and restarts the checkouts-per-second window.
+        """
+        with self._lock:
+            self.started_at = time.monotonic()
+            self.checkouts = 0
+            self.in_use = 0
+            self.max_in_use = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.timeouts = 0
+            self.connections_opened = 0
+            self.connections_closed = 0
+            self.failed_health_checks = 0
+
+    def record_checkout(self, wait):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_checkin(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def record(self, counter, amount=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def snapshot(self):
+        """
+        Returns a dictionary with the current pool metrics.
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started_at, 1e-9)
+            return {
+                "checkouts": self.checkouts,
+                "checkouts_per_second": self.checkouts / elapsed,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "avg_wait_ms": (self.total_wait / self.checkouts * 1000) if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+                "timeouts": self.timeouts,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "failed_health_checks": self.failed_health_checks,
+            }
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of long-lived DB-API connections.
+
+    Connections are created with the given ``connect`` callable, health checked on
+    checkout when they have been idle for longer than ``health_check_interval``,
+    evicted after ``max_idle`` seconds without use (never below ``min_size``) and
+    transparently replaced when they turn out to be broken.
+    """
+    def __init__(self, connect, min_size=1, max_size=10, timeout=30.0, max_idle=300.0,
+                 health_check_interval=30.0):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool bounds: min_size={min_size}, max_size={max_size}")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self.metrics = PoolMetrics()
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, last_used) pairs, most recently used on the right
+        self._size = 0
+        self._closed = False
+
+        for _ in range(min_size):
+            self._idle.append((self._open(), time.monotonic()))
+            self._size += 1
+
+    def _open(self):
+        conn = self._connect()
+        self.metrics.record("connections_opened")
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception as e:
+            logging.warning(f"Error closing pooled connection: {e}")
+        self.metrics.record("connections_closed")
+
+    @staticmethod
+    def _is_healthy(conn):
+        """
+        Cheap liveness probe: checks the closed flag and runs ``SELECT 1``.
+        """
+        if getattr(conn, "closed", False):
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+                cursor.fetchone()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle(self):
+        """
+        Closes connections idle for longer than ``max_idle``. Must be called with the lock held.
+        """
+        now = time.monotonic()
+        evicted = []
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.max_idle:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            evicted.append(conn)
+        return evicted
+
+    def getconn(self):
+        """
+        Checks out a healthy connection, waiting up to ``timeout`` seconds if the pool is exhausted.
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            conn, last_used, create = None, None, False
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                evicted = self._evict_idle()
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.metrics.record("timeouts")
+                        raise PoolTimeout(f"No connection available within {self.timeout}s")
+                    self._cond.wait(remaining)
+                    if self._closed:
+                        raise PoolTimeout("Connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                else:
+                    self._size += 1
+                    create = True
+            for stale in evicted:
+                self._close(stale)
+
+            if create:
+                try:
+                    conn = self._open()
+                except Exception:
+                    self._release_slot()
+                    raise
+            elif time.monotonic() - last_used > self.health_check_interval and not self._is_healthy(conn):
+                # Broken connection (server restart, network blip): drop it and reconnect.
+                self.metrics.record("failed_health_checks")
+                self._close(conn)
+                self._release_slot()
+                continue
+
+            self.metrics.record_checkout(time.monotonic() - start)
+            return conn
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def putconn(self, conn, discard=False):
+        """
+        Returns a connection to the pool. Broken or discarded connections are closed instead.
+        """
+        self.metrics.record_checkin()
+        if not discard and not getattr(conn, "closed", False):
+            try:
+                # Never hand out a connection with an open transaction.
+                conn.rollback()
+            except Exception:
+                discard = True
+        else:
+            discard = True
+
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if discard or self._closed:
+            self._close(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks a connection out and always returns it, also when a
+        generator using it is closed early (GeneratorExit) or the thread is interrupted.
+        """
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+        except Exception:
+            # Only an error can leave the connection broken; putconn rolls back the rest.
+            discard = getattr(conn, "closed", False)
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def close(self):
+        """
+        Closes all idle connections; checked-out connections are closed when returned.
+        """
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._size -= len(idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn in idle:
+            self._close(conn)
+
+    @property
+    def size(self):
+        with self._cond:
+            return self._size
+
+    @property
+    def idle_count(self):
+        with self._cond:
+            return len(self._idle)
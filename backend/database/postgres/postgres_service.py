@@ -1,6 +1,12 @@
 import os
 import psycopg2
-from contextlib import closing
+from datetime import datetime
+from psycopg2.extras import execute_values
+from contextlib import closing, contextmanager
+from functools import partial
+from uuid import uuid4
+from database.postgres.connection_pool import ConnectionPool
+from database.write_behind import WriteBehindBuffer
 
 class DatabaseConfig:
     """
@@ -12,6 +18,12 @@ class DatabaseConfig:
     DB_USER = os.getenv('DB_USER')
     DB_PASSWORD = os.getenv('DB_PASSWORD')
     DB_SSLMODE = os.getenv('DB_SSLMODE')
+    DB_POOL_ENABLED = os.getenv('DB_POOL_ENABLED', 'false').lower() == 'true'
+    DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+    DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', '300'))
+    DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', '30'))
 
     @classmethod
     def get_db_config(cls):
@@ -27,12 +39,37 @@ class DatabaseConfig:
             "sslmode": cls.DB_SSLMODE
         }
 
+    @classmethod
+    def get_pool_config(cls):
+        """
+        Returns a dictionary of connection pool parameters, or None if pooling is disabled.
+        """
+        if not cls.DB_POOL_ENABLED:
+            return None
+        return {
+            "min_size": cls.DB_POOL_MIN_SIZE,
+            "max_size": cls.DB_POOL_MAX_SIZE,
+            "timeout": cls.DB_POOL_TIMEOUT,
+            "max_idle": cls.DB_POOL_MAX_IDLE,
+            "health_check_interval": cls.DB_POOL_HEALTH_CHECK_INTERVAL
+        }
+
 class PostgresService:
-    def __init__(self, db_config):
+    def __init__(self, db_config, pool_config=None, write_behind_config=None):
         """
         Initialize the PostgresService with database configuration.
+        If pool_config is given (see DatabaseConfig.get_pool_config), connections are
+        taken from a long-lived pool instead of being opened per call.
+        If write_behind_config is given (see WriteBehindConfig.get_config), chat history
+        inserts are buffered and written in batches off the request path.
         """
         self.db_config = db_config
+        self.pool = None
+        if pool_config:
+            self.pool = ConnectionPool(partial(psycopg2.connect, **db_config), **pool_config)
+        self.write_buffer = None
+        if write_behind_config:
+            self.write_buffer = WriteBehindBuffer(self.insert_chat_history_batch, **write_behind_config)
 
     def get_db_connection(self):
         """
@@ -45,34 +82,146 @@ class PostgresService:
             print(f"Unable to connect to the database: {e}")
             return None
 
+    @contextmanager
+    def connection(self):
+        """
+        Yields a connection from the pool in pooled mode, or a fresh one that is closed afterwards.
+        """
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                yield conn
+        else:
+            with closing(self.get_db_connection()) as conn:
+                yield conn
+
+    def pool_metrics(self):
+        """
+        Returns the connection pool metrics, or None when pooling is disabled.
+        """
+        return self.pool.metrics.snapshot() if self.pool is not None else None
+
+    def close(self):
+        """
+        Flushes buffered chat history and closes the connection pool, if any.
+        """
+        if self.write_buffer is not None:
+            self.write_buffer.close()
+        if self.pool is not None:
+            self.pool.close()
+
     def insert_chat_history(self, username, message, response):
         """
         Inserts a new chat record into the chat_history table.
+        In write-behind mode the record is only enqueued and written by the next batch flush.
         """
+        if self.write_buffer is not None:
+            self.write_buffer.enqueue((datetime.now(), username, message, response))
+            return
         query = """
         INSERT INTO chat_history (timestamp, username, message, response)
         VALUES (NOW(), %s, %s, %s);
         """
-        with closing(self.get_db_connection()) as conn:
+        with self.connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(query, (username, message, response))
                 conn.commit()
 
+    def insert_chat_history_batch(self, rows):
+        """
+        Inserts many (timestamp, username, message, response) rows with a single multi-row INSERT.
+        """
+        query = "INSERT INTO chat_history (timestamp, username, message, response) VALUES %s;"
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(cursor, query, rows, page_size=len(rows))
+                conn.commit()
+
+    def write_behind_metrics(self):
+        """
+        Returns the write-behind buffer metrics, or None when it is disabled.
+        """
+        return self.write_buffer.metrics() if self.write_buffer is not None else None
+
     def get_chat_history(self, username):
         """
         Retrieves chat history for a specific user.
         """
         query = "SELECT * FROM chat_history WHERE username = %s;"
-        with closing(self.get_db_connection()) as conn:
+        with self.connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(query, (username,))
                 return cursor.fetchall()  # Returns a list of tuples
 
+    def get_chat_history_page(self, username, limit=100, after=None):
+        """
+        Retrieves one page of a user's chat history in chronological order using keyset pagination.
+
+        Args:
+            username (str): The username of the user.
+            limit (int): Maximum number of rows to return.
+            after (tuple, optional): The (timestamp, id) cursor returned with the previous page.
+
+        Returns:
+            tuple: (rows, next_cursor), where next_cursor is None once the history is exhausted.
+        """
+        columns = "id, timestamp, username, message, response"
+        if after is None:
+            query = f"""
+            SELECT {columns} FROM chat_history
+            WHERE username = %s
+            ORDER BY timestamp, id LIMIT %s;
+            """
+            params = (username, limit)
+        else:
+            query = f"""
+            SELECT {columns} FROM chat_history
+            WHERE username = %s AND (timestamp, id) > (%s, %s)
+            ORDER BY timestamp, id LIMIT %s;
+            """
+            params = (username, after[0], after[1], limit)
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+        next_cursor = (rows[-1][1], rows[-1][0]) if len(rows) == limit else None
+        return rows, next_cursor
+
+    def iter_chat_history(self, username, batch_size=1000):
+        """
+        Streams a user's chat history in chronological order through a server-side cursor,
+        holding at most batch_size rows in memory at a time.
+        """
+        query = """
+        SELECT id, timestamp, username, message, response FROM chat_history
+        WHERE username = %s ORDER BY timestamp, id;
+        """
+        with self.connection() as conn:
+            with conn.cursor(name=f"chat_history_{uuid4().hex}") as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(query, (username,))
+                for row in cursor:
+                    yield row
+
+    def get_recent_chat_history(self, username, turns=10):
+        """
+        Retrieves the last N chat turns of a user, oldest first, for building chat context.
+        """
+        query = """
+        SELECT id, timestamp, username, message, response FROM chat_history
+        WHERE username = %s ORDER BY timestamp DESC, id DESC LIMIT %s;
+        """
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, (username, turns))
+                rows = cursor.fetchall()
+        rows.reverse()
+        return rows
+
     def execute_generic_query(self, query, params=None):
         """
         Executes a generic SQL query.
         """
-        with closing(self.get_db_connection()) as conn:
+        with self.connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(query, params or ())
                 if query.strip().upper().startswith("SELECT"):
@@ -1,5 +1,7 @@
 import os
+from datetime import datetime
 from supabase import create_client, Client
+from database.write_behind import WriteBehindBuffer
 
 class SupabaseConfig:
     """
@@ -19,22 +21,83 @@ class SupabaseConfig:
         return supabase
 
 class SupabaseService:
-    def __init__(self, supabase_client: Client):
+    def __init__(self, supabase_client: Client, write_behind_config=None):
         """
         Initialize the SupabaseService with a Supabase client.
+        If write_behind_config is given (see WriteBehindConfig.get_config), chat history
+        inserts are buffered and sent as bulk inserts off the request path.
         """
         self.supabase = supabase_client
+        self.write_buffer = None
+        if write_behind_config:
+            self.write_buffer = WriteBehindBuffer(self.insert_chat_history_batch, **write_behind_config)
 
     def insert_chat_history(self, username, message, response):
         """
         Inserts a new chat record into the chat_history table.
+        In write-behind mode the record is only enqueued and written by the next batch flush.
         """
         data = {"username": username, "message": message, "response": response}
+        if self.write_buffer is not None:
+            data["timestamp"] = datetime.now().isoformat()
+            self.write_buffer.enqueue(data)
+            return
         self.supabase.table("chat_history").insert(data).execute()
 
+    def insert_chat_history_batch(self, rows):
+        """
+        Inserts many chat records with a single bulk insert request.
+        """
+        self.supabase.table("chat_history").insert(rows).execute()
+
+    def write_behind_metrics(self):
+        """
+        Returns the write-behind buffer metrics, or None when it is disabled.
+        """
+        return self.write_buffer.metrics() if self.write_buffer is not None else None
+
+    def close(self):
+        """
+        Flushes buffered chat history.
+        """
+        if self.write_buffer is not None:
+            self.write_buffer.close()
+
     def get_chat_history(self, username):
         """
         Retrieves chat history for a specific user.
         """
         return self.supabase.table("chat_history").select("*").eq("username", username).execute()
 
+    def get_chat_history_page(self, username, limit=100, after=None):
+        """
+        Retrieves one page of a user's chat history in chronological order using keyset pagination.
+        Returns (rows, next_cursor), where next_cursor is None once the history is exhausted.
+        """
+        query = self.supabase.table("chat_history").select("*").eq("username", username)
+        if after is not None:
+            timestamp, row_id = after
+            query = query.or_(f"timestamp.gt.{timestamp},and(timestamp.eq.{timestamp},id.gt.{row_id})")
+        rows = query.order("timestamp").order("id").limit(limit).execute().data
+        next_cursor = (rows[-1]["timestamp"], rows[-1]["id"]) if len(rows) == limit else None
+        return rows, next_cursor
+
+    def iter_chat_history(self, username, batch_size=1000):
+        """
+        Yields a user's chat history in chronological order, one page at a time.
+        """
+        after = None
+        while True:
+            rows, after = self.get_chat_history_page(username, limit=batch_size, after=after)
+            yield from rows
+            if after is None:
+                return
+
+    def get_recent_chat_history(self, username, turns=10):
+        """
+        Retrieves the last N chat turns of a user, oldest first, for building chat context.
+        """
+        rows = (self.supabase.table("chat_history").select("*").eq("username", username)
+                .order("timestamp", desc=True).order("id", desc=True).limit(turns).execute().data)
+        rows.reverse()
+        return rows
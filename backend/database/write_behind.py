@@ -0,0 +1,184 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+
+class BufferFull(Exception):
+    """
+    Raised when a row cannot be enqueued because the buffer stayed full for too long.
+    """
+
+
+class WriteBehindConfig:
+    """
+    Configuration for write-behind chat history ingestion.
+    """
+    ENABLED = os.getenv('CHAT_HISTORY_WRITE_BEHIND', 'false').lower() == 'true'
+    MAX_BATCH_SIZE = int(os.getenv('CHAT_HISTORY_BATCH_SIZE', '500'))
+    FLUSH_INTERVAL = float(os.getenv('CHAT_HISTORY_FLUSH_INTERVAL', '1.0'))
+    MAX_PENDING = int(os.getenv('CHAT_HISTORY_MAX_PENDING', '10000'))
+    ENQUEUE_TIMEOUT = float(os.getenv('CHAT_HISTORY_ENQUEUE_TIMEOUT', '5.0'))
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of write-behind buffer parameters, or None if it is disabled.
+        """
+        if not cls.ENABLED:
+            return None
+        return {
+            "max_batch_size": cls.MAX_BATCH_SIZE,
+            "flush_interval": cls.FLUSH_INTERVAL,
+            "max_pending": cls.MAX_PENDING,
+            "enqueue_timeout": cls.ENQUEUE_TIMEOUT
+        }
+
+
+class WriteBehindBuffer:
+    """
+    Bounded in-memory buffer that hands rows to ``flush_fn`` in batches from a background thread.
+
+    A batch is flushed as soon as ``max_batch_size`` rows are pending or ``flush_interval``
+    seconds after the previous flush, whichever comes first. When ``max_pending`` rows are
+    already waiting, ``enqueue`` blocks for up to ``enqueue_timeout`` seconds (backpressure)
+    and then raises BufferFull. Pending rows are flushed on ``close()`` and at interpreter exit.
+    """
+    def __init__(self, flush_fn, max_batch_size=500, flush_interval=1.0, max_pending=10000,
+                 enqueue_timeout=5.0, max_retries=3, retry_backoff=0.5):
+        self.flush_fn = flush_fn
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._pending = deque()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flush_requested = False
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "flushes": 0,
+            "rows_written": 0,
+            "rows_failed": 0,
+            "last_flush_rows": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+            "backpressure_waits": 0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def enqueue(self, row):
+        """
+        Adds a row to the buffer, blocking while the buffer is full.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Write-behind buffer is closed")
+            if len(self._pending) >= self.max_pending:
+                self._record(backpressure_waits=1)
+                if not self._cond.wait_for(lambda: len(self._pending) < self.max_pending or self._closed,
+                                           self.enqueue_timeout):
+                    raise BufferFull(f"{len(self._pending)} rows pending after {self.enqueue_timeout}s")
+                if self._closed:
+                    raise RuntimeError("Write-behind buffer is closed")
+            self._pending.append(row)
+            if len(self._pending) >= self.max_batch_size:
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Flushes all pending rows now and waits until they are written.
+        Returns False if the timeout expired first.
+        """
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    def close(self, timeout=30.0):
+        """
+        Stops accepting rows, flushes everything pending and stops the background thread.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_interval
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self._pending) >= self.max_batch_size or self._closed
+                    or self._flush_requested or (self._pending and time.monotonic() >= next_flush),
+                    max(next_flush - time.monotonic(), 0.001)
+                )
+                if not self._pending:
+                    self._flush_requested = False
+                    self._cond.notify_all()
+                    if self._closed:
+                        return
+                    next_flush = time.monotonic() + self.flush_interval
+                    continue
+                batch = [self._pending.popleft() for _ in range(min(self.max_batch_size, len(self._pending)))]
+                self._in_flight = len(batch)
+                # Rows left the buffer, wake up producers blocked on backpressure.
+                self._cond.notify_all()
+
+            self._write(batch)
+            next_flush = time.monotonic() + self.flush_interval
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.flush_fn(batch)
+                break
+            except Exception:
+                if attempt == self.max_retries:
+                    logging.exception(f"Dropping {len(batch)} chat history rows after {attempt + 1} failed flushes")
+                    self._record(rows_failed=len(batch))
+                    return
+                logging.warning(f"Chat history flush failed (attempt {attempt + 1}), retrying")
+                time.sleep(self.retry_backoff * (2 ** attempt))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._metrics_lock:
+            self._metrics["flushes"] += 1
+            self._metrics["rows_written"] += len(batch)
+            self._metrics["last_flush_rows"] = len(batch)
+            self._metrics["last_flush_ms"] = elapsed_ms
+            self._metrics["max_flush_ms"] = max(self._metrics["max_flush_ms"], elapsed_ms)
+            self._metrics["total_flush_ms"] += elapsed_ms
+
+    def _record(self, **counters):
+        with self._metrics_lock:
+            for name, amount in counters.items():
+                self._metrics[name] += amount
+
+    def metrics(self):
+        """
+        Returns a dictionary with flush counts, row counts and flush latencies.
+        """
+        with self._metrics_lock:
+            snapshot = dict(self._metrics)
+        with self._cond:
+            snapshot["pending"] = len(self._pending) + self._in_flight
+        snapshot["avg_flush_ms"] = snapshot["total_flush_ms"] / snapshot["flushes"] if snapshot["flushes"] else 0.0
+        return snapshot
@@ -0,0 +1,175 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from llm_censor.redaction import apply_placeholders
+
+_TOKEN_RE = re.compile(r"<([A-Z_]+)_(\d+)>")
+
+
+class CensorCacheConfig:
+    """
+    Configuration for memoized censoring and the placeholder vaults.
+    """
+    MAX_BYTES = int(os.getenv('CENSOR_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    MAX_CONVERSATIONS = int(os.getenv('CENSOR_VAULT_MAX_CONVERSATIONS', '10000'))
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of censor cache parameters.
+        """
+        return {"max_bytes": cls.MAX_BYTES}
+
+
+def content_key(text):
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class CensorAnalysis:
+    """
+    What censoring found in one text: the redacted (start, end, type, original) spans and
+    the NER (text, label) entities.
+    """
+    __slots__ = ("spans", "entities", "size")
+
+    def __init__(self, spans, entities):
+        self.spans = spans
+        self.entities = entities
+        # Rough in-memory footprint, used for the cache's byte budget.
+        self.size = (128 + sum(96 + len(span[3]) for span in spans)
+                     + sum(96 + len(text) + len(label) for text, label in entities))
+
+
+class CensorCache:
+    """
+    LRU cache of CensorAnalysis keyed on the content hash of the text. Entries are evicted
+    least recently used first once their estimated size exceeds max_bytes.
+    """
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, text):
+        key = content_key(text)
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return analysis
+
+    def put(self, text, analysis):
+        if analysis.size > self.max_bytes:
+            return
+        key = content_key(text)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = analysis
+            self._bytes += analysis.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._stats["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+
+class PlaceholderVault:
+    """
+    Per-conversation mapping between stable placeholders (<NAME_1>, <EMAIL_2>, ...) and
+    the originals they replace. The same value always gets the same placeholder within a
+    conversation, so an LLM response can be re-identified with a dictionary lookup.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}     # (type, casefolded original) -> placeholder
+        self._originals = {}  # placeholder -> original
+        self._counters = {}
+
+    def token_for(self, kind, original):
+        key = (kind, original.casefold())
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is None:
+                self._counters[kind] = self._counters.get(kind, 0) + 1
+                token = self._tokens[key] = f"<{kind}_{self._counters[kind]}>"
+                self._originals[token] = original
+            return token
+
+    def pseudonymize(self, text, spans):
+        """
+        Replaces the analysis spans of text with this conversation's placeholders.
+        """
+        return apply_placeholders(text, spans, self.token_for)
+
+    def reidentify(self, text):
+        """
+        Restores the originals of every placeholder this vault issued; unknown tokens are kept.
+        """
+        return _TOKEN_RE.sub(lambda match: self._originals.get(match.group(0), match.group(0)), text)
+
+    def __len__(self):
+        return len(self._originals)
+
+
+class VaultStore:
+    """
+    Placeholder vaults by conversation id, keeping the max_conversations most recently used.
+    """
+    def __init__(self, max_conversations=10000):
+        self.max_conversations = max_conversations
+        self._lock = threading.Lock()
+        self._vaults = OrderedDict()
+
+    def get(self, conversation_id):
+        with self._lock:
+            vault = self._vaults.get(conversation_id)
+            if vault is None:
+                vault = self._vaults[conversation_id] = PlaceholderVault()
+                if len(self._vaults) > self.max_conversations:
+                    self._vaults.popitem(last=False)
+            else:
+                self._vaults.move_to_end(conversation_id)
+            return vault
+
+    def discard(self, conversation_id):
+        with self._lock:
+            self._vaults.pop(conversation_id, None)
+
+
+_censor_cache = None
+_vault_store = None
+_singletons_lock = threading.Lock()
+
+
+def get_censor_cache():
+    """
+    Returns the process-wide CensorCache.
+    """
+    global _censor_cache
+    with _singletons_lock:
+        if _censor_cache is None:
+            _censor_cache = CensorCache(**CensorCacheConfig.get_config())
+        return _censor_cache
+
+
+def get_vault_store():
+    """
+    Returns the process-wide VaultStore.
+    """
+    global _vault_store
+    with _singletons_lock:
+        if _vault_store is None:
+            _vault_store = VaultStore(CensorCacheConfig.MAX_CONVERSATIONS)
+        return _vault_store
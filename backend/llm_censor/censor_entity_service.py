@@ -1,51 +1,171 @@
 ##This is under development and will be updated soon currently facing some issues with the code
 
 # Import necessary libraries
-import transformers
-from llama_index.llms import Ollama
-from llama_index.core import (
-    VectorStoreIndex,
-    SimpleDirectoryReader,
-    StorageContext,
-    load_index_from_storage,
-)
-import qdrant_client
-from transformers import pipeline
-from transformers import pipeline
-import spacy
+# spaCy, transformers and llama_index are imported on first use (see get_ner_pipeline,
+# get_text_generator and the index functions), so importing this module stays cheap.
+import logging
 import os
+import threading
+import time
+from llm_censor.index_manifest import (
+    IndexingConfig,
+    atomic_persist,
+    batched,
+    diff_manifests,
+    load_manifest,
+    recover_persist_dir,
+    save_manifest,
+    scan_directory,
+)
+from llm_censor.redaction import apply_placeholders, get_redaction_engine
+from llm_censor.censor_cache import CensorAnalysis, get_censor_cache, get_vault_store
+
+# Model parameters
+NER_MODEL = os.getenv('NER_MODEL', 'en_core_web_sm')
+NER_BATCH_SIZE = int(os.getenv('NER_BATCH_SIZE', '256'))
+NER_N_PROCESS = int(os.getenv('NER_N_PROCESS', '1'))
+CENSOR_LLM_MODEL = os.getenv('CENSOR_LLM_MODEL', 'mistralai/Mixtral-8x7B-Instruct-v0.1')
+CENSOR_LLM_FALLBACK = os.getenv('CENSOR_LLM_FALLBACK', 'false').lower() == 'true'
+
+_ner_pipeline = None
+_text_generator = None
+_models_lock = threading.Lock()
+
+def get_ner_pipeline():
+    """
+    Loads the spaCy NER model once per process, on first use.
+    Returns the model and the pipeline components NER does not need.
+    """
+    global _ner_pipeline
+    if _ner_pipeline is None:
+        with _models_lock:
+            if _ner_pipeline is None:
+                import spacy
+                nlp = spacy.load(NER_MODEL)
+                _ner_pipeline = (nlp, ner_disabled_components(nlp))
+    return _ner_pipeline
 
+def get_text_generator():
+    """
+    Loads the text-generation pipeline used for LLM censoring once per process, on first use.
+    """
+    global _text_generator
+    if _text_generator is None:
+        with _models_lock:
+            if _text_generator is None:
+                from transformers import pipeline
+                _text_generator = pipeline("text-generation", model=CENSOR_LLM_MODEL)
+    return _text_generator
+
+def generate_text(prompt, **kwargs):
+    """
+    Runs the lazily loaded text-generation pipeline.
+    """
+    return get_text_generator()(prompt, **kwargs)
+
+def preload(text_generator=False):
+    """
+    Loads the models ahead of time, e.g. when a server starts a worker, so the first
+    request does not pay for it.
+    """
+    get_ner_pipeline()
+    if text_generator:
+        get_text_generator()
 
 # Function to censor sensitive information using Mixtral 8x7B
-def censor_sensitive_information(input_text):
+def censor_with_llm(input_text):
     """
     This function takes user input and censors sensitive information using Mixtral 8x7B.
-    Note: Assumes Mixtral 8x7B is initialized elsewhere in the codebase.
+    The model is loaded on first use by get_text_generator. Only used as a fallback when
+    the local redaction engine cannot run NER.
     """
-    # Assuming 'generate_text' is a predefined pipeline or method setup for text generation
+    # 'generate_text' runs the lazily loaded text-generation pipeline
     censoring_prompt = f"Censor sensitive information like names in the following text: {input_text}"
     result = generate_text(censoring_prompt)  # Make sure to adjust this call based on your actual setup
     return result[0]['generated_text']
 
 # Function to create and populate a vector database with LlamaIndex
-def create_and_persist_index(data_dir="data", persist_dir="./storage"):
-    # Check if the storage directory already exists
-    if not os.path.exists(persist_dir):
-        # Load documents from the data directory
-        documents = SimpleDirectoryReader(data_dir).load_data()
-        # Create the index from documents
-        index = VectorStoreIndex.from_documents(documents)
-        # Persist the index for future use
-        index.storage_context.persist(persist_dir=persist_dir)
-        print("Index created and persisted.")
-    else:
-        # Load the existing index if storage directory exists
+def create_and_persist_index(data_dir="data", persist_dir="./storage", embed_batch_size=None,
+                             insert_batch_files=None, embed_model=None):
+    """
+    Loads the persisted index and brings it up to date with data_dir, embedding only
+    what changed.
+
+    The store keeps a manifest of each file's mtime, size, content hash and document ids.
+    New and changed files are embedded (nodes of many files go through the embedding model
+    together, embed_batch_size texts per call), and the nodes of changed and removed files
+    are deleted. The updated store is written to a staging directory and swapped in, so a
+    crash mid-update leaves the previous index intact. A store without a manifest is rebuilt.
+
+    Args:
+        data_dir (str): Directory of source documents.
+        persist_dir (str): Directory of the persisted index.
+        embed_batch_size (int, optional): Texts per embedding call. Defaults to INDEX_EMBED_BATCH_SIZE.
+        insert_batch_files (int, optional): Files read and inserted per step. Defaults to INDEX_INSERT_BATCH_FILES.
+        embed_model (BaseEmbedding, optional): Embedding model. Defaults to Settings.embed_model;
+            a copy with embed_batch_size is used, so the shared model is left unchanged.
+
+    Returns:
+        VectorStoreIndex: The up-to-date index.
+    """
+    from llama_index.core import (
+        Settings,
+        VectorStoreIndex,
+        SimpleDirectoryReader,
+        StorageContext,
+        load_index_from_storage,
+    )
+
+    config = IndexingConfig.get_config()
+    embed_batch_size = embed_batch_size or config["embed_batch_size"]
+    insert_batch_files = insert_batch_files or config["insert_batch_files"]
+    start = time.monotonic()
+
+    recover_persist_dir(persist_dir)
+    manifest = load_manifest(persist_dir) if os.path.exists(persist_dir) else None
+    if manifest is None and os.path.exists(persist_dir):
+        logging.warning(f"Index in {persist_dir} has no manifest, rebuilding it")
+    previous = manifest or {}
+    current = scan_directory(data_dir, previous)
+    diff = diff_manifests(previous, current)
+    logging.info(f"Index update for {data_dir}: {diff}")
+
+    embed_model = (embed_model or Settings.embed_model).model_copy(update={"embed_batch_size": embed_batch_size})
+    if manifest is not None:
         storage_context = StorageContext.from_defaults(persist_dir=persist_dir)
-        index = load_index_from_storage(storage_context)
-        print("Index loaded from storage.")
+        index = load_index_from_storage(storage_context, embed_model=embed_model)
+        if not diff:
+            print("Index loaded from storage.")
+            return index
+    else:
+        index = VectorStoreIndex(nodes=[], embed_model=embed_model)
+
+    for path in diff.to_delete:
+        for doc_id in previous[path].get("doc_ids", []):
+            index.delete_ref_doc(doc_id, delete_from_docstore=True)
+    for path in diff.unchanged:
+        current[path]["doc_ids"] = previous[path].get("doc_ids", [])
+
+    for paths in batched(diff.to_embed, insert_batch_files):
+        by_absolute = {os.path.abspath(os.path.join(data_dir, path)): path for path in paths}
+        documents = SimpleDirectoryReader(input_files=list(by_absolute), filename_as_id=True).load_data()
+        for path in paths:
+            current[path]["doc_ids"] = []
+        for document in documents:
+            path = by_absolute.get(os.path.abspath(document.metadata.get("file_path", "")))
+            if path is not None:
+                current[path]["doc_ids"].append(document.doc_id)
+        # One insert per batch of files, so the embedding calls are shared across files
+        index.insert_nodes(Settings.node_parser.get_nodes_from_documents(documents))
+
+    def write(staging_dir):
+        index.storage_context.persist(persist_dir=staging_dir)
+        save_manifest(staging_dir, current)
+
+    atomic_persist(persist_dir, write)
+    print(f"Index persisted: {len(diff.to_embed)} files embedded, {len(diff.removed)} removed, "
+          f"{len(diff.unchanged)} unchanged in {time.monotonic() - start:.1f}s.")
     return index
-    
-    print("Vector database created and populated with censored content for entity relationship analysis.")
 
 # Main function to orchestrate censoring and indexing
 def process_user_input(input_text):
@@ -86,8 +206,24 @@ def process_user_input(input_text):
     entity_memory = create_entity_related_memory(vector_db, entities)
     print("Entity-related memory with various relationship types created:", entity_memory)
 
-# Load a pre-trained named entity recognition (NER) model
-nlp = spacy.load("en_core_web_sm")
+def ner_disabled_components(nlp):
+    """
+    Returns the pipeline components NER does not need (tagger, parser, lemmatizer, ...).
+    A shared tok2vec/transformer is kept only when the NER component listens to it.
+    """
+    ner_layers = set()
+    if "ner" in nlp.pipe_names:
+        ner_layers = {node.name for node in nlp.get_pipe("ner").model.walk()}
+    keep = {"ner", "entity_ruler"}
+    if any("listener" in name for name in ner_layers):
+        keep.update({"tok2vec", "transformer"})
+    return [name for name in nlp.pipe_names if name not in keep]
+
+def doc_entities(doc):
+    """
+    Returns the unique (text, label) entities of a parsed document, in order of appearance.
+    """
+    return list(dict.fromkeys((ent.text, ent.label_) for ent in doc.ents))
 
 # Function to extract entities using NER
 def extract_entities(text):
@@ -95,26 +231,94 @@ def extract_entities(text):
     Extracts entities from text using a Named Entity Recognition model.
     Returns a list of unique entities.
     """
-    doc = nlp(text)
-    entities = set()
-    for ent in doc.ents:
-        entities.add((ent.text, ent.label_))
-    return list(entities)
+    # Texts censored before already have their entities memoized
+    analysis = get_censor_cache().get(text)
+    if analysis is not None:
+        return list(analysis.entities)  # A copy, so callers cannot change the cached analysis
+    nlp, disabled = get_ner_pipeline()
+    return doc_entities(nlp(text, disable=disabled))
+
+# Function to extract entities from many texts at once
+def extract_entities_batch(texts, batch_size=None, n_process=None):
+    """
+    Streams texts through nlp.pipe with only the components NER needs.
+
+    Args:
+        texts (iterable): Texts to analyze.
+        batch_size (int, optional): Texts per batch. Defaults to NER_BATCH_SIZE.
+        n_process (int, optional): Worker processes (-1 for all cores). Defaults to NER_N_PROCESS.
+
+    Returns:
+        list: One list of unique (text, label) entities per input text, in input order.
+    """
+    batch_size = batch_size or NER_BATCH_SIZE
+    n_process = n_process or NER_N_PROCESS
+    nlp, disabled = get_ner_pipeline()
+    docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disabled)
+    return [doc_entities(doc) for doc in docs]
+
+# Find (and memoize) what needs censoring in a text
+def analyze_sensitive_information(input_text, use_llm_fallback=None):
+    """
+    Runs NER and the redaction engine on the input text, memoized by content hash, so a
+    repeated message skips NER entirely. A regex-only analysis (NER unavailable) is not
+    memoized, so the text is analyzed fully once NER is back.
+    Returns a CensorAnalysis, or None if NER is unavailable and the LLM fallback should be used.
+    """
+    cache = get_censor_cache()
+    analysis = cache.get(input_text)
+    if analysis is not None:
+        return analysis
+
+    use_llm_fallback = CENSOR_LLM_FALLBACK if use_llm_fallback is None else use_llm_fallback
+    try:
+        nlp, disabled = get_ner_pipeline()
+        doc = nlp(input_text, disable=disabled)
+        entity_spans = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
+        entities = doc_entities(doc)
+        degraded = False
+    except (ImportError, OSError) as e:  # spaCy or the model is not installed
+        if use_llm_fallback:
+            return None
+        logging.warning(f"NER unavailable, redacting structured PII only: {e}")
+        entity_spans, entities, degraded = [], [], True
+
+    analysis = CensorAnalysis(get_redaction_engine().redact(input_text, entity_spans).spans, entities)
+    if not degraded:
+        cache.put(input_text, analysis)
+    return analysis
 
 # Enhance the censoring function to also return extracted entities
-def censor_sensitive_information(input_text):
+def censor_sensitive_information(input_text, use_llm_fallback=None):
     """
     Censors sensitive information and extracts entities from the input text.
+    Structured PII and NER entities are replaced locally with typed placeholders
+    (<EMAIL>, <NAME>, <GPE>, ...); the LLM is only used if NER is unavailable and
+    CENSOR_LLM_FALLBACK is enabled.
     Returns both the censored text and a list of extracted entities.
     """
-    # Existing implementation for censoring (adapt as needed)
-    censored_text = "Censored version of the input text"
-    
-    # Extract entities from the original input text
-    entities = extract_entities(input_text)
-    
-    return censored_text, entities
-    
+    analysis = analyze_sensitive_information(input_text, use_llm_fallback)
+    if analysis is None:
+        return censor_with_llm(input_text), []
+    return apply_placeholders(input_text, analysis.spans), list(analysis.entities)
+
+# Reversible censoring for a conversation with the LLM
+def pseudonymize_for_conversation(conversation_id, input_text):
+    """
+    Censors the input text with placeholders that are stable within the conversation
+    (<NAME_1>, <EMAIL_1>, ...), so the LLM response can be re-identified afterwards.
+    Returns both the pseudonymized text and a list of extracted entities.
+    """
+    analysis = analyze_sensitive_information(input_text, use_llm_fallback=False)
+    vault = get_vault_store().get(conversation_id)
+    return vault.pseudonymize(input_text, analysis.spans), list(analysis.entities)
+
+def reidentify_for_conversation(conversation_id, response_text):
+    """
+    Puts the originals back in place of the conversation's placeholders in an LLM response.
+    """
+    return get_vault_store().get(conversation_id).reidentify(response_text)
+
 def query_index(index, question):
     # Create a query engine from the index
     query_engine = index.as_query_engine()
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+class IndexingConfig:
+    """
+    Configuration for incremental updates of the persisted vector index.
+    """
+    EMBED_BATCH_SIZE = int(os.getenv('INDEX_EMBED_BATCH_SIZE', '100'))
+    INSERT_BATCH_FILES = int(os.getenv('INDEX_INSERT_BATCH_FILES', '64'))
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of incremental indexing parameters.
+        """
+        return {"embed_batch_size": cls.EMBED_BATCH_SIZE, "insert_batch_files": cls.INSERT_BATCH_FILES}
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """
+    SHA-256 of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_directory(data_dir, previous=None):
+    """
+    Describes every file under data_dir as {relative path: {"mtime", "size", "sha256"}}.
+
+    A file whose mtime and size match its entry in previous keeps that entry's hash
+    without being read again, so a scan of an unchanged directory only costs a stat per file.
+    """
+    previous = previous or {}
+    files = {}
+    for root, dirs, names in os.walk(data_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(names):
+            if name.startswith("."):
+                continue
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, data_dir).replace(os.sep, "/")
+            stat = os.stat(path)
+            entry = previous.get(relative)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                sha256 = entry["sha256"]
+            else:
+                sha256 = file_digest(path)
+            files[relative] = {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": sha256}
+    return files
+
+
+class ManifestDiff:
+    """
+    Relative paths of files added, changed (new content hash), removed and unchanged
+    since the manifest was written.
+    """
+    def __init__(self, added, changed, removed, unchanged):
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+        self.unchanged = unchanged
+
+    @property
+    def to_embed(self):
+        return self.added + self.changed
+
+    @property
+    def to_delete(self):
+        return self.changed + self.removed
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __repr__(self):
+        return (f"<ManifestDiff(added={len(self.added)}, changed={len(self.changed)}, "
+                f"removed={len(self.removed)}, unchanged={len(self.unchanged)})>")
+
+
+def diff_manifests(previous, current):
+    """
+    Compares two {relative path: entry} maps by content hash; an mtime change alone
+    does not count as a change.
+    """
+    added, changed, unchanged = [], [], []
+    for path, entry in current.items():
+        old = previous.get(path)
+        if old is None:
+            added.append(path)
+        elif old["sha256"] != entry["sha256"]:
+            changed.append(path)
+        else:
+            unchanged.append(path)
+    removed = [path for path in previous if path not in current]
+    return ManifestDiff(added, changed, removed, unchanged)
+
+
+def load_manifest(persist_dir):
+    """
+    Returns the {relative path: entry} map persisted with the index, or None if the
+    store has no readable manifest.
+    """
+    path = os.path.join(persist_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable index manifest {path}: {e}")
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest["files"]
+
+
+def save_manifest(persist_dir, files):
+    with open(os.path.join(persist_dir, MANIFEST_NAME), "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f)
+
+
+def recover_persist_dir(persist_dir):
+    """
+    Finishes or rolls back a swap interrupted by a crash: if persist_dir is missing but
+    the previous version was set aside, it is put back. Leftover temporary dirs are removed.
+    """
+    backup, staging = f"{persist_dir}.old", f"{persist_dir}.new"
+    if not os.path.exists(persist_dir) and os.path.exists(backup):
+        logging.warning(f"Restoring {persist_dir} from an interrupted index update")
+        os.replace(backup, persist_dir)
+    for leftover in (backup, staging):
+        if os.path.exists(leftover):
+            shutil.rmtree(leftover)
+
+
+def atomic_persist(persist_dir, write):
+    """
+    Writes a new version of persist_dir without ever exposing a partial one.
+
+    write(path) fills a staging directory next to persist_dir. Only once it returns is the
+    current version set aside and the staging directory renamed into place; a crash before
+    that leaves the old store untouched, and recover_persist_dir handles one in between.
+    """
+    persist_dir = os.path.normpath(persist_dir)
+    recover_persist_dir(persist_dir)
+    staging, backup = f"{persist_dir}.new", f"{persist_dir}.old"
+    os.makedirs(staging)
+    try:
+        write(staging)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if os.path.exists(persist_dir):
+        os.replace(persist_dir, backup)
+    os.replace(staging, persist_dir)
+    shutil.rmtree(backup, ignore_errors=True)
+
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
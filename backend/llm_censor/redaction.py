@@ -0,0 +1,216 @@
+import os
+import re
+import threading
+
+EMAIL_RE = re.compile(r"(?<![A-Za-z0-9._%+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+URL_RE = re.compile(r"https?://[^\s<>\"']+")
+IBAN_RE = re.compile(r"(?<![A-Za-z0-9])[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,3})?(?![A-Za-z0-9])")
+
+# Numeric PII, tried in this order at each position of a digit run.
+NUMERIC_PATTERNS = [
+    ("SSN", r"(?<![\w-])\d{3}-\d{2}-\d{4}(?![\w-])"),
+    ("CARD", r"(?<![\w-])\d(?:[ -]?\d){12,18}(?![\w-])"),
+    ("IP", r"(?<![\w.])(?:(?:25[0-5]|2[0-4]\d|1?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|1?\d?\d)(?![\w.])"),
+    # A "+" or "(area)" prefix followed by 2+ groups, or three bare groups (7+ digits, 2 separators),
+    # so ranges like 1990-2000 and amounts like 10 000 are left alone.
+    ("PHONE", r"(?<![\w+])(?:(?:\+\d{1,3}[ .-]?(?:\(\d{1,4}\)[ .-]?)?|\(\d{2,4}\)[ .-]?)\d{2,4}(?:[ .-]\d{2,8}){1,3}"
+              r"|\d{2,4}[ .-]\d{3,4}[ .-]\d{3,4})(?![\w-])"),
+    ("ID", r"(?<![\w-])\d{9,}(?![\w-])"),
+]
+NUMERIC_RE = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in NUMERIC_PATTERNS))
+
+# Runs of digits and separators; numeric PII can only occur in (or just around) one.
+_DIGIT_RUN_RE = re.compile(r"\d[\d ().-]*\d|\d")
+
+# spaCy labels redacted by default, and the placeholder type used for each.
+DEFAULT_ENTITY_TYPES = {"PERSON": "NAME", "GPE": "GPE", "LOC": "LOC", "ORG": "ORG", "FAC": "FAC", "NORP": "NORP"}
+
+# When spans overlap, the merged span takes the type of the highest priority source.
+TERM_PRIORITY, PII_PRIORITY, ENTITY_PRIORITY = 3, 2, 1
+
+
+class RedactionConfig:
+    """
+    Configuration for the local redaction engine.
+    """
+    ENTITY_LABELS = os.getenv('REDACT_ENTITY_LABELS', ','.join(DEFAULT_ENTITY_TYPES))
+    TERMS_PATH = os.getenv('REDACT_TERMS_PATH')
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of redaction engine parameters.
+        """
+        labels = [label.strip() for label in cls.ENTITY_LABELS.split(",") if label.strip()]
+        terms = {}
+        if cls.TERMS_PATH:
+            with open(cls.TERMS_PATH) as f:
+                terms = {line.strip(): "TERM" for line in f if line.strip()}
+        return {"entity_types": {label: DEFAULT_ENTITY_TYPES.get(label, label) for label in labels}, "terms": terms}
+
+
+_LUHN_DOUBLED = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+
+def luhn_valid(number):
+    """
+    Luhn checksum used by payment card numbers.
+    """
+    digits = number.replace(" ", "").replace("-", "")
+    total = sum(map(int, digits[-1::-2])) + sum(_LUHN_DOUBLED[int(d)] for d in digits[-2::-2])
+    return total % 10 == 0
+
+
+def iban_valid(iban):
+    """
+    ISO 13616 mod-97 check of an IBAN.
+    """
+    iban = iban.replace(" ", "")
+    rearranged = iban[4:] + iban[:4]
+    return int("".join(str(int(c, 36)) for c in rearranged)) % 97 == 1
+
+
+def term_pattern(terms):
+    """
+    Compiles literal terms into a trie-shaped regex, so matching many terms costs about
+    as much as matching one (the regex engine walks shared prefixes once).
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term.lower():
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def to_regex(node):
+        end = node.get("") is True
+        branches = [re.escape(char) + to_regex(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if end else body
+
+    return r"(?<!\w)" + to_regex(trie) + r"(?!\w)"
+
+
+def apply_placeholders(text, spans, placeholder=None):
+    """
+    Rebuilds text with each (start, end, type, original) span replaced, in one pass.
+    placeholder(type, original) returns the replacement; the default is "<TYPE>".
+    """
+    parts, position = [], 0
+    for start, end, kind, original in spans:
+        parts.append(text[position:start])
+        parts.append(placeholder(kind, original) if placeholder else f"<{kind}>")
+        position = end
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+class RedactionResult:
+    """
+    Redacted text plus the replaced spans as (start, end, type, original) in the input.
+    """
+    def __init__(self, text, spans):
+        self.text = text
+        self.spans = spans
+
+    def __repr__(self):
+        return f"<RedactionResult(spans={len(self.spans)})>"
+
+
+class RedactionEngine:
+    """
+    Replaces PII with typed placeholders like <EMAIL> or <NAME> without calling a model.
+
+    Numeric PII (phones, card numbers, SSNs, IPs, IDs) and IBANs are found by one scan for
+    digit runs, checking the specific patterns only inside each run; email and URL patterns
+    run only when the text contains "@" or "://". Card numbers and IBANs are checksum-validated.
+    Custom terms are matched by one trie-shaped regex. NER entity spans are merged with those
+    matches, overlapping spans are combined, and the output is assembled in one pass.
+    """
+    def __init__(self, entity_types=None, terms=None):
+        self.entity_types = DEFAULT_ENTITY_TYPES if entity_types is None else entity_types
+        self.terms = terms or {}
+        self._term_types = {term.lower(): label for term, label in self.terms.items()}
+        self._term_regex = re.compile(term_pattern(self.terms), re.IGNORECASE) if self.terms else None
+
+    def find_pii(self, text):
+        """
+        Returns (start, end, type, priority) spans of structured PII and custom terms.
+        """
+        spans = []
+        if "@" in text:
+            spans.extend((m.start(), m.end(), "EMAIL", PII_PRIORITY) for m in EMAIL_RE.finditer(text))
+        if "://" in text:
+            spans.extend((m.start(), m.end(), "URL", PII_PRIORITY) for m in URL_RE.finditer(text))
+
+        for run in _DIGIT_RUN_RE.finditer(text):
+            start, end = run.span()
+            prefix = text[start - 2:start] if start >= 2 else ""
+            if prefix.isalpha() and prefix.isupper():
+                iban = IBAN_RE.match(text, start - 2)
+                if iban and iban_valid(iban.group()):
+                    spans.append((iban.start(), iban.end(), "IBAN", PII_PRIORITY))
+                    continue
+            # One character of context on each side for the prefixes and boundary checks.
+            for match in NUMERIC_RE.finditer(text, max(0, start - 1), min(len(text), end + 1)):
+                kind = match.lastgroup
+                if kind == "CARD" and not luhn_valid(match.group()):
+                    kind = "ID"
+                spans.append((match.start(), match.end(), kind, PII_PRIORITY))
+
+        if self._term_regex is not None:
+            for match in self._term_regex.finditer(text):
+                kind = self._term_types.get(match.group().lower(), "TERM")
+                spans.append((match.start(), match.end(), kind, TERM_PRIORITY))
+        return spans
+
+    def redact(self, text, entity_spans=()):
+        """
+        Redacts text.
+
+        Args:
+            text (str): Input text.
+            entity_spans (iterable): (start, end, label) NER spans, e.g. spaCy ent.start_char,
+                ent.end_char, ent.label_. Labels outside entity_types are kept.
+
+        Returns:
+            RedactionResult: The redacted text and the replaced spans.
+        """
+        spans = self.find_pii(text)
+        for start, end, label in entity_spans:
+            kind = self.entity_types.get(label)
+            if kind:
+                spans.append((start, end, kind, ENTITY_PRIORITY))
+        if not spans:
+            return RedactionResult(text, [])
+
+        spans.sort(key=lambda span: (span[0], -span[1]))
+        merged = []
+        for start, end, kind, priority in spans:
+            if merged and start < merged[-1][1]:
+                last_start, last_end, last_kind, last_priority = merged[-1]
+                if priority > last_priority:
+                    last_kind, last_priority = kind, priority
+                merged[-1] = (last_start, max(last_end, end), last_kind, last_priority)
+            else:
+                merged.append((start, end, kind, priority))
+
+        replaced = [(start, end, kind, text[start:end]) for start, end, kind, _ in merged]
+        return RedactionResult(apply_placeholders(text, replaced), replaced)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_redaction_engine():
+    """
+    Returns the process-wide RedactionEngine built from RedactionConfig.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RedactionEngine(**RedactionConfig.get_config())
+        return _engine
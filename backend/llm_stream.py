@@ -0,0 +1,68 @@
+import json
+import os
+import requests
+
+# Returned by parse_openai_sse_line for the terminating "data: [DONE]" line.
+DONE = object()
+
+
+def sse_event(event, data):
+    """
+    Formats one Server-Sent Events message with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def parse_openai_sse_line(line):
+    """
+    Extracts the content delta from one line of an OpenAI streaming response.
+
+    Returns:
+        str, None or DONE: The token text, None for keep-alives/non-content lines, and
+        the DONE sentinel for the terminating "data: [DONE]" line.
+    """
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    line = line.strip()
+    if not line.startswith("data:"):
+        return None
+    data = line[len("data:"):].strip()
+    if data == "[DONE]":
+        return DONE
+    choices = json.loads(data).get("choices") or [{}]
+    return choices[0].get("delta", {}).get("content")
+
+
+def openai_stream_request(prompt):
+    """
+    Returns (url, headers, payload) for a streaming chat completion of the prompt.
+    """
+    url = f"{os.environ.get('OPENAI_API_URL', 'https://api.openai.com')}/v1/chat/completions"
+    headers = {"Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY')}"}
+    payload = {
+        "model": os.environ.get('OPENAI_MODEL', 'gpt-4'),
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0,
+        "stream": True
+    }
+    return url, headers, payload
+
+
+def stream_response_with_openai(prompt, timeout=(3.05, 60)):
+    """
+    Yields completion tokens as OpenAI produces them.
+    Closing the generator (e.g. when the client disconnects) closes the upstream connection,
+    which cancels the generation.
+    """
+    url, headers, payload = openai_stream_request(prompt)
+    response = requests.post(url, headers=headers, json=payload, stream=True, timeout=timeout)
+    try:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            token = parse_openai_sse_line(line)
+            if token is DONE:
+                return
+            if token:
+                yield token
+    finally:
+        response.close()
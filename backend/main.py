@@ -1,13 +1,98 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from config import load_config
 from vectara_service import query_vectara
+from response_cache import get_response_cache
+from llm_stream import sse_event, stream_response_with_openai
+from prompt_assembly import assemble_context
+from contextlib import closing
 import logging
+import os
+import threading
+import time
 
 app = Flask(__name__)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 
+_chat_history_service = None
+_chat_history_lock = threading.Lock()
+
+def get_chat_history_service():
+    """
+    Returns the process-wide PostgresService used to record chat turns, or None if
+    CHAT_HISTORY_ENABLED is not set.
+    """
+    global _chat_history_service
+    if os.getenv('CHAT_HISTORY_ENABLED', 'false').lower() != 'true':
+        return None
+    with _chat_history_lock:
+        if _chat_history_service is None:
+            from database.postgres.postgres_service import DatabaseConfig, PostgresService
+            from database.write_behind import WriteBehindConfig
+            _chat_history_service = PostgresService(
+                DatabaseConfig.get_db_config(),
+                pool_config=DatabaseConfig.get_pool_config(),
+                write_behind_config=WriteBehindConfig.get_config()
+            )
+        return _chat_history_service
+
+def record_chat_turn(username, message, response):
+    chat_history = get_chat_history_service()
+    if chat_history is None or not username:
+        return
+    try:
+        chat_history.insert_chat_history(username, message, response)
+    except Exception as e:
+        logging.exception("Failed to write chat history:", exc_info=e)
+
+def build_prompt(vectara_results):
+    # Deduplicated, score-ordered passages packed into the prompt token budget
+    context = assemble_context(vectara_results)
+    logging.info(f"Prompt context: {context}")
+    return "Based on the following qualities of great accommodations, generate a summary: " + context.text
+
+def stream_generated_response(vectara_query, username, response_cache, corpus_id, started):
+    """
+    Yields SSE events: "metadata" with the Vectara results as soon as they arrive, one "token"
+    per LLM token, then "done" with the full response (or "error"). If the client disconnects,
+    the generator is closed, which closes the upstream LLM stream and skips the history write.
+    """
+    tokens = []
+    try:
+        logging.info(f"Querying Vectara with query: '{vectara_query}'")
+        vectara_results = query_vectara(vectara_query)
+        if not vectara_results:
+            logging.error("No results returned from Vectara. Check your query or configuration.")
+            yield sse_event("error", {"error": "No results returned from Vectara."})
+            return
+        yield sse_event("metadata", {"results": vectara_results})
+
+        with closing(stream_response_with_openai(build_prompt(vectara_results))) as token_stream:
+            for token in token_stream:
+                tokens.append(token)
+                yield sse_event("token", {"token": token})
+    except Exception as e:
+        logging.exception("An error occurred:", exc_info=e)
+        yield sse_event("error", {"error": "An internal error occurred."})
+        return
+
+    openai_response = "".join(tokens)
+    yield sse_event("done", {"response": openai_response})
+
+    # Only completed streams are cached and recorded
+    if response_cache is not None:
+        response_cache.put(vectara_query, corpus_id, openai_response, time.perf_counter() - started)
+    record_chat_turn(username, vectara_query, openai_response)
+
+def stream_cached_response(cached_response):
+    """
+    Yields the SSE events of a response served from the cache: "metadata" (with no results
+    and "cached": true, since Vectara is not queried) and "done". No "token" events are sent.
+    """
+    yield sse_event("metadata", {"results": [], "cached": True})
+    yield sse_event("done", {"response": cached_response})
+
 @app.route('/generate-response', methods=['POST'])
 def generate_response():
     try:
@@ -19,20 +104,43 @@ def generate_response():
         vectara_query = data.get('query')
         if not vectara_query:
             return jsonify({"error": "No query provided."}), 400
+
+        # Serve repeated and near-identical questions from the response cache
+        response_cache = get_response_cache()
+        corpus_id = os.environ.get('VECTARA_CORPUS_ID')
+        if response_cache is not None:
+            cached_response = response_cache.get(vectara_query, corpus_id)
+            if cached_response is not None:
+                record_chat_turn(data.get('username'), vectara_query, cached_response)
+                if data.get('stream'):
+                    return Response(stream_cached_response(cached_response), mimetype='text/event-stream')
+                return jsonify({"response": cached_response}), 200
+        started = time.perf_counter()
+
+        # Streaming mode: send retrieval metadata, then tokens as they are generated
+        if data.get('stream'):
+            events = stream_generated_response(vectara_query, data.get('username'),
+                                               response_cache, corpus_id, started)
+            return Response(stream_with_context(events), mimetype='text/event-stream',
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
         
         # Query Vectara
         logging.info(f"Querying Vectara with query: '{vectara_query}'")
-        vectara_results = query_vectara(vectara_query, config)
+        vectara_results = query_vectara(vectara_query)
         
         if not vectara_results:
             logging.error("No results returned from Vectara. Check your query or configuration.")
             return jsonify({"error": "No results returned from Vectara."}), 500
         
         # Prepare prompt for OpenAI based on Vectara results
-        prompt_for_openai = "Based on the following qualities of great accommodations, generate a summary: " + " ".join(vectara_results)
+        prompt_for_openai = build_prompt(vectara_results)
         
         # Generate response using OpenAI
         openai_response = generate_response_with_openai(prompt_for_openai, config)
+
+        if response_cache is not None:
+            response_cache.put(vectara_query, corpus_id, openai_response, time.perf_counter() - started)
+        record_chat_turn(data.get('username'), vectara_query, openai_response)
         
         return jsonify({"response": openai_response}), 200
     
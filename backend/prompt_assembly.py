@@ -0,0 +1,177 @@
+import hashlib
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+import numpy as np
+
+try:
+    import tiktoken
+except ImportError:  # Falls back to a word/punctuation approximation of BPE token counts
+    tiktoken = None
+
+
+class PromptAssemblyConfig:
+    """
+    Configuration for assembling retrieval results into the LLM prompt.
+    """
+    TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '3000'))
+    DEDUP_THRESHOLD = float(os.getenv('PROMPT_DEDUP_THRESHOLD', '0.8'))
+    TOKENIZER_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4')
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of prompt assembly parameters.
+        """
+        return {
+            "token_budget": cls.TOKEN_BUDGET,
+            "dedup_threshold": cls.DEDUP_THRESHOLD
+        }
+
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_NUM_PERM = 64
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, 1 << 31, size=_NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, int(_MERSENNE_PRIME), size=_NUM_PERM, dtype=np.uint64)
+
+
+class SnippetAnalysis:
+    """
+    Per-snippet data computed once and cached: token count and MinHash signature.
+    """
+    __slots__ = ("tokens", "signature")
+
+    def __init__(self, tokens, signature):
+        self.tokens = tokens
+        self.signature = signature
+
+
+class SnippetCache:
+    """
+    LRU cache of SnippetAnalysis keyed on the snippet's content hash.
+    """
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._encoder = None
+        if tiktoken is not None:
+            try:
+                self._encoder = tiktoken.encoding_for_model(PromptAssemblyConfig.TOKENIZER_MODEL)
+            except Exception:
+                self._encoder = tiktoken.get_encoding("cl100k_base")
+
+    def count_tokens(self, text):
+        if self._encoder is not None:
+            return len(self._encoder.encode(text))
+        return len(_TOKEN_RE.findall(text))
+
+    def analyze(self, text):
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is not None:
+                self._entries.move_to_end(key)
+                return analysis
+        analysis = SnippetAnalysis(self.count_tokens(text), minhash_signature(text))
+        with self._lock:
+            self._entries[key] = analysis
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return analysis
+
+
+def minhash_signature(text, shingle_size=5):
+    """
+    MinHash signature over word shingles; the fraction of equal positions between two
+    signatures estimates the Jaccard similarity of their shingle sets.
+    """
+    words = text.lower().split()
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a * x + b) mod p for every permutation and shingle at once; with x < 2**32 and
+    # a < 2**31 the intermediate values stay below 2**64.
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+
+class AssembledContext:
+    """
+    Result of prompt assembly: the joined context plus what was kept and dropped.
+    """
+    def __init__(self, text, passages, tokens, dropped_duplicates, dropped_budget):
+        self.text = text
+        self.passages = passages
+        self.tokens = tokens
+        self.dropped_duplicates = dropped_duplicates
+        self.dropped_budget = dropped_budget
+
+    def __repr__(self):
+        return (f"<AssembledContext(passages={len(self.passages)}, tokens={self.tokens}, "
+                f"dropped_duplicates={self.dropped_duplicates}, dropped_budget={self.dropped_budget})>")
+
+
+_snippet_cache = SnippetCache()
+
+
+def _snippet_text(result):
+    return result.get("text", "") if isinstance(result, dict) else str(result)
+
+
+def _snippet_score(result):
+    return result.get("score", 0.0) if isinstance(result, dict) else 0.0
+
+
+def assemble_context(results, token_budget=None, dedup_threshold=None, separator="\n\n", cache=None):
+    """
+    Builds the retrieval context for the prompt from Vectara results.
+
+    Results are ordered by score, near-duplicates (estimated Jaccard >= dedup_threshold on
+    word shingles) are dropped, and the highest-scoring passages are packed into token_budget.
+
+    Args:
+        results (list): Vectara results (dicts with "text" and optional "score") or strings.
+        token_budget (int, optional): Maximum context tokens. Defaults to PROMPT_TOKEN_BUDGET.
+        dedup_threshold (float, optional): Similarity above which a passage is a duplicate.
+        separator (str): Inserted between passages.
+        cache (SnippetCache, optional): Cache of token counts and signatures.
+
+    Returns:
+        AssembledContext: The context text and assembly statistics.
+    """
+    config = PromptAssemblyConfig.get_config()
+    token_budget = config["token_budget"] if token_budget is None else token_budget
+    dedup_threshold = config["dedup_threshold"] if dedup_threshold is None else dedup_threshold
+    cache = cache or _snippet_cache
+    separator_tokens = cache.count_tokens(separator)
+
+    ranked = sorted(results, key=_snippet_score, reverse=True)
+    passages = []
+    signatures = np.empty((len(ranked), _NUM_PERM), dtype=np.uint64)
+    used_tokens = 0
+    dropped_duplicates = dropped_budget = 0
+    for result in ranked:
+        text = _snippet_text(result).strip()
+        if not text:
+            continue
+        analysis = cache.analyze(text)
+        kept = signatures[:len(passages)]
+        if passages and (kept == analysis.signature).mean(axis=1).max() >= dedup_threshold:
+            dropped_duplicates += 1
+            continue
+        cost = analysis.tokens + (separator_tokens if passages else 0)
+        if used_tokens + cost > token_budget:
+            # A shorter, lower-scored passage may still fit.
+            dropped_budget += 1
+            continue
+        signatures[len(passages)] = analysis.signature
+        passages.append(text)
+        used_tokens += cost
+    return AssembledContext(separator.join(passages), passages, used_tokens, dropped_duplicates, dropped_budget)
@@ -0,0 +1,270 @@
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+import numpy as np
+
+
+class ResponseCacheConfig:
+    """
+    Configuration for the /generate-response cache.
+    """
+    ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+    TTL = float(os.getenv('RESPONSE_CACHE_TTL', '3600'))
+    SIMILARITY_THRESHOLD = float(os.getenv('RESPONSE_CACHE_SIMILARITY_THRESHOLD', '0.92'))
+    SEMANTIC_ENABLED = os.getenv('RESPONSE_CACHE_SEMANTIC', 'false').lower() == 'true'
+    EMBED_MODEL = os.getenv('RESPONSE_CACHE_EMBED_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of response cache parameters.
+        """
+        return {
+            "max_bytes": cls.MAX_BYTES,
+            "ttl": cls.TTL,
+            "similarity_threshold": cls.SIMILARITY_THRESHOLD,
+        }
+
+
+_WORD_RE = re.compile(r"\w+")
+_NEGATION_RE = re.compile(r"\b(?:not|no|never|none|nor|without|cannot)\b|n't\b", re.IGNORECASE)
+
+
+def normalize_query(query):
+    """
+    Lowercases the query and collapses punctuation and whitespace, so trivially different
+    spellings of the same question share an exact-tier key.
+    """
+    return " ".join(_WORD_RE.findall(query.lower()))
+
+
+def query_signature(query):
+    """
+    What a semantic match must agree on exactly: whether the query is negated, and its
+    numbers and capitalized words after the first (likely entities). Embeddings place
+    "capital of France" next to "capital of Germany", so similarity alone is not enough.
+    """
+    words = _WORD_RE.findall(query)
+    entities = frozenset(word.lower() for index, word in enumerate(words)
+                         if word.isdigit() or (index > 0 and word[0].isupper()))
+    return bool(_NEGATION_RE.search(query)), entities
+
+
+def hashed_embedding(text, dim=512):
+    """
+    Cheap local embedding: L2-normalized feature hashing of word unigrams and bigrams.
+    It only measures word overlap, so it is meant for tests; the semantic tier needs a
+    model-backed embed_fn.
+    """
+    words = normalize_query(text).split()
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    if not features:
+        return vector
+    buckets = np.fromiter((zlib.crc32(f.encode()) % dim for f in features), dtype=np.int64, count=len(features))
+    np.add.at(vector, buckets, 1.0)
+    return vector / np.linalg.norm(vector)
+
+
+class _SemanticIndex:
+    """
+    Matrix of unit-length query embeddings for one corpus, searched with a single mat-vec product.
+    """
+    def __init__(self, dim, capacity=64):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.keys = [None] * capacity
+        self.signatures = [None] * capacity
+        self.row_of = {}
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def add(self, key, vector, signature):
+        if not self.free:
+            capacity = len(self.keys)
+            self.vectors = np.vstack([self.vectors, np.zeros_like(self.vectors)])
+            self.keys.extend([None] * capacity)
+            self.signatures.extend([None] * capacity)
+            self.free = list(range(2 * capacity - 1, capacity - 1, -1))
+        row = self.free.pop()
+        self.vectors[row] = vector
+        self.keys[row] = key
+        self.signatures[row] = signature
+        self.row_of[key] = row
+
+    def remove(self, key):
+        row = self.row_of.pop(key, None)
+        if row is not None:
+            self.vectors[row] = 0.0
+            self.keys[row] = None
+            self.signatures[row] = None
+            self.free.append(row)
+
+    def search(self, vector, signature):
+        """
+        Returns the key and score of the most similar query with the same signature.
+        """
+        if not self.row_of:
+            return None, 0.0
+        # Free rows are all zeros, so they score 0 and never pass a positive threshold.
+        scores = self.vectors @ vector
+        for row in np.argsort(-scores)[:8]:
+            if self.signatures[row] == signature:
+                return self.keys[row], float(scores[row])
+        return None, 0.0
+
+
+class ResponseCache:
+    """
+    Two-tier cache for generated responses.
+
+    The exact tier is keyed on (corpus_id, normalized query). The semantic tier, enabled by
+    passing a model-backed embed_fn, reuses the answer of a cached query whose embedding has
+    cosine similarity >= similarity_threshold with the new query and the same query_signature
+    (negation, numbers and entities). Entries expire after ttl seconds and are evicted least
+    recently used first once the cached responses and embeddings exceed max_bytes.
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=3600.0, similarity_threshold=0.92, embed_fn=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embed_fn = embed_fn
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (response, expires_at, size, cost_seconds)
+        self._indexes = {}
+        self._bytes = 0
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0,
+                       "invalidations": 0, "latency_saved_seconds": 0.0}
+
+    def get(self, query, corpus_id):
+        """
+        Returns the cached response for the query, or None on a miss.
+        """
+        key = (str(corpus_id), normalize_query(query))
+        with self._lock:
+            response = self._lookup(key, "exact_hits")
+            if response is not None or self.embed_fn is None or key[0] not in self._indexes:
+                if response is None:
+                    self._stats["misses"] += 1
+                return response
+
+        vector = self.embed_fn(query)
+        with self._lock:
+            index = self._indexes.get(key[0])
+            match, score = index.search(vector, query_signature(query)) if index is not None else (None, 0.0)
+            response = None
+            if match is not None and score >= self.similarity_threshold:
+                response = self._lookup(match, "semantic_hits")
+            if response is None:
+                self._stats["misses"] += 1
+            return response
+
+    def _lookup(self, key, counter):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        response, expires_at, _, cost = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        self._stats[counter] += 1
+        self._stats["latency_saved_seconds"] += cost
+        return response
+
+    def put(self, query, corpus_id, response, cost_seconds=0.0):
+        """
+        Caches a response. cost_seconds is how long producing it took, reported as latency saved on hits.
+        """
+        key = (str(corpus_id), normalize_query(query))
+        vector = self.embed_fn(query) if self.embed_fn is not None else None
+        size = len(response.encode()) + len(key[1]) + (vector.nbytes if vector is not None else 0)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (response, time.monotonic() + self.ttl, size, cost_seconds)
+            self._bytes += size
+            if vector is not None:
+                index = self._indexes.get(key[0])
+                if index is None:
+                    index = self._indexes[key[0]] = _SemanticIndex(len(vector))
+                index.add(key, vector, query_signature(query))
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[2]
+        index = self._indexes.get(key[0])
+        if index is not None:
+            index.remove(key)
+
+    def invalidate(self, corpus_id=None):
+        """
+        Drops every entry for the corpus (or all entries), e.g. after documents are re-indexed.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if corpus_id is None or key[0] == str(corpus_id)]
+            for key in keys:
+                self._remove(key)
+            if corpus_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(str(corpus_id), None)
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        """
+        Returns hit/miss counters, latency saved and current size.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["exact_hits"] + stats["semantic_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["exact_hits"] + stats["semantic_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def load_query_embedder(model_name):
+    """
+    Returns a function embedding one query as a unit-length vector with a sentence-transformers
+    model, or None (with a warning) if the model cannot be loaded. sentence-transformers (and
+    torch) are imported here, so workers without the semantic tier never load them.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_name)
+    except (ImportError, OSError) as e:
+        logging.warning(f"Semantic response cache disabled, cannot load {model_name}: {e}")
+        return None
+    return lambda query: model.encode(query, normalize_embeddings=True).astype(np.float32)
+
+
+def get_response_cache():
+    """
+    Returns the process-wide response cache, or None if it is disabled. The semantic tier
+    is only used when RESPONSE_CACHE_SEMANTIC is set and its embedding model loads.
+    """
+    global _response_cache
+    if not ResponseCacheConfig.ENABLED:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            embed_fn = None
+            if ResponseCacheConfig.SEMANTIC_ENABLED:
+                embed_fn = load_query_embedder(ResponseCacheConfig.EMBED_MODEL)
+            _response_cache = ResponseCache(**ResponseCacheConfig.get_config(), embed_fn=embed_fn)
+        return _response_cache
@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import re
+from sqlalchemy import text
+from sql_agent.engine_registry import EngineConfig
+from sql_agent.query_cache import is_read_only
+
+_TRAILING_LIMIT_RE = re.compile(r"\blimit\s+(\d+)\s*(?:offset\s+\d+\s*)?$", re.IGNORECASE)
+
+
+class CostGuardConfig:
+    """
+    Limits applied to agent-generated SQL before and while it runs.
+    """
+    MAX_PLAN_COST = float(os.getenv('SQL_AGENT_MAX_PLAN_COST', '1000000'))
+    MAX_PLAN_ROWS = float(os.getenv('SQL_AGENT_MAX_PLAN_ROWS', '1000000'))
+    MAX_RESULT_ROWS = int(os.getenv('SQL_AGENT_MAX_RESULT_ROWS', '1000'))
+    MAX_RESULT_BYTES = int(os.getenv('SQL_AGENT_MAX_RESULT_BYTES', str(64 * 1024)))
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of QueryGuard parameters.
+        """
+        return {
+            "max_cost": cls.MAX_PLAN_COST,
+            "max_rows": cls.MAX_PLAN_ROWS,
+            "row_limit": cls.MAX_RESULT_ROWS,
+            # One setting for both the connection default and the per-transaction SET LOCAL
+            "statement_timeout_ms": EngineConfig.STATEMENT_TIMEOUT_MS,
+        }
+
+
+class QueryRejected(Exception):
+    """
+    Raised when a generated statement's estimated cost or row count is over the limits.
+    """
+    def __init__(self, message, plan=None):
+        super().__init__(message)
+        self.plan = plan
+
+
+class PlanEstimate:
+    """
+    Planner estimates for a statement; cost and rows are None when the dialect has no estimates.
+    """
+    def __init__(self, cost, rows, plan):
+        self.cost = cost
+        self.rows = rows
+        self.plan = plan
+
+    def __repr__(self):
+        return f"<PlanEstimate(cost={self.cost}, rows={self.rows})>"
+
+
+def inject_limit(sql, limit):
+    """
+    Caps a read-only statement at limit rows, keeping an existing smaller trailing LIMIT.
+    """
+    sql = sql.strip().rstrip(";").strip()
+    existing = _TRAILING_LIMIT_RE.search(sql)
+    if existing and int(existing.group(1)) <= limit:
+        return sql
+    return f"SELECT * FROM ({sql}) AS guarded LIMIT {int(limit)}"
+
+
+def stream_result_text(result, max_rows, max_bytes):
+    """
+    Render a result as the string of a list of row tuples, reading rows lazily and
+    stopping at max_rows rows or max_bytes UTF-8 bytes.
+
+    Args:
+        result: A SQLAlchemy result, ideally executed with yield_per.
+        max_rows (int): Maximum number of rows to include.
+        max_bytes (int): Maximum size of the rendered rows.
+
+    Returns:
+        str: The rendered rows, with a note when the output was truncated.
+    """
+    parts = []
+    size = 0
+    truncated = False
+    for row_count, row in enumerate(result):
+        rendered = str(tuple(row))
+        rendered_size = len(rendered.encode()) + 2
+        if row_count >= max_rows or size + rendered_size > max_bytes:
+            truncated = True
+            break
+        parts.append(rendered)
+        size += rendered_size
+    result.close()
+    text_result = "[" + ", ".join(parts) + "]"
+    if truncated:
+        logging.warning(f"Query result truncated to {len(parts)} rows ({size} bytes)")
+        text_result += f" (truncated to the first {len(parts)} rows)"
+    return text_result
+
+
+class QueryGuard:
+    """
+    Checks generated SQL with EXPLAIN before it runs.
+
+    Read-only statements get a LIMIT injected; any statement whose estimated total cost
+    exceeds max_cost, or (for writes) whose estimated row count exceeds max_rows, is
+    rejected. On PostgreSQL the connection's statement_timeout is set for the current
+    transaction so a statement the planner misjudged is still cancelled server-side.
+    """
+    def __init__(self, max_cost=1e6, max_rows=1e6, row_limit=1000, statement_timeout_ms=15000):
+        self.max_cost = max_cost
+        self.max_rows = max_rows
+        self.row_limit = row_limit
+        self.statement_timeout_ms = statement_timeout_ms
+
+    @classmethod
+    def from_env(cls):
+        return cls(**CostGuardConfig.get_config())
+
+    def apply_statement_timeout(self, connection):
+        if connection.dialect.name == "postgresql" and self.statement_timeout_ms:
+            # SET does not take bind parameters; the value is an int from configuration.
+            connection.execute(text(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}"))
+
+    def explain(self, connection, sql, params=None):
+        """
+        Returns the PlanEstimate of sql.
+        """
+        if connection.dialect.name == "postgresql":
+            plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params or {}).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            top = plan[0]["Plan"]
+            return PlanEstimate(top.get("Total Cost"), top.get("Plan Rows"), plan)
+        if connection.dialect.name == "sqlite":
+            rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params or {}).fetchall()
+            return PlanEstimate(None, None, [row[-1] for row in rows])
+        connection.execute(text(f"EXPLAIN {sql}"), params or {})
+        return PlanEstimate(None, None, None)
+
+    def check(self, connection, sql, params=None):
+        """
+        Applies the statement timeout, rewrites and validates sql.
+
+        Returns:
+            str: The statement to execute.
+
+        Raises:
+            QueryRejected: If the estimates are over the limits.
+        """
+        self.apply_statement_timeout(connection)
+        read_only = is_read_only(sql)
+        # One extra row lets stream_result_text report that the result was truncated.
+        guarded = inject_limit(sql, self.row_limit + 1) if read_only else sql
+        if guarded != sql.strip().rstrip(";").strip():
+            logging.info(f"Capped generated query at {self.row_limit} rows")
+        estimate = self.explain(connection, guarded, params)
+        reason = None
+        if estimate.cost is not None and estimate.cost > self.max_cost:
+            reason = f"estimated cost {estimate.cost:.0f} exceeds {self.max_cost:.0f}"
+        elif not read_only and estimate.rows is not None and estimate.rows > self.max_rows:
+            reason = f"estimated {estimate.rows:.0f} rows exceeds {self.max_rows:.0f}"
+        if reason:
+            logging.warning(f"Rejected generated query ({reason}): {sql}\nPlan: {json.dumps(estimate.plan)}")
+            raise QueryRejected(f"The query is too expensive to run: {reason}", estimate.plan)
+        return guarded
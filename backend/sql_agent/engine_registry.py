@@ -0,0 +1,59 @@
+import os
+import threading
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+
+class EngineConfig:
+    """
+    Connection pool and timeout settings for SQL agent engines.
+    """
+    POOL_SIZE = int(os.getenv('SQL_AGENT_POOL_SIZE', '5'))
+    MAX_OVERFLOW = int(os.getenv('SQL_AGENT_MAX_OVERFLOW', '10'))
+    POOL_TIMEOUT = float(os.getenv('SQL_AGENT_POOL_TIMEOUT', '30'))
+    POOL_RECYCLE = int(os.getenv('SQL_AGENT_POOL_RECYCLE', '1800'))
+    STATEMENT_TIMEOUT_MS = int(os.getenv('SQL_AGENT_STATEMENT_TIMEOUT_MS', '15000'))
+
+    @classmethod
+    def get_engine_kwargs(cls, url):
+        """
+        Returns create_engine keyword arguments suited to the URL's dialect.
+        """
+        kwargs = {"pool_pre_ping": True}
+        backend = make_url(url).get_backend_name()
+        if backend != "sqlite":
+            kwargs.update({
+                "pool_size": cls.POOL_SIZE,
+                "max_overflow": cls.MAX_OVERFLOW,
+                "pool_timeout": cls.POOL_TIMEOUT,
+                "pool_recycle": cls.POOL_RECYCLE,
+            })
+        if backend == "postgresql" and cls.STATEMENT_TIMEOUT_MS:
+            # Applied server-side to every statement on every pooled connection.
+            kwargs["connect_args"] = {"options": f"-c statement_timeout={cls.STATEMENT_TIMEOUT_MS}"}
+        return kwargs
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(url):
+    """
+    Returns the process-wide engine for the URL, creating it with a tuned pool on first use.
+    """
+    with _engines_lock:
+        engine = _engines.get(url)
+        if engine is None:
+            engine = _engines[url] = create_engine(url, **EngineConfig.get_engine_kwargs(url))
+        return engine
+
+
+def dispose_engines():
+    """
+    Closes all pooled connections, e.g. after forking worker processes.
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
@@ -0,0 +1,334 @@
+import logging
+import os
+import re
+import threading
+import time
+from datetime import date
+from collections import OrderedDict
+from sqlalchemy import text
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.:])-?\d+(?:\.\d+)?(?![\w.])")
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_WORD_VALUE_RE = re.compile(r"\w[\w.@'-]*")
+_LIMIT_RE = re.compile(r"\blimit\s*$", re.IGNORECASE)
+# Words a question can put where a value went that are not values themselves: "tasks for me"
+# must not reuse the statement generated for "tasks for Alice" with owner = 'me'.
+_NON_VALUES = frozenset("""
+    i me my mine myself we us our ours you your yours he him his she her hers they them their theirs
+    it its this that these those all any every each everyone everybody anyone someone nobody none
+    today tomorrow yesterday now
+""".split())
+_WRITE_RE = re.compile(r"\b(insert|update|delete|merge|drop|alter|create|truncate|grant|revoke|copy|call|lock)\b",
+                       re.IGNORECASE)
+_SLOT = "\x00{}\x00"
+
+
+class QueryCacheConfig:
+    """
+    Configuration for the text-to-SQL and query result caches.
+    """
+    ENABLED = os.getenv('SQL_QUERY_CACHE_ENABLED', 'true').lower() == 'true'
+    MAX_ENTRIES = int(os.getenv('SQL_QUERY_CACHE_MAX_ENTRIES', '2000'))
+    RESULT_TTL = float(os.getenv('SQL_RESULT_CACHE_TTL', '30'))
+    RESULT_MAX_ENTRIES = int(os.getenv('SQL_RESULT_CACHE_MAX_ENTRIES', '500'))
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of query cache parameters.
+        """
+        return {
+            "max_entries": cls.MAX_ENTRIES,
+            "result_ttl": cls.RESULT_TTL,
+            "result_max_entries": cls.RESULT_MAX_ENTRIES,
+        }
+
+
+def collapse_whitespace(value):
+    return " ".join(str(value).split())
+
+
+def is_read_only(sql):
+    """
+    True for a single SELECT/WITH statement without data-modifying keywords.
+    """
+    body = _STRING_LITERAL_RE.sub("''", sql).strip().rstrip(";")
+    return (body.lower().startswith(("select", "with"))
+            and ";" not in body
+            and not _WRITE_RE.search(body))
+
+
+def _find_once(value, question):
+    """
+    Returns the start of the only word-bounded, verbatim occurrence of value in question.
+    """
+    matches = list(re.finditer(rf"(?<!\w){re.escape(value)}(?!\w)", question))
+    return matches[0].start() if len(matches) == 1 else None
+
+
+def _string_kind(value):
+    """
+    Returns the slot kind of a string literal, or None if it must stay inline.
+    """
+    if _DATE_RE.fullmatch(value):
+        return "date"
+    words = value.split()
+    if all(_WORD_VALUE_RE.fullmatch(word) and word.casefold() not in _NON_VALUES for word in words):
+        return "string"
+    return None
+
+
+_SLOT_PATTERNS = {
+    "number": r"(-?\d+(?:\.\d+)?)",
+    "limit": r"(\d+)",
+    "date": r"(\d{4}-\d{2}-\d{2})",
+}
+
+
+def _slot_pattern(value, kind):
+    if kind != "string":
+        return _SLOT_PATTERNS[kind]
+    # Same number of words as the original literal, so "for alice" cannot swallow "for alice due today".
+    word = _WORD_VALUE_RE.pattern
+    return rf"({word}" + rf"(?: {word})" * (len(value.split()) - 1) + ")"
+
+
+def _bind_value(value, kind):
+    """
+    Converts a value matched by a slot, or returns None if it is not a valid value for it.
+    """
+    if kind == "limit":
+        value = int(value)
+        return value if value > 0 else None
+    if kind == "number":
+        return float(value) if "." in value else int(value)
+    if kind == "date":
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            return None
+        return value
+    if any(word.casefold() in _NON_VALUES for word in value.split()):
+        return None
+    return value
+
+
+class CachedQuery:
+    """
+    A generated statement with its literals replaced by bind parameters, plus the
+    pattern that recognizes questions differing only in those literals.
+    """
+    __slots__ = ("sql", "pattern", "kinds", "template_key")
+
+    def __init__(self, sql, pattern, kinds, template_key):
+        self.sql = sql
+        self.pattern = pattern
+        self.kinds = kinds
+        self.template_key = template_key
+
+    def bind(self, question):
+        """
+        Returns the bind parameters for question, or None if it does not fit the template.
+        """
+        match = self.pattern.fullmatch(collapse_whitespace(question))
+        if match is None:
+            return None
+        params = {}
+        for i, (value, kind) in enumerate(zip(match.groups(), self.kinds)):
+            value = _bind_value(value, kind)
+            if value is None:
+                return None
+            params[f"p{i}"] = value
+        return params
+
+
+def parameterize(question, sql):
+    """
+    Replaces literals of the generated SQL that appear verbatim, exactly once, in the question
+    with bind parameters :p0, :p1, ... Pronouns and other words that are not values stay inline,
+    and a number used as a LIMIT only binds positive integers.
+
+    Returns:
+        CachedQuery: The parameterized statement and the question pattern.
+    """
+    question = collapse_whitespace(question)
+    slots = {}  # start in question -> [value, kind, sql spans]
+    literal_spans = []
+    for match in _STRING_LITERAL_RE.finditer(sql):
+        literal_spans.append(match.span())
+        value = match.group()[1:-1].replace("''", "'")
+        kind = _string_kind(value) if value.strip() else None
+        start = _find_once(value, question) if kind else None
+        if start is not None:
+            slot = slots.setdefault(start, [value, kind, []])
+            if slot[1] == kind:
+                slot[2].append(match.span())
+    for match in _NUMBER_RE.finditer(sql):
+        if any(a <= match.start() < b for a, b in literal_spans):
+            continue
+        start = _find_once(match.group(), question)
+        if start is None:
+            continue
+        is_limit = bool(_LIMIT_RE.search(sql, 0, match.start()))
+        if is_limit and not match.group().isdigit():
+            continue
+        slot = slots.setdefault(start, [match.group(), "limit" if is_limit else "number", []])
+        if slot[1] in ("number", "limit"):
+            if is_limit:
+                slot[1] = "limit"
+            slot[2].append(match.span())
+
+    pattern_parts, key_parts, replacements, position = [], [], [], 0
+    for i, start in enumerate(sorted(slots)):
+        value, kind, spans = slots[start]
+        pattern_parts.append(re.escape(question[position:start]))
+        pattern_parts.append(_slot_pattern(value, kind))
+        key_parts.append(question[position:start].casefold())
+        key_parts.append(_SLOT.format(i))
+        replacements.extend((span, f":p{i}") for span in spans)
+        position = start + len(value)
+    pattern_parts.append(re.escape(question[position:]))
+    key_parts.append(question[position:].casefold())
+
+    parameterized_sql = sql
+    for (a, b), param in sorted(replacements, reverse=True):
+        parameterized_sql = parameterized_sql[:a] + param + parameterized_sql[b:]
+    return CachedQuery(parameterized_sql, re.compile("".join(pattern_parts), re.IGNORECASE),
+                       [slots[start][1] for start in sorted(slots)], "".join(key_parts))
+
+
+class TextToSQLCache:
+    """
+    Caches generated SQL per schema version, keyed on the question with its literals
+    parameterized, and caches results of read-only statements for a short TTL.
+
+    Entries from an older schema version are dropped as soon as a lookup sees a new
+    version, so no statement is reused against a schema it was not generated for.
+    """
+    def __init__(self, max_entries=2000, result_ttl=30.0, result_max_entries=500):
+        self.max_entries = max_entries
+        self.result_ttl = result_ttl
+        self.result_max_entries = result_max_entries
+        self._lock = threading.Lock()
+        self._schema_version = None
+        self._entries = OrderedDict()
+        self._results = OrderedDict()
+        self._stats = {"lookups": 0, "hits": 0, "stored": 0, "validation_failures": 0,
+                       "result_hits": 0, "result_misses": 0}
+
+    def _check_version(self, schema_version):
+        if schema_version != self._schema_version:
+            if self._schema_version is not None:
+                logging.info("Schema version changed: clearing the text-to-SQL cache")
+            self._schema_version = schema_version
+            self._entries.clear()
+            self._results.clear()
+
+    def lookup(self, question, schema_version):
+        """
+        Returns (sql, params) for a cached statement matching the question, or None.
+        """
+        with self._lock:
+            self._check_version(schema_version)
+            self._stats["lookups"] += 1
+            # Most recently used templates first.
+            for key in reversed(self._entries):
+                entry = self._entries[key]
+                params = entry.bind(question)
+                if params is not None:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry.sql, params
+            return None
+
+    def store(self, question, schema_version, sql, connection):
+        """
+        Parameterizes a freshly generated statement, validates it with EXPLAIN on the
+        connection and caches it. Only read-only statements that pass validation are cached.
+
+        Returns:
+            tuple or None: (sql, params) of the cached statement.
+        """
+        if not is_read_only(sql):
+            return None
+        entry = parameterize(question, sql.strip().rstrip(";"))
+        params = entry.bind(question)
+        try:
+            connection.execute(text(f"EXPLAIN {entry.sql}"), params)
+        except Exception as e:
+            with self._lock:
+                self._stats["validation_failures"] += 1
+            logging.warning(f"Generated SQL failed EXPLAIN validation, not caching it: {e}")
+            connection.rollback()
+            return None
+        with self._lock:
+            self._check_version(schema_version)
+            self._entries[entry.template_key] = entry
+            self._entries.move_to_end(entry.template_key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["stored"] += 1
+        return entry.sql, params
+
+    def _result_key(self, sql, params):
+        return sql, tuple(sorted((params or {}).items()))
+
+    def get_result(self, sql, params):
+        """
+        Returns the cached rendered result of a read-only statement, or None.
+        """
+        if not is_read_only(sql):
+            return None
+        key = self._result_key(sql, params)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._stats["result_hits"] += 1
+                return cached[1]
+            self._results.pop(key, None)
+            self._stats["result_misses"] += 1
+            return None
+
+    def put_result(self, sql, params, result):
+        if not is_read_only(sql) or self.result_ttl <= 0:
+            return
+        with self._lock:
+            self._results[self._result_key(sql, params)] = (time.monotonic() + self.result_ttl, result)
+            if len(self._results) > self.result_max_entries:
+                self._results.popitem(last=False)
+
+    def invalidate_results(self):
+        """
+        Drops cached results, e.g. after the agent wrote to the database.
+        """
+        with self._lock:
+            self._results.clear()
+
+    def stats(self):
+        """
+        Returns cache statistics, including the hit rate and the LLM calls avoided.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        stats["llm_calls_avoided"] = stats["hits"]
+        return stats
+
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache():
+    """
+    Returns the process-wide TextToSQLCache, or None if SQL_QUERY_CACHE_ENABLED is false.
+    """
+    global _query_cache
+    if not QueryCacheConfig.ENABLED:
+        return None
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = TextToSQLCache(**QueryCacheConfig.get_config())
+        return _query_cache
@@ -0,0 +1,164 @@
+import logging
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from langchain import LLMChain, PromptTemplate
+from langchain.agents import AgentType, initialize_agent
+from langchain.chat_models import ChatOpenAI
+
+try:
+    import openai
+except ImportError:  # langchain brings openai in; without it ChatOpenAI cannot run anyway
+    openai = None
+
+SQL_GENERATION_TEMPLATE = (
+    "Given this SQL database schema:\n\n{schema}\n\n"
+    "Return an SQL query to insert data into the database based on this prompt: {input}.\n"
+    "You are only allowed to return the query in SQL language, nothing else, no text or anything else."
+)
+
+SAFETY_COMPLETE_TEMPLATE = (
+    "Make sure that the following message contains the answer to all of the following questions. "
+    "If any of the questions are missing, please return 'I'm sorry but I believe you forgot to add...' "
+    "and the missing information followed by 'Please invoke the Task Creation command again and add the missing info to your message "
+    "(And re-insert the original input in quotes so they can copy-paste it, without the question mark)'. "
+    "The questions are as follows:\n"
+    "- What is the task name?\n"
+    "- What is the task description?\n"
+    "- When does the task start?\n"
+    "- When is the due date?\n"
+    "- When is the expected completion date?\n"
+    "- Who is it assigned to or who is responsible for the task?\n"
+    "If everything is there, return 'True'. The message is as follows: {input}."
+)
+
+SAFETY_DELETE_TEMPLATE = (
+    "Make sure that the following message does not contain anything with the intention of deleting a task or anything from a database. If it does please just return a nice message explaning that the message failed some safety checks about deletion of some data (do not explicitely say deltion of tasks or database) and possibly is intended to delete some information which is forbidden but be very nice about it add 'if you think there is an error feel free to contact the A1 team if there is anything else i can do for you let me know\n"
+    "If everything is there, return 'True'.The message is as follows: {input}?"
+)
+
+SAFETY_INVALID_TEMPLATE = (
+    "Make sure that the following message does not contain describing a discord id or a channel or project id. please just return a nice message explaning that the message failed some safety checks about invalid inputs state that is probably related to users ids (do not explicitely say discord id or channel id) which could generate some issues in my (say my system not our) system but be very nice about it add 'if you think there is an error feel free to contact the A1 team if there is anything else i can do for you let me know do not say anything other than that\n"
+    "If everything is there, return 'True'.The message is as follows: {input}?"
+)
+
+PROMPT_TEMPLATES = {
+    "sql_generation": SQL_GENERATION_TEMPLATE,
+    "safety_complete": SAFETY_COMPLETE_TEMPLATE,
+    "safety_delete": SAFETY_DELETE_TEMPLATE,
+    "safety_invalid": SAFETY_INVALID_TEMPLATE,
+}
+
+
+class SQLAgentRuntimeConfig:
+    """
+    Configuration for the long-lived SQL agent runtime.
+    """
+    MODEL_NAME = os.getenv('SQL_AGENT_MODEL', 'gpt-4')
+    REQUEST_TIMEOUT = float(os.getenv('SQL_AGENT_REQUEST_TIMEOUT', '60'))
+    MAX_RETRIES = int(os.getenv('SQL_AGENT_MAX_RETRIES', '2'))
+    HTTP_POOL_SIZE = int(os.getenv('SQL_AGENT_HTTP_POOL_SIZE', '16'))
+    AGENT_VERBOSE = os.getenv('SQL_AGENT_VERBOSE', 'true').lower() == 'true'
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of runtime parameters.
+        """
+        return {
+            "model_name": cls.MODEL_NAME,
+            "request_timeout": cls.REQUEST_TIMEOUT,
+            "max_retries": cls.MAX_RETRIES,
+            "http_pool_size": cls.HTTP_POOL_SIZE,
+            "verbose": cls.AGENT_VERBOSE,
+        }
+
+
+def build_http_session(pool_size):
+    """
+    Returns a requests session whose keep-alive pool is sized for pool_size concurrent calls.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class SQLAgentRuntime:
+    """
+    Builds the chat model, prompt templates, chains and agent once and reuses them.
+
+    The chains and the agent hold no conversation memory, so a single instance is safe to
+    share across threads; construction is guarded by a lock so concurrent first requests
+    build each object only once. All OpenAI calls go through one pooled HTTP session.
+    """
+    def __init__(self, tools, model_name="gpt-4", request_timeout=60.0, max_retries=2,
+                 http_pool_size=16, verbose=True):
+        self.tools = tools
+        self.model_name = model_name
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.verbose = verbose
+        self.session = build_http_session(http_pool_size)
+        if openai is not None:
+            # openai<1.0 reads the module-level session for every request
+            openai.requestssession = self.session
+        self._lock = threading.Lock()
+        self._llm = None
+        self._chains = {}
+        self._agent = None
+
+    @classmethod
+    def from_env(cls, tools):
+        return cls(tools, **SQLAgentRuntimeConfig.get_config())
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    self._llm = ChatOpenAI(temperature=0, model_name=self.model_name,
+                                           request_timeout=self.request_timeout, max_retries=self.max_retries)
+        return self._llm
+
+    def chain(self, name):
+        """
+        Returns the shared LLMChain for one of PROMPT_TEMPLATES.
+        """
+        chain = self._chains.get(name)
+        if chain is None:
+            llm = self.llm
+            with self._lock:
+                chain = self._chains.get(name)
+                if chain is None:
+                    chain = self._chains[name] = LLMChain(
+                        llm=llm,
+                        prompt=PromptTemplate.from_template(PROMPT_TEMPLATES[name])
+                    )
+        return chain
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            llm = self.llm
+            with self._lock:
+                if self._agent is None:
+                    self._agent = initialize_agent(self.tools, llm, agent=AgentType.CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+                                                   verbose=self.verbose)
+        return self._agent
+
+    def warm_up(self, warm_ups=()):
+        """
+        Builds every chain and the agent ahead of the first request, then runs the extra
+        warm-up callables (e.g. loading the schema catalog). Failures are logged, not raised.
+        """
+        for name in PROMPT_TEMPLATES:
+            self.chain(name)
+        self.agent
+        for warm_up in warm_ups:
+            try:
+                warm_up()
+            except Exception as e:
+                logging.warning(f"SQL agent warm-up step failed: {e}")
@@ -0,0 +1,151 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+PASS = "True"
+
+DELETE_REFUSAL = (
+    "I'm sorry, but your message failed some of our safety checks: it looks like it is intended to remove "
+    "some information, which is not allowed. If you think there is an error feel free to contact the A1 team. "
+    "If there is anything else I can do for you, let me know."
+)
+
+# Unambiguous destructive SQL: refused without asking the LLM. Only statement-shaped text
+# matches (a keyword pair, an identifier, then the end of the statement or a WHERE clause),
+# so prose like "truncate long titles" or "delete from cart fails" goes to the LLM check.
+_SQL_IDENTIFIER = r"[\w.\"`\[\]]+"
+_STATEMENT_END = r"\s*(;|$)"
+DESTRUCTIVE_SQL_RE = re.compile(
+    rf"\b(drop\s+(table|database|schema|view)\s+(if\s+exists\s+)?{_SQL_IDENTIFIER}{_STATEMENT_END}"
+    rf"|truncate\s+table\s+{_SQL_IDENTIFIER}"
+    rf"|delete\s+from\s+{_SQL_IDENTIFIER}({_STATEMENT_END}|\s+where\b)"
+    rf"|alter\s+table\s+{_SQL_IDENTIFIER}\s+drop\s+(column\s+)?{_SQL_IDENTIFIER}{_STATEMENT_END})",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Any wording that could express a deletion intent; messages without it skip the LLM check.
+DELETE_VOCABULARY_RE = re.compile(
+    r"\b(delet\w*|drop\w*|truncat\w*|remov\w*|eras\w*|wip\w*|purg\w*|destroy\w*|clear\w*|discard\w*|"
+    r"get\s+rid|throw\s+away|cancel\w*|undo\w*)\b",
+    re.IGNORECASE,
+)
+
+
+class SafetyCheckConfig:
+    """
+    Configuration for the SQL agent safety checks.
+    """
+    FAST_PASS = os.getenv('SAFETY_PREFILTER_FAST_PASS', 'false').lower() == 'true'
+    CACHE_SIZE = int(os.getenv('SAFETY_VERDICT_CACHE_SIZE', '10000'))
+    MAX_WORKERS = int(os.getenv('SAFETY_MAX_WORKERS', '8'))
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of safety check engine parameters.
+        """
+        return {"max_workers": cls.MAX_WORKERS, "cache_size": cls.CACHE_SIZE}
+
+
+def normalize_input(input):
+    """
+    Collapses whitespace and case so trivially different messages share a memoized verdict.
+    """
+    return " ".join(str(input).split()).casefold()
+
+
+def delete_prefilter(input, fast_pass=None):
+    """
+    Decides obvious delete-intent cases locally.
+
+    Returns:
+        str or None: DELETE_REFUSAL for destructive SQL, "True" when the message has no
+        deletion vocabulary at all (if fast_pass is enabled), None when the LLM must decide.
+    """
+    fast_pass = SafetyCheckConfig.FAST_PASS if fast_pass is None else fast_pass
+    if DESTRUCTIVE_SQL_RE.search(input):
+        return DELETE_REFUSAL
+    if fast_pass and not DELETE_VOCABULARY_RE.search(input):
+        return PASS
+    return None
+
+
+class SafetyCheckEngine:
+    """
+    Runs independent safety checks concurrently and stops at the first failure.
+
+    Each check is a callable returning "True" or a refusal message. Local prefilters can
+    decide a check without calling it, and verdicts are memoized per (check, normalized
+    input), so repeating a check on the same input is free.
+    """
+    def __init__(self, checks, prefilters=None, max_workers=None, cache_size=None):
+        config = SafetyCheckConfig.get_config()
+        self.checks = checks
+        self.prefilters = prefilters or {}
+        self.cache_size = config["cache_size"] if cache_size is None else cache_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or config["max_workers"],
+                                            thread_name_prefix="safety-check")
+        self._lock = threading.Lock()
+        self._verdicts = OrderedDict()
+        self.stats = {"llm_calls": 0, "memo_hits": 0, "prefiltered": 0}
+
+    def _cached(self, key):
+        with self._lock:
+            verdict = self._verdicts.get(key)
+            if verdict is not None:
+                self._verdicts.move_to_end(key)
+                self.stats["memo_hits"] += 1
+            return verdict
+
+    def _remember(self, key, verdict):
+        with self._lock:
+            self._verdicts[key] = verdict
+            if len(self._verdicts) > self.cache_size:
+                self._verdicts.popitem(last=False)
+
+    def _run_check(self, name, input, key):
+        with self._lock:
+            self.stats["llm_calls"] += 1
+        verdict = self.checks[name](input)
+        self._remember(key, verdict)
+        return verdict
+
+    def run(self, input, names=None):
+        """
+        Runs the named checks (all by default) and returns "True" if every check passed,
+        otherwise the first failing check's message.
+        """
+        names = list(names or self.checks)
+        normalized = normalize_input(input)
+        pending = []
+        for name in names:
+            key = (name, normalized)
+            verdict = self._cached(key)
+            if verdict is None and name in self.prefilters:
+                verdict = self.prefilters[name](input)
+                if verdict is not None:
+                    with self._lock:
+                        self.stats["prefiltered"] += 1
+                    self._remember(key, verdict)
+            if verdict is None:
+                pending.append((name, key))
+            elif verdict != PASS:
+                return verdict
+
+        futures = {self._executor.submit(self._run_check, name, input, key): name for name, key in pending}
+        try:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = futures.pop(future)
+                    verdict = future.result()
+                    if verdict != PASS:
+                        logging.info(f"Safety check '{name}' failed")
+                        return verdict
+            return PASS
+        finally:
+            # Checks not started yet are dropped; running ones finish and memoize their verdict.
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from sqlalchemy import MetaData, text
+from sql_agent.engine_registry import get_engine
+
+# Per-table fingerprints that change whenever a table's columns, types, comments or
+# foreign keys change, i.e. anything reflect_schema puts in the schema or details.
+POSTGRES_FINGERPRINT_QUERY = """
+SELECT c.relname,
+       md5(string_agg(a.attname || ':' || format_type(a.atttypid, a.atttypmod)
+                      || ':' || coalesce(col_description(c.oid, a.attnum), ''), ',' ORDER BY a.attnum)
+           || '|' || coalesce(obj_description(c.oid, 'pg_class'), '')
+           || '|' || coalesce((SELECT string_agg(pg_get_constraintdef(k.oid), ',' ORDER BY k.conname)
+                               FROM pg_catalog.pg_constraint k
+                               WHERE k.conrelid = c.oid AND k.contype = 'f'), ''))
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+WHERE c.relkind IN ('r', 'p') AND n.nspname = current_schema()
+GROUP BY c.oid, c.relname;
+"""
+
+# The CREATE TABLE statement includes foreign keys (SQLite has no catalog comments).
+SQLITE_FINGERPRINT_QUERY = """
+SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%';
+"""
+
+
+class SchemaCatalogConfig:
+    """
+    Configuration for the SQL agent schema catalog.
+    """
+    TTL = float(os.getenv('SCHEMA_CATALOG_TTL', '60'))
+    CACHE_PATH = os.getenv('SCHEMA_CATALOG_CACHE_PATH')
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of schema catalog parameters.
+        """
+        return {"ttl": cls.TTL, "cache_path": cls.CACHE_PATH}
+
+
+def reflect_schema(engine, only=None):
+    """
+    Reflects the given tables (all tables if only is None).
+
+    Returns:
+        tuple: (schema_dict, details) where schema_dict maps table names to (column, type)
+        pairs and details holds table/column comments and foreign keys per table.
+    """
+    metadata = MetaData()
+    metadata.reflect(bind=engine, only=only)
+    schema_dict, details = {}, {}
+    for table in metadata.sorted_tables:
+        full_table_name = f"{table.schema}.{table.name}" if table.schema else table.name
+        schema_dict[full_table_name] = [(column.name, str(column.type)) for column in table.columns]
+        details[full_table_name] = {
+            "comment": table.comment,
+            "column_comments": {column.name: column.comment for column in table.columns if column.comment},
+            "foreign_keys": {fk.parent.name: f"{fk.column.table.name}.{fk.column.name}" for fk in table.foreign_keys},
+        }
+    return schema_dict, details
+
+
+def reflect_tables(engine, only=None):
+    """
+    Reflects the given tables (all tables if only is None) into the schema dictionary format.
+    """
+    return reflect_schema(engine, only)[0]
+
+
+class SchemaCatalog:
+    """
+    Reflects a database schema once and keeps it, with its JSON serialization, in memory
+    (and optionally on disk).
+
+    After ttl seconds the catalog compares cheap per-table fingerprints from pg_catalog
+    (or sqlite_master) with the cached ones and re-reflects only the tables that were
+    added or changed. Dialects without fingerprints fall back to a full reflection per ttl.
+    """
+    def __init__(self, connection_string, ttl=60.0, cache_path=None, engine=None):
+        self.engine = engine or get_engine(connection_string)
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._schema = None
+        self.details = None
+        self._fingerprints = None
+        self._checked_at = 0.0
+        self.schema_str = None
+        self.version = None
+        self.stats = {"full_reflections": 0, "tables_reflected": 0, "checks": 0}
+        if cache_path and os.path.exists(cache_path):
+            self._load()
+
+    def _fetch_fingerprints(self):
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            query = POSTGRES_FINGERPRINT_QUERY
+        elif dialect == "sqlite":
+            query = SQLITE_FINGERPRINT_QUERY
+        else:
+            return None
+        with self.engine.connect() as connection:
+            rows = connection.execute(text(query)).fetchall()
+        return {name: hashlib.md5(str(marker).encode()).hexdigest() for name, marker in rows}
+
+    def _set_schema(self, schema, details, fingerprints):
+        self._schema = schema
+        self.details = details
+        self._fingerprints = fingerprints
+        self._checked_at = time.monotonic()
+        self.schema_str = json.dumps(schema, indent=2)
+        # Comments and foreign keys live in details; they change the version like columns do.
+        details_str = json.dumps(details, sort_keys=True, default=str)
+        self.version = hashlib.sha1(f"{self.schema_str}\n{details_str}".encode()).hexdigest()[:16]
+        if self.cache_path:
+            self._save()
+
+    def _refresh(self):
+        self.stats["checks"] += 1
+        fingerprints = self._fetch_fingerprints()
+        if self._schema is None or fingerprints is None or self._fingerprints is None:
+            schema, details = reflect_schema(self.engine)
+            self.stats["full_reflections"] += 1
+            self.stats["tables_reflected"] += len(schema)
+            self._set_schema(schema, details, fingerprints)
+            return
+
+        changed = [name for name, marker in fingerprints.items() if self._fingerprints.get(name) != marker]
+        removed = set(self._fingerprints) - set(fingerprints)
+        if not changed and not removed:
+            self._checked_at = time.monotonic()
+            return
+
+        logging.info(f"Schema changed: refreshing {len(changed)} tables, dropping {len(removed)}")
+        schema = {name: columns for name, columns in self._schema.items() if name not in removed}
+        details = {name: info for name, info in self.details.items() if name not in removed}
+        if changed:
+            changed_schema, changed_details = reflect_schema(self.engine, only=changed)
+            schema.update(changed_schema)
+            details.update(changed_details)
+            self.stats["tables_reflected"] += len(changed)
+        self._set_schema(schema, details, fingerprints)
+
+    def get_schema(self):
+        """
+        Returns the cached schema dictionary, refreshing changed tables once the ttl expired.
+        """
+        with self._lock:
+            if self._schema is None or time.monotonic() - self._checked_at >= self.ttl:
+                self._refresh()
+            return self._schema
+
+    def get_schema_str(self):
+        """
+        Returns the precomputed JSON serialization of the schema.
+        """
+        self.get_schema()
+        return self.schema_str
+
+    def invalidate(self):
+        """
+        Forces a fingerprint check on the next access.
+        """
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _save(self):
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"schema": self._schema, "details": self.details, "fingerprints": self._fingerprints}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _load(self):
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable schema cache {self.cache_path}: {e}")
+            return
+        schema = {name: [tuple(column) for column in columns] for name, columns in cached["schema"].items()}
+        self._set_schema(schema, cached.get("details", {}), cached["fingerprints"])
+        # Validate against the live database on first use.
+        self._checked_at = 0.0
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_schema_catalog(connection_string):
+    """
+    Returns the process-wide SchemaCatalog for the connection string.
+    """
+    with _catalogs_lock:
+        catalog = _catalogs.get(connection_string)
+        if catalog is None:
+            catalog = _catalogs[connection_string] = SchemaCatalog(connection_string,
+                                                                   **SchemaCatalogConfig.get_config())
+        return catalog
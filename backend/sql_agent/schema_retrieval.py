@@ -0,0 +1,185 @@
+import math
+import os
+import re
+import threading
+import numpy as np
+
+_SPLIT_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+
+class SchemaRetrievalConfig:
+    """
+    Configuration for relevance-pruned schema context.
+    """
+    TOP_K = int(os.getenv('SCHEMA_CONTEXT_TOP_K', '8'))
+    INCLUDE_FK_NEIGHBORS = os.getenv('SCHEMA_CONTEXT_FK_NEIGHBORS', 'true').lower() == 'true'
+    MAX_NEIGHBORS = int(os.getenv('SCHEMA_CONTEXT_MAX_FK_NEIGHBORS', '3'))
+    MAX_TABLES = int(os.getenv('SCHEMA_CONTEXT_MAX_TABLES', '16'))
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of schema retrieval parameters.
+        """
+        return {
+            "top_k": cls.TOP_K,
+            "include_fk_neighbors": cls.INCLUDE_FK_NEIGHBORS,
+            "max_neighbors": cls.MAX_NEIGHBORS,
+            "max_tables": cls.MAX_TABLES,
+        }
+
+
+def tokenize_identifier(text):
+    """
+    Splits identifiers and prose into lowercase terms: "dueDate_utc" -> ["due", "date", "utc"].
+    Plural "s" is stripped so "tasks" matches "task".
+    """
+    terms = []
+    for term in _SPLIT_RE.findall(text or ""):
+        term = term.lower()
+        if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+class SchemaIndex:
+    """
+    BM25 index over tables, built from table names (weighted up), column names and comments.
+
+    Postings are stored as NumPy arrays per term, so scoring a question is a handful of
+    vectorized scatter-adds regardless of how many tables the schema has.
+    """
+    TABLE_NAME_WEIGHT = 3
+
+    def __init__(self, schema, details=None, k1=1.2, b=0.75):
+        details = details or {}
+        self.tables = list(schema)
+        self.schema = schema
+        self.details = details
+        self.k1 = k1
+        self.b = b
+
+        documents = []
+        for name in self.tables:
+            info = details.get(name) or {}
+            terms = tokenize_identifier(name) * self.TABLE_NAME_WEIGHT
+            terms += tokenize_identifier(info.get("comment"))
+            for column, _ in schema[name]:
+                terms += tokenize_identifier(column)
+                terms += tokenize_identifier((info.get("column_comments") or {}).get(column))
+            documents.append(terms)
+
+        self.doc_lengths = np.array([len(terms) for terms in documents], dtype=np.float32)
+        self.avg_length = float(self.doc_lengths.mean()) if len(documents) else 0.0
+        postings = {}
+        for doc_id, terms in enumerate(documents):
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(doc_id)
+                postings[term][1].append(count)
+        n = len(documents)
+        self.postings = {}
+        for term, (doc_ids, counts) in postings.items():
+            idf = math.log(1 + (n - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            self.postings[term] = (np.array(doc_ids), np.array(counts, dtype=np.float32), idf)
+
+        # Foreign keys in both directions, by table name.
+        self.neighbors = {name: set() for name in self.tables}
+        short_names = {name.split(".")[-1]: name for name in self.tables}
+        for name in self.tables:
+            for target in ((details.get(name) or {}).get("foreign_keys") or {}).values():
+                referred = short_names.get(target.split(".")[0])
+                if referred and referred != name:
+                    self.neighbors[name].add(referred)
+                    self.neighbors[referred].add(name)
+        # Fallback for questions matching no table: the most connected tables first.
+        self.hubs = sorted(self.tables, key=lambda name: -len(self.neighbors[name]))
+
+    def score(self, question):
+        """
+        Returns the BM25 score of every table for the question.
+        """
+        scores = np.zeros(len(self.tables), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / (self.avg_length or 1.0))
+        for term in set(tokenize_identifier(question)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            doc_ids, counts, idf = posting
+            scores[doc_ids] += idf * counts * (self.k1 + 1) / (counts + norm[doc_ids])
+        return scores
+
+    def select(self, question, top_k=8, include_fk_neighbors=True, max_neighbors=3, max_tables=16):
+        """
+        Returns the names of the top_k most relevant tables plus their foreign-key neighbors:
+        at most max_neighbors per selected table, highest BM25 score first, and never more
+        than max_tables tables in total, so a hub table referenced by hundreds of others
+        does not pull them all in.
+        If nothing in the question matches the schema, returns the top_k tables with the
+        most foreign-key links, so a vague question still gets a pruned context.
+        """
+        scores = self.score(question)
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return self.hubs[:top_k]
+        best = matched[np.argsort(-scores[matched], kind="stable")[:top_k]]
+        selected = [self.tables[i] for i in best]
+        if include_fk_neighbors:
+            position = {name: i for i, name in enumerate(self.tables)}
+            seen = set(selected)
+            for name in list(selected):
+                candidates = sorted((neighbor for neighbor in self.neighbors[name] if neighbor not in seen),
+                                    key=lambda neighbor: (-scores[position[neighbor]], neighbor))
+                for neighbor in candidates[:max_neighbors]:
+                    if len(selected) >= max_tables:
+                        return selected
+                    seen.add(neighbor)
+                    selected.append(neighbor)
+        return selected
+
+    def serialize(self, tables):
+        """
+        Compact one-line-per-table serialization: table(column TYPE, fk_column TYPE -> other.id).
+        """
+        lines = []
+        for name in tables:
+            foreign_keys = (self.details.get(name) or {}).get("foreign_keys") or {}
+            columns = ", ".join(
+                f"{column} {column_type}" + (f" -> {foreign_keys[column]}" if column in foreign_keys else "")
+                for column, column_type in self.schema[name]
+            )
+            lines.append(f"{name}({columns})")
+        return "\n".join(lines)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_schema_index(catalog):
+    """
+    Returns the SchemaIndex for the catalog's current schema version, rebuilding it after changes.
+    """
+    schema = catalog.get_schema()
+    key = id(catalog)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is None or cached[0] != catalog.version:
+            cached = _indexes[key] = (catalog.version, SchemaIndex(schema, catalog.details))
+        return cached[1]
+
+
+def build_schema_context(question, catalog, top_k=None, include_fk_neighbors=None):
+    """
+    Returns the compact schema serialization of only the tables relevant to the question.
+    """
+    config = SchemaRetrievalConfig.get_config()
+    top_k = config["top_k"] if top_k is None else top_k
+    include_fk_neighbors = config["include_fk_neighbors"] if include_fk_neighbors is None else include_fk_neighbors
+    index = get_schema_index(catalog)
+    selected = index.select(question, top_k, include_fk_neighbors, config["max_neighbors"], config["max_tables"])
+    return index.serialize(selected)
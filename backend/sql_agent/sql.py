@@ -1,23 +1,32 @@
 # Import required libraries and modules
 import asyncio
 import logging
+import threading
 from sqlalchemy import create_engine, text
 from functools import partial
-from langchain.agents import AgentType
-from langchain import LLMChain, OpenAI, PromptTemplate, SQLDatabase
-from langchain.agents import Tool, initialize_agent, tool
-from langchain.chat_models import ChatOpenAI
+from langchain.agents import Tool, tool
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import create_engine
 from sqlalchemy import create_engine, MetaData
-from langchain import PromptTemplate, OpenAI, LLMChain
 import os
 import json
 from src.config import DATABASE_URL
+from sql_agent.schema_catalog import get_schema_catalog
+from sql_agent.schema_retrieval import build_schema_context
+from sql_agent.engine_registry import get_engine
+from sql_agent.safety_checks import SafetyCheckEngine, delete_prefilter
+from sql_agent.query_cache import get_query_cache
+from sql_agent.cost_guard import CostGuardConfig, QueryGuard, QueryRejected, stream_result_text
+from sql_agent.runtime import SQL_GENERATION_TEMPLATE, SQLAgentRuntime
+
+RESULT_BATCH_SIZE = int(os.getenv('SQL_AGENT_RESULT_BATCH_SIZE', '500'))
+query_guard = QueryGuard.from_env()
 
 def get_sql_db_schema(connection_string):
     """
     Retrieve the schema of the SQL database.
+    The schema is served from the process-wide SchemaCatalog, which reflects the database
+    once and afterwards only re-reflects tables that changed.
 
     Args:
         connection_string (str): The connection string for the database.
@@ -26,22 +35,45 @@ def get_sql_db_schema(connection_string):
         dict: A dictionary representing the database schema.
     """
     try:
-        # Create a SQLAlchemy engine using the provided connection string
-        engine = create_engine(connection_string)
+        return get_schema_catalog(connection_string).get_schema()
 
-        # Create a MetaData object
-        metadata = MetaData()
+    except Exception as e:
+        print(f"Error: {e}")
+        return None
 
-        # Reflect the database schema
-        metadata.reflect(bind=engine)
+def get_sql_db_schema_context(input_str, connection_string):
+    """
+    Retrieve a compact serialization of only the tables relevant to the input
+    (top-k by BM25 plus their foreign-key neighbors).
 
-        # Access the tables and columns using the MetaData object
-        schema_dict = {}
-        for table in metadata.sorted_tables:
-            full_table_name = f"{table.schema}.{table.name}" if table.schema else table.name
-            schema_dict[full_table_name] = [(column.name, str(column.type)) for column in table.columns]
+    Args:
+        input_str (str): Input prompt.
+        connection_string (str): The connection string for the database.
 
-        return schema_dict
+    Returns:
+        str: The pruned schema, or None on error.
+    """
+    try:
+        return build_schema_context(input_str, get_schema_catalog(connection_string))
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return None
+
+def get_sql_db_schema_version(connection_string):
+    """
+    Retrieve the version hash of the current database schema.
+
+    Args:
+        connection_string (str): The connection string for the database.
+
+    Returns:
+        str: The schema version, or None on error.
+    """
+    try:
+        catalog = get_schema_catalog(connection_string)
+        catalog.get_schema()
+        return catalog.version
 
     except Exception as e:
         print(f"Error: {e}")
@@ -58,16 +90,10 @@ def generate_prompt_template(input_str: str, database_url: str) -> str:
     Returns:
         str: Generated prompt template.
     """
-    db_schema = get_sql_db_schema(database_url)
-    if db_schema is None:
+    schema_str = get_sql_db_schema_context(input_str, database_url)
+    if schema_str is None:
         return "Error: Unable to retrieve the database schema."
-    schema_str = json.dumps(db_schema, indent=2)
-    prompt_template = (
-        f"Given this SQL database schema:\n\n{schema_str}\n\n"
-        f"Return an SQL query to insert data into the database based on this prompt: {input_str}.\n"
-        "You are only allowed to return the query in SQL language, nothing else, no text or anything else."
-    )
-    return prompt_template
+    return SQL_GENERATION_TEMPLATE.format(schema=schema_str, input=input_str)
 
 @tool
 def insert_data(input_str: str) -> str:
@@ -80,39 +106,42 @@ def insert_data(input_str: str) -> str:
     Returns:
         str: Result message.
     """
-    # Safety check before generating SQL query
-    safety_result = safetydelete_chain(input_str)
+    # Safety check before generating SQL query (memoized, usually already decided by process_input)
+    safety_result = safety_engine.run(input_str, ["delete"])
     if safety_result != "True":
         return "Error: Safety check failed. Your input indicates an attempt to delete data."
 
     # Prompt for generating SQL query based on input
-    db_schema = get_sql_db_schema(DATABASE_URL)
-    if db_schema is None:
+    schema_str = get_sql_db_schema_context(input_str, DATABASE_URL)
+    if schema_str is None:
         return "Error: Unable to retrieve the database schema."
 
-    schema_str = json.dumps(db_schema, indent=2)
-    template = generate_prompt_template(input_str, DATABASE_URL)
-
-    prompt = PromptTemplate(template=template, input_variables=["schema", "input"])
-
-    llm = ChatOpenAI(temperature=0, model_name="gpt-4")
-    llm_chain = LLMChain(llm=llm, prompt=prompt)
-
-    # Generate SQL query using the prompt and user input
-    query = llm_chain.predict(schema=schema_str, input=input_str)
+    # Generate SQL query using the shared prompt chain and user input
+    query = get_runtime().chain("sql_generation").predict(schema=schema_str, input=input_str)
 
     logging.info(query)
 
     try:
-        # Create the SQLAlchemy engine
-        engine = create_engine(DATABASE_URL)
+        # Use the shared, pooled engine
+        engine = get_engine(DATABASE_URL)
 
-        # Create a connection and execute the query
-        with engine.connect() as connection:
+        # Execute the query in a transaction that commits on success
+        with engine.begin() as connection:
+            # EXPLAIN first: reject statements over the cost/row limits
+            query = query_guard.check(connection, query)
             connection.execute(text(query))
 
+        # Cached query results may now be stale
+        query_cache = get_query_cache()
+        if query_cache:
+            query_cache.invalidate_results()
+
         return "Data inserted successfully using SQLAlchemy"
 
+    # Handle queries rejected by the cost guard:
+    except QueryRejected as rejected:
+        return f"Error: {rejected}"
+
     # Handle database errors using SQLAlchemyError:
     except SQLAlchemyError as error:
         logging.exception("SQLAlchemy error")
@@ -133,40 +162,62 @@ def extract_data(input_str: str) -> str:
     Returns:
         str: Extracted data.
     """
-    # Safety check before generating SQL query
-    safety_result = safetydelete_chain(input_str)
+    # Safety check before generating SQL query (memoized, usually already decided by process_input)
+    safety_result = safety_engine.run(input_str, ["delete"])
     if safety_result != "True":
         return "Error: Safety check failed. Your input indicates an attempt to delete data."
 
-    # Prompt for generating SQL query based on input
-    db_schema = get_sql_db_schema(DATABASE_URL)
-    if db_schema is None:
-        return "Error: Unable to retrieve the database schema."
-
-    schema_str = json.dumps(db_schema, indent=2)
-    template = generate_prompt_template(input_str, DATABASE_URL)
+    # Reuse SQL generated earlier for the same question template and schema version
+    query_cache = get_query_cache()
+    schema_version = get_sql_db_schema_version(DATABASE_URL)
+    cached = query_cache.lookup(input_str, schema_version) if query_cache and schema_version else None
 
-    prompt = PromptTemplate(template=template, input_variables=["schema", "input"])
+    if cached is not None:
+        query, params = cached
+    else:
+        # Prompt for generating SQL query based on input
+        schema_str = get_sql_db_schema_context(input_str, DATABASE_URL)
+        if schema_str is None:
+            return "Error: Unable to retrieve the database schema."
 
-    llm = ChatOpenAI(temperature=0, model_name="gpt-4")
-    llm_chain = LLMChain(llm=llm, prompt=prompt)
-
-    # Generate SQL query using the prompt and user input
-    query = llm_chain.predict(schema=schema_str, input=input_str)
+        # Generate SQL query using the shared prompt chain and user input
+        query = get_runtime().chain("sql_generation").predict(schema=schema_str, input=input_str)
+        params = {}
 
     logging.info(query)
 
     try:
-        # Create the SQLAlchemy engine
-        engine = create_engine(DATABASE_URL)
+        if query_cache:
+            cached_result = query_cache.get_result(query, params)
+            if cached_result is not None:
+                return cached_result
+
+        # Use the shared, pooled engine
+        engine = get_engine(DATABASE_URL)
 
-        # Create a connection and execute the query
+        # Stream the result instead of fetching it all into memory
         with engine.connect() as connection:
-            result = connection.execute(text(query))
+            # EXPLAIN first: reject expensive statements, cap rows and set the statement timeout
+            guarded_query = query_guard.check(connection, query, params)
+
+            # No server-side PREPARE: psycopg2 interpolates parameters client-side, so a cached
+            # template plus bind parameters (and SQLAlchemy's compiled cache) is the reuse we get.
+            result = connection.execution_options(yield_per=RESULT_BATCH_SIZE).execute(text(guarded_query), params)
+
+            extracted_data = stream_result_text(result, CostGuardConfig.MAX_RESULT_ROWS,
+                                                CostGuardConfig.MAX_RESULT_BYTES)
 
-            extracted_data = str(result.fetchall())
+            if query_cache and schema_version and cached is None:
+                # Only statements the cost guard accepted are cached; they run with bind parameters from now on
+                query, params = query_cache.store(input_str, schema_version, query, connection) or (query, params)
 
-            return extracted_data
+        if query_cache:
+            query_cache.put_result(query, params, extracted_data)
+        return extracted_data
+
+    # Handle queries rejected by the cost guard:
+    except QueryRejected as rejected:
+        return f"Error: {rejected}"
 
     # Handle database errors using SQLAlchemyError:
     except SQLAlchemyError as error:
@@ -179,32 +230,16 @@ def extract_data(input_str: str) -> str:
 
 def AgentSQL(input):
     """
-    Initialize and run AgentSQL.
+    Run the shared AgentSQL agent.
 
     Args:
         input: User input.
     """
-    SQL_query_tool = Tool(
-            name="SQL query",
-            func=extract_data,
-            description="Useful when the input is a question",
-        )
-
-    SQL_in_tool = Tool(
-            name="SQL input",
-            func=insert_data,
-            description="Useful when the input is a statement",
-        )
-
-    tools = [SQL_in_tool, SQL_query_tool]
-
-    chat_model = ChatOpenAI(temperature=0,model_name="gpt-4")
-    agent = initialize_agent(tools, chat_model, agent=AgentType.CHAT_ZERO_SHOT_REACT_DESCRIPTION, verbose=True)
-    agent.run(input)
+    get_runtime().agent.run(input)
 
 def process_input(input,discord_id,channel_id):
     """
-    Run safety_chain and then AgentSQL based on safety check result.
+    Run the safety chains and then AgentSQL based on the safety check result.
 
     Args:
         input: User input.
@@ -213,26 +248,13 @@ def process_input(input,discord_id,channel_id):
         str: Safety result or None.
     """
     
-    # Call the safetydelete_chain function first
-    safety_result_delete = safetydelete_chain(input)
-
-    # Check if the safety result is not True (failed)
-    if safety_result_delete != "True":
-        return safety_result_delete
-
-    # Call the safetyinvalid_chain function
-    safety_result_invalid = safetyinvalid_chain(input)
+    # Run the delete, invalid-input and completeness checks concurrently,
+    # stopping at the first one that fails
+    safety_result = safety_engine.run(input, ["delete", "invalid", "complete"])
 
     # Check if the safety result is not True (failed)
-    if safety_result_invalid != "True":
-        return safety_result_invalid
-    
-    # Call the safetycomplete_chain function
-    safety_result_complete = safetycomplete_chain(input)
-
-    # Check if the safety result is not True (failed)
-    if safety_result_complete != "True":
-        return safety_result_complete
+    if safety_result != "True":
+        return safety_result
 
     # All safety checks passed, proceed with the AgentSQL function
     input = input + f"also the channel id is {channel_id} and the discord id is {discord_id} and it was created by {discord_id}."
@@ -248,28 +270,7 @@ def safetycomplete_chain(input):
     Returns:
         str: Safety result.
     """
-    prompt_template = (
-        "Make sure that the following message contains the answer to all of the following questions. "
-        "If any of the questions are missing, please return 'I'm sorry but I believe you forgot to add...' "
-        "and the missing information followed by 'Please invoke the Task Creation command again and add the missing info to your message "
-        "(And re-insert the original input in quotes so they can copy-paste it, without the question mark)'. "
-        "The questions are as follows:\n"
-        "- What is the task name?\n"
-        "- What is the task description?\n"
-        "- When does the task start?\n"
-        "- When is the due date?\n"
-        "- When is the expected completion date?\n"
-        "- Who is it assigned to or who is responsible for the task?\n"
-        "If everything is there, return 'True'. The message is as follows: {input}."
-    )
-
-    llm = ChatOpenAI(temperature=0, model_name="gpt-4")
-    llm_chain = LLMChain(
-        llm=llm,
-        prompt=PromptTemplate.from_template(prompt_template)
-    )
-
-    return llm_chain.run(input)
+    return get_runtime().chain("safety_complete").run(input)
 
 def safetydelete_chain(input):
     """
@@ -281,19 +282,7 @@ def safetydelete_chain(input):
     Returns:
         str: Safety result.
     """
-    prompt_template = (
-        "Make sure that the following message does not contain anything with the intention of deleting a task or anything from a database. If it does please just return a nice message explaning that the message failed some safety checks about deletion of some data (do not explicitely say deltion of tasks or database) and possibly is intended to delete some information which is forbidden but be very nice about it add 'if you think there is an error feel free to contact the A1 team if there is anything else i can do for you let me know\n"
-        "If everything is there, return 'True'.The message is as follows: {input}?"
-    
-    )
-
-    llm = ChatOpenAI(temperature=0, model_name="gpt-4")
-    llm_chain = LLMChain(
-        llm=llm,
-        prompt=PromptTemplate.from_template(prompt_template)
-    )
-
-    return llm_chain.run(input)
+    return get_runtime().chain("safety_delete").run(input)
 
 def safetyinvalid_chain(input):
     """
@@ -305,17 +294,42 @@ def safetyinvalid_chain(input):
     Returns:
         str: Safety result.
     """
-    prompt_template = (
-        "Make sure that the following message does not contain describing a discord id or a channel or project id. please just return a nice message explaning that the message failed some safety checks about invalid inputs state that is probably related to users ids (do not explicitely say discord id or channel id) which could generate some issues in my (say my system not our) system but be very nice about it add 'if you think there is an error feel free to contact the A1 team if there is anything else i can do for you let me know do not say anything other than that\n"
-        "If everything is there, return 'True'.The message is as follows: {input}?"
-    
-    )
+    return get_runtime().chain("safety_invalid").run(input)
+
+# Shared safety-check engine: local pre-filter for obvious delete intents,
+# memoized verdicts and concurrent LLM checks
+safety_engine = SafetyCheckEngine(
+    {"delete": safetydelete_chain, "invalid": safetyinvalid_chain, "complete": safetycomplete_chain},
+    prefilters={"delete": delete_prefilter}
+)
 
-    llm = ChatOpenAI(temperature=0, model_name="gpt-4")
-    llm_chain = LLMChain(
-        llm=llm,
-        prompt=PromptTemplate.from_template(prompt_template)
-    )
+_runtime = None
+_runtime_lock = threading.Lock()
+
+def get_runtime():
+    """
+    Returns the process-wide SQLAgentRuntime with the SQL input and query tools.
+    """
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            tools = [
+                Tool(name="SQL input", func=insert_data, description="Useful when the input is a statement"),
+                Tool(name="SQL query", func=extract_data, description="Useful when the input is a question"),
+            ]
+            _runtime = SQLAgentRuntime.from_env(tools)
+        return _runtime
+
+def warm_up():
+    """
+    Builds the LLM client, chains and agent and loads the schema and a pooled database
+    connection, so the first request in a new worker is not the slow one.
+    """
+    def load_schema():
+        build_schema_context("", get_schema_catalog(DATABASE_URL))
 
-    return llm_chain.run(input)
+    def open_connection():
+        with get_engine(DATABASE_URL).connect() as connection:
+            connection.execute(text("SELECT 1"))
 
+    get_runtime().warm_up([load_schema, open_connection])
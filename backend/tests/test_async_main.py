@@ -0,0 +1,125 @@
+import asyncio
+import json
+import unittest
+from aiohttp import web
+from aiohttp.test_utils import AioHTTPTestCase, TestServer
+from async_main import create_app, write_event_if_connected
+
+
+def make_stub_app(delays):
+    async def vectara_query(request):
+        await asyncio.sleep(delays["vectara"])
+        return web.json_response({"results": [{"text": "Clean rooms.", "score": 0.9}]})
+
+    async def chat_completions(request):
+        body = await request.json()
+        if not body.get("stream"):
+            return web.json_response({"choices": [{"message": {"content": "Guests value clean rooms."}}]})
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for token in ("Guests", " value", " clean rooms."):
+            chunk = {"choices": [{"delta": {"content": token}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    app = web.Application()
+    app.router.add_post('/v1/query', vectara_query)
+    app.router.add_post('/v1/chat/completions', chat_completions)
+    return app
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class AsyncPipelineTestCase(AioHTTPTestCase):
+    delays = {"vectara": 0.0}
+    config = {}
+
+    async def asyncSetUp(self):
+        self.stub = TestServer(make_stub_app(self.delays))
+        await self.stub.start_server()
+        await super().asyncSetUp()
+
+    async def asyncTearDown(self):
+        await super().asyncTearDown()
+        await self.stub.close()
+
+    async def get_application(self):
+        stub_url = str(self.stub.make_url("")).rstrip("/")
+        return create_app({
+            "vectara_api_url": stub_url,
+            "openai_api_url": stub_url,
+            "vectara_api_key": "stub",
+            "vectara_customer_id": "stub",
+            "vectara_corpus_id": "stub",
+            "openai_api_key": "stub",
+            "chat_history_enabled": False,
+            **self.config,
+        })
+
+
+class TestGenerateResponse(AsyncPipelineTestCase):
+    async def test_generates_response(self):
+        async with self.client.post("/generate-response", json={"query": "great hotels"}) as response:
+            self.assertEqual(response.status, 200)
+            self.assertEqual(await response.json(), {"response": "Guests value clean rooms."})
+
+    async def test_rejects_bad_bodies(self):
+        for body in ([1, 2], "text", {}, {"query": ""}):
+            async with self.client.post("/generate-response", json=body) as response:
+                self.assertEqual(response.status, 400, body)
+        async with self.client.post("/generate-response", data="not json") as response:
+            self.assertEqual(response.status, 400)
+
+    async def test_streams_events(self):
+        async with self.client.post("/generate-response", json={"query": "great hotels", "stream": True}) as response:
+            self.assertEqual(response.status, 200)
+            events = parse_events(await response.text())
+        self.assertEqual([event for event, _ in events], ["metadata", "token", "token", "token", "done"])
+        self.assertEqual(events[0][1]["results"][0]["text"], "Clean rooms.")
+        self.assertEqual(events[-1][1], {"response": "Guests value clean rooms."})
+
+
+class TestWriteEventIfConnected(unittest.IsolatedAsyncioTestCase):
+    async def test_disconnected_client_does_not_raise(self):
+        class GoneResponse:
+            async def write(self, data):
+                raise ConnectionResetError("Cannot write to closing transport")
+
+        self.assertFalse(await write_event_if_connected(GoneResponse(), "error", {"error": "x"}))
+
+
+class TestQueuedUpstreamCallsTimeOut(AsyncPipelineTestCase):
+    delays = {"vectara": 0.3}
+    config = {"max_concurrent_vectara": 1, "vectara_timeout": 0.45}
+
+    async def test_wait_for_the_semaphore_counts_against_the_timeout(self):
+        async def post():
+            async with self.client.post("/generate-response", json={"query": "q"}) as response:
+                return response.status
+
+        statuses = sorted(await asyncio.gather(post(), post()))
+        self.assertEqual(statuses, [200, 504])
+
+
+class TestRequestQueueTimeout(AsyncPipelineTestCase):
+    delays = {"vectara": 0.3}
+    config = {"max_concurrent_requests": 1, "request_queue_timeout": 0.05}
+
+    async def test_busy_server_returns_503(self):
+        async def post():
+            async with self.client.post("/generate-response", json={"query": "q"}) as response:
+                return response.status
+
+        statuses = sorted(await asyncio.gather(post(), post()))
+        self.assertEqual(statuses, [200, 503])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from vectara.bulk_indexer import BulkIndexer
+
+
+class StubVectaraHandler(BaseHTTPRequestHandler):
+    """
+    Fake /v1/index endpoint. Fails documents "flaky" (Retry-After 0) and "throttled"
+    (Retry-After one hour) once with 429 and always rejects "bad".
+    """
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        document_id = body["document"]["documentId"]
+        server = self.server
+        with server.lock:
+            server.calls.append(document_id)
+            attempts = server.calls.count(document_id)
+        if document_id == "bad":
+            status = 400
+        elif document_id in ("flaky", "throttled") and attempts == 1:
+            status = 429
+        else:
+            status = 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if status == 429:
+            self.send_header("Retry-After", "3600" if document_id == "throttled" else "0")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+class TestBulkIndexer(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubVectaraHandler)
+        self.server.calls = []
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.tmp.name, "checkpoint.txt")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def make_indexer(self, **kwargs):
+        return BulkIndexer("key", "1", "2", api_url=f"http://127.0.0.1:{self.server.server_port}",
+                           max_workers=4, backoff=0, checkpoint_path=self.checkpoint, **kwargs)
+
+    def test_uploads_retries_and_checkpoints(self):
+        documents = ({"documentId": f"doc{i}", "content": "text"} for i in range(50))
+        report = self.make_indexer().index(list(documents) + [{"documentId": "flaky"}, {"documentId": "bad"}])
+        self.assertEqual(report.succeeded, 51)
+        self.assertEqual(list(report.failed), ["bad"])
+        self.assertEqual(report.retries, 1)
+        with open(self.checkpoint) as f:
+            self.assertEqual(len(f.read().split()), 51)
+
+    def test_resume_skips_checkpointed_documents(self):
+        self.make_indexer().index([{"documentId": "doc1"}, {"documentId": "doc2"}])
+        self.server.calls.clear()
+        report = self.make_indexer().index([{"documentId": "doc1"}, {"documentId": "doc2"}, {"documentId": "doc3"}])
+        self.assertEqual(report.skipped, 2)
+        self.assertEqual(self.server.calls, ["doc3"])
+
+    def test_unexpected_error_is_recorded_per_document(self):
+        documents = [{"documentId": f"doc{i}"} for i in range(20)]
+        documents.insert(3, {"documentId": "unserializable", "content": object()})
+        report = self.make_indexer().index(documents)
+        self.assertEqual(report.succeeded, 20)
+        self.assertEqual(list(report.failed), ["unserializable"])
+        self.assertIn("TypeError", report.failed["unserializable"])
+
+    def test_retry_after_is_capped_at_max_backoff(self):
+        report = self.make_indexer(max_backoff=0.05).index([{"documentId": "throttled"}])
+        self.assertEqual((report.succeeded, report.retries), (1, 1))
+        self.assertLess(report.elapsed, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
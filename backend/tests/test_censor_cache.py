@@ -0,0 +1,44 @@
+import unittest
+from llm_censor.censor_cache import CensorAnalysis, CensorCache, PlaceholderVault, VaultStore
+from llm_censor.redaction import RedactionEngine
+
+
+class TestCensorCache(unittest.TestCase):
+    def test_lru_with_byte_budget(self):
+        analysis = CensorAnalysis([(0, 5, "NAME", "Alice")], [("Alice", "PERSON")])
+        cache = CensorCache(max_bytes=analysis.size * 2)
+        cache.put("a", analysis)
+        cache.put("b", analysis)
+        self.assertIs(cache.get("a"), analysis)
+        cache.put("c", analysis)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_vault_round_trip(self):
+        engine = RedactionEngine()
+        vault = PlaceholderVault()
+        text = "Alice asked Bob to email alice@example.com; alice will call later."
+        spans = engine.redact(text, [(0, 5, "PERSON"), (12, 15, "PERSON"), (44, 49, "PERSON")]).spans
+        pseudonymized = vault.pseudonymize(text, spans)
+        self.assertEqual(pseudonymized, "<NAME_1> asked <NAME_2> to email <EMAIL_1>; <NAME_1> will call later.")
+        response = "Sure, I will remind <NAME_2> that <NAME_1> (<EMAIL_1>) called. <NAME_9> is unknown."
+        self.assertEqual(vault.reidentify(response),
+                         "Sure, I will remind Bob that Alice (alice@example.com) called. <NAME_9> is unknown.")
+
+    def test_underscored_kinds_round_trip(self):
+        vault = PlaceholderVault()
+        token = vault.token_for("WORK_OF_ART", "Mona Lisa")
+        self.assertEqual(token, "<WORK_OF_ART_1>")
+        self.assertEqual(vault.reidentify(f"{token} hangs in the Louvre."), "Mona Lisa hangs in the Louvre.")
+
+    def test_vaults_are_per_conversation(self):
+        store = VaultStore(max_conversations=1)
+        self.assertEqual(store.get("c1").token_for("NAME", "Alice"), "<NAME_1>")
+        self.assertEqual(store.get("c1").token_for("NAME", "Bob"), "<NAME_2>")
+        self.assertEqual(store.get("c2").token_for("NAME", "Bob"), "<NAME_1>")
+        self.assertEqual(len(store.get("c1")), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import re
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from llm_censor import censor_entity_service
+from llm_censor.censor_cache import CensorCache
+from llm_censor.censor_entity_service import analyze_sensitive_information, extract_entities, extract_entities_batch
+
+NAME_RE = re.compile(r"\b[A-Z][a-z]+\b")
+
+
+def stub_doc(text):
+    """
+    Parses every capitalized word as a PERSON, with character offsets like spaCy's.
+    """
+    ents = [SimpleNamespace(text=m.group(), label_="PERSON", start_char=m.start(), end_char=m.end())
+            for m in NAME_RE.finditer(text)]
+    return SimpleNamespace(ents=ents)
+
+
+class StubNLP:
+    """
+    Stand-in for a spaCy pipeline that records how it was called.
+    """
+    def __init__(self):
+        self.calls = []
+        self.pipe_calls = []
+        self.batches = []
+
+    def __call__(self, text, disable=()):
+        self.calls.append(text)
+        return stub_doc(text)
+
+    def pipe(self, texts, batch_size, n_process, disable):
+        self.pipe_calls.append({"batch_size": batch_size, "n_process": n_process, "disable": disable})
+        batch = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) == batch_size:
+                yield from self._flush(batch)
+                batch = []
+        yield from self._flush(batch)
+
+    def _flush(self, batch):
+        if batch:
+            self.batches.append(len(batch))
+        return [stub_doc(text) for text in batch]
+
+
+class TestExtractEntitiesBatch(unittest.TestCase):
+    def setUp(self):
+        self.nlp = StubNLP()
+        patcher = patch.object(censor_entity_service, "get_ner_pipeline", return_value=(self.nlp, ["parser"]))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batches_in_input_order(self):
+        texts = [f"Ann met Bob {i}" if i % 2 else f"no names {i}" for i in range(5)]
+        entities = extract_entities_batch(iter(texts), batch_size=2, n_process=3)
+        self.assertEqual(entities, [[], [("Ann", "PERSON"), ("Bob", "PERSON")], [],
+                                    [("Ann", "PERSON"), ("Bob", "PERSON")], []])
+        self.assertEqual(self.nlp.batches, [2, 2, 1])
+        self.assertEqual(self.nlp.pipe_calls, [{"batch_size": 2, "n_process": 3, "disable": ["parser"]}])
+        self.assertEqual(self.nlp.calls, [])
+
+    def test_defaults_and_duplicates(self):
+        self.assertEqual(extract_entities_batch(["Ann and Ann"]), [[("Ann", "PERSON")]])
+        self.assertEqual(self.nlp.pipe_calls[0]["batch_size"], censor_entity_service.NER_BATCH_SIZE)
+        self.assertEqual(self.nlp.pipe_calls[0]["n_process"], censor_entity_service.NER_N_PROCESS)
+
+
+class TestAnalysisMemoization(unittest.TestCase):
+    def setUp(self):
+        self.nlp = StubNLP()
+        self.cache = CensorCache()
+        patcher = patch.object(censor_entity_service, "get_censor_cache", return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_regex_only_analysis_is_not_cached(self):
+        text = "Ann wrote to ann@example.com"
+        with patch.object(censor_entity_service, "get_ner_pipeline", side_effect=OSError("no model")), \
+                self.assertLogs(level="WARNING"):
+            degraded = analyze_sensitive_information(text, use_llm_fallback=False)
+        self.assertEqual(degraded.entities, [])
+        self.assertIsNone(self.cache.get(text))
+
+        with patch.object(censor_entity_service, "get_ner_pipeline", return_value=(self.nlp, [])):
+            analysis = analyze_sensitive_information(text, use_llm_fallback=False)
+        self.assertEqual(analysis.entities, [("Ann", "PERSON")])
+        self.assertIs(self.cache.get(text), analysis)
+
+    def test_extract_entities_returns_a_copy(self):
+        text = "Ann met Bob"
+        with patch.object(censor_entity_service, "get_ner_pipeline", return_value=(self.nlp, [])):
+            analyze_sensitive_information(text, use_llm_fallback=False)
+        entities = extract_entities(text)
+        entities.append(("Mallory", "PERSON"))
+        self.assertEqual(extract_entities(text), [("Ann", "PERSON"), ("Bob", "PERSON")])
+        self.assertEqual(self.nlp.calls, [text])
+
+
+if __name__ == '__main__':
+    unittest.main()
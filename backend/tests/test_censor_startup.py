@@ -0,0 +1,33 @@
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Imports the censor service in a fresh interpreter and reports RSS growth, which models
+# were loaded and which heavy libraries ended up imported.
+STARTUP_SCRIPT = """
+import json, resource, sys
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+import llm_censor.censor_entity_service as service
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+loaded = [name for name in ("_ner_pipeline", "_text_generator") if getattr(service, name) is not None]
+heavy = [name for name in ("spacy", "transformers", "llama_index", "qdrant_client", "torch") if name in sys.modules]
+print(json.dumps({"rss_growth_kb": rss_after - rss_before, "loaded_models": loaded, "heavy_modules": heavy}))
+"""
+
+
+class TestCensorStartup(unittest.TestCase):
+    def test_import_loads_no_models(self):
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        report = json.loads(output)
+        self.assertEqual(report["loaded_models"], [])
+        self.assertEqual(report["heavy_modules"], [])
+        self.assertLess(report["rss_growth_kb"], 20 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
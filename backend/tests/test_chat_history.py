@@ -0,0 +1,164 @@
+import re
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from database.postgres.connection_pool import ConnectionPool
+
+try:
+    from database.postgres.postgres_service import PostgresService
+except ImportError:  # psycopg2 is not installed
+    PostgresService = None
+
+try:
+    from database.supabase.supabase_service import SupabaseService
+except ImportError:  # supabase is not installed
+    SupabaseService = None
+
+# (id, timestamp, username, message, response), in chronological order
+ROWS = [(i, f"2024-01-01T00:00:{i:02d}", "alice", f"q{i}", f"a{i}") for i in range(1, 6)]
+
+
+class FakeCursor:
+    """
+    DB-API cursor over ROWS that records the executed query and parameters.
+    """
+    def __init__(self, executed):
+        self.executed = executed
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.executed.append((" ".join(query.split()), params))
+        rows = [row for row in ROWS if row[2] == params[0]]
+        if "(timestamp, id) >" in query:
+            rows = [row for row in rows if (row[1], row[0]) > (params[1], params[2])]
+        if "DESC" in query:
+            rows.reverse()
+        self.rows = rows[:params[-1]] if "LIMIT" in query else rows
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+def make_connection(executed):
+    conn = MagicMock()
+    conn.closed = 0
+    conn.cursor.side_effect = lambda name=None: FakeCursor(executed)
+    return conn
+
+
+@unittest.skipIf(PostgresService is None, "psycopg2 is not installed")
+class TestPostgresChatHistory(unittest.TestCase):
+    def setUp(self):
+        self.executed = []
+        self.service = PostgresService({})
+        self.service.pool = ConnectionPool(lambda: make_connection(self.executed), min_size=0, max_size=1,
+                                           timeout=0.05)
+
+    def test_pages_follow_the_keyset_cursor(self):
+        rows, cursor = self.service.get_chat_history_page("alice", limit=2)
+        self.assertEqual([row[0] for row in rows], [1, 2])
+        self.assertEqual(cursor, (ROWS[1][1], 2))
+        rows, cursor = self.service.get_chat_history_page("alice", limit=2, after=cursor)
+        self.assertEqual([row[0] for row in rows], [3, 4])
+        self.assertEqual(self.executed[-1][1], ("alice", ROWS[1][1], 2, 2))
+        rows, cursor = self.service.get_chat_history_page("alice", limit=2, after=cursor)
+        self.assertEqual(([row[0] for row in rows], cursor), ([5], None))
+
+    def test_iter_chat_history(self):
+        self.assertEqual(list(self.service.iter_chat_history("alice", batch_size=2)), ROWS)
+        self.assertEqual(list(self.service.iter_chat_history("bob")), [])
+
+    def test_stopping_early_returns_the_connection(self):
+        for row in self.service.iter_chat_history("alice"):
+            break
+        history = self.service.iter_chat_history("alice")
+        next(history)
+        history.close()
+        self.assertEqual(self.service.pool_metrics()["in_use"], 0)
+        self.assertEqual(len(self.service.get_recent_chat_history("alice")), 5)
+
+    def test_recent_chat_history_is_oldest_first(self):
+        rows = self.service.get_recent_chat_history("alice", turns=2)
+        self.assertEqual([row[0] for row in rows], [4, 5])
+        self.assertEqual(self.executed[-1][1], ("alice", 2))
+
+
+class FakeQuery:
+    """
+    Minimal stand-in for the Supabase query builder, applied to dict rows in memory.
+    """
+    _AFTER_RE = re.compile(r"timestamp\.gt\.(.+),and\(timestamp\.eq\.(.+),id\.gt\.(\d+)\)")
+
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+        self.orders = []
+        self.count = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.rows = [row for row in self.rows if row[column] == value]
+        return self
+
+    def or_(self, condition):
+        self.calls.append(condition)
+        timestamp, _, row_id = self._AFTER_RE.fullmatch(condition).groups()
+        self.rows = [row for row in self.rows if (row["timestamp"], row["id"]) > (timestamp, int(row_id))]
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def execute(self):
+        rows = list(self.rows)
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda row: row[column], reverse=desc)
+        return SimpleNamespace(data=rows[:self.count])
+
+
+@unittest.skipIf(SupabaseService is None, "supabase is not installed")
+class TestSupabaseChatHistory(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        rows = [dict(zip(("id", "timestamp", "username", "message", "response"), row)) for row in ROWS]
+        client = MagicMock()
+        client.table.side_effect = lambda name: FakeQuery(rows, self.calls)
+        self.service = SupabaseService(client)
+
+    def test_pages_follow_the_keyset_cursor(self):
+        rows, cursor = self.service.get_chat_history_page("alice", limit=2)
+        self.assertEqual([row["id"] for row in rows], [1, 2])
+        rows, cursor = self.service.get_chat_history_page("alice", limit=2, after=cursor)
+        self.assertEqual([row["id"] for row in rows], [3, 4])
+        self.assertEqual(self.calls[-1], f"timestamp.gt.{ROWS[1][1]},and(timestamp.eq.{ROWS[1][1]},id.gt.2)")
+        rows, cursor = self.service.get_chat_history_page("alice", limit=2, after=cursor)
+        self.assertEqual(([row["id"] for row in rows], cursor), ([5], None))
+
+    def test_iter_chat_history(self):
+        self.assertEqual([row["id"] for row in self.service.iter_chat_history("alice", batch_size=2)],
+                         [1, 2, 3, 4, 5])
+        self.assertEqual(list(self.service.iter_chat_history("bob")), [])
+
+    def test_recent_chat_history_is_oldest_first(self):
+        rows = self.service.get_recent_chat_history("alice", turns=2)
+        self.assertEqual([row["id"] for row in rows], [4, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+from database.postgres.connection_pool import ConnectionPool, PoolTimeout
+
+
+def make_connection():
+    conn = MagicMock()
+    conn.closed = 0
+    return conn
+
+
+class TestConnectionPool(unittest.TestCase):
+    def test_reuses_connections(self):
+        """A returned connection is handed out again instead of reconnecting."""
+        connect = MagicMock(side_effect=make_connection)
+        pool = ConnectionPool(connect, min_size=1, max_size=2)
+        for _ in range(5):
+            with pool.connection():
+                pass
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(pool.metrics.snapshot()["checkouts"], 5)
+        self.assertEqual(pool.metrics.snapshot()["in_use"], 0)
+
+    def test_bounded_and_times_out(self):
+        """Checkouts beyond max_size wait and then raise PoolTimeout."""
+        pool = ConnectionPool(make_connection, min_size=0, max_size=1, timeout=0.05)
+        conn = pool.getconn()
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        pool.putconn(conn)
+        self.assertIs(pool.getconn(), conn)
+
+    def test_waiter_gets_returned_connection(self):
+        pool = ConnectionPool(make_connection, min_size=0, max_size=1, timeout=2)
+        conn = pool.getconn()
+        threading.Timer(0.05, pool.putconn, args=(conn,)).start()
+        self.assertIs(pool.getconn(), conn)
+        self.assertGreater(pool.metrics.snapshot()["max_wait_ms"], 0)
+
+    def test_broken_connection_is_replaced(self):
+        """A connection failing its health check is closed and a new one is opened."""
+        pool = ConnectionPool(make_connection, min_size=1, max_size=1, health_check_interval=0)
+        broken = pool.getconn()
+        pool.putconn(broken)
+        broken.cursor.side_effect = Exception("server closed the connection")
+        conn = pool.getconn()
+        self.assertIsNot(conn, broken)
+        broken.close.assert_called_once()
+        self.assertEqual(pool.metrics.snapshot()["failed_health_checks"], 1)
+
+    def test_idle_connections_are_evicted(self):
+        pool = ConnectionPool(make_connection, min_size=0, max_size=2, max_idle=0.01)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        time.sleep(0.02)
+        pool.getconn()
+        conn.close.assert_called_once()
+        self.assertEqual(pool.size, 1)
+
+    def test_discarded_connection_frees_slot(self):
+        pool = ConnectionPool(make_connection, min_size=0, max_size=1, timeout=0.05)
+        with self.assertRaises(RuntimeError):
+            with pool.connection() as conn:
+                conn.closed = 1
+                raise RuntimeError("boom")
+        self.assertEqual(pool.size, 0)
+        pool.getconn()
+
+    def test_generator_closed_early_returns_connection(self):
+        pool = ConnectionPool(make_connection, min_size=0, max_size=1, timeout=0.05)
+
+        def rows():
+            with pool.connection():
+                yield from range(3)
+
+        iterator = rows()
+        next(iterator)
+        iterator.close()
+        self.assertEqual(pool.metrics.snapshot()["in_use"], 0)
+        self.assertEqual(pool.idle_count, 1)
+        pool.getconn()
+
+    def test_keyboard_interrupt_returns_connection(self):
+        pool = ConnectionPool(make_connection, min_size=0, max_size=1, timeout=0.05)
+        with self.assertRaises(KeyboardInterrupt):
+            with pool.connection():
+                raise KeyboardInterrupt
+        self.assertEqual(pool.idle_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from sqlalchemy import create_engine, text
+from sql_agent.cost_guard import CostGuardConfig, PlanEstimate, QueryGuard, QueryRejected, inject_limit, stream_result_text
+from sql_agent.engine_registry import EngineConfig
+
+
+class FixedPlanGuard(QueryGuard):
+    def __init__(self, estimate, **kwargs):
+        super().__init__(**kwargs)
+        self.estimate = estimate
+
+    def explain(self, connection, sql, params=None):
+        return self.estimate
+
+
+class TestCostGuard(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE tasks (id INTEGER, name TEXT)"))
+            connection.execute(text("INSERT INTO tasks VALUES " + ", ".join(f"({i}, 'task {i}')" for i in range(50))))
+
+    def test_inject_limit(self):
+        self.assertEqual(inject_limit("SELECT * FROM tasks LIMIT 5;", 10), "SELECT * FROM tasks LIMIT 5")
+        self.assertEqual(inject_limit("SELECT * FROM tasks", 10), "SELECT * FROM (SELECT * FROM tasks) AS guarded LIMIT 10")
+        self.assertEqual(inject_limit("SELECT * FROM tasks LIMIT 500", 10),
+                         "SELECT * FROM (SELECT * FROM tasks LIMIT 500) AS guarded LIMIT 10")
+
+    def test_guarded_query_is_capped(self):
+        guard = QueryGuard(row_limit=10)
+        with self.engine.connect() as connection:
+            query = guard.check(connection, "SELECT id FROM tasks ORDER BY id")
+            rendered = stream_result_text(connection.execute(text(query)), 10, 10000)
+        self.assertTrue(rendered.endswith("(truncated to the first 10 rows)"))
+
+    def test_rejects_expensive_plans(self):
+        guard = FixedPlanGuard(PlanEstimate(5e6, 10, [{"Plan": {}}]), max_cost=1e6)
+        with self.engine.connect() as connection, self.assertRaises(QueryRejected):
+            guard.check(connection, "SELECT * FROM tasks a, tasks b")
+
+    def test_rejects_large_writes_only(self):
+        guard = FixedPlanGuard(PlanEstimate(10, 5e6, None), max_rows=1e6)
+        with self.engine.connect() as connection:
+            guard.check(connection, "SELECT * FROM tasks")
+            with self.assertRaises(QueryRejected):
+                guard.check(connection, "UPDATE tasks SET name = 'x'")
+
+    def test_statement_timeout_comes_from_engine_config(self):
+        self.assertFalse(hasattr(CostGuardConfig, "STATEMENT_TIMEOUT_MS"))
+        self.assertEqual(QueryGuard.from_env().statement_timeout_ms, EngineConfig.STATEMENT_TIMEOUT_MS)
+
+    def test_byte_cap(self):
+        with self.engine.connect() as connection:
+            rendered = stream_result_text(connection.execute(text("SELECT id FROM tasks")), 1000, 20)
+        self.assertEqual(rendered, "[(0,), (1,), (2,)] (truncated to the first 3 rows)")
+
+
+if __name__ == '__main__':
+    unittest.main()
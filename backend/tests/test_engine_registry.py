@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import text
+from sql_agent.cost_guard import stream_result_text
+from sql_agent.engine_registry import EngineConfig, dispose_engines, get_engine
+
+
+class CountingResult:
+    """
+    Stand-in for a streamed result that records how many rows were pulled.
+    """
+    def __init__(self, rows):
+        self.rows = rows
+        self.pulled = 0
+        self.closed = False
+
+    def __iter__(self):
+        for row in self.rows:
+            self.pulled += 1
+            yield row
+
+    def close(self):
+        self.closed = True
+
+
+class TestEngineRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{os.path.join(self.tmp.name, 'test.db')}"
+
+    def tearDown(self):
+        dispose_engines()
+        self.tmp.cleanup()
+
+    def test_engine_is_shared_per_url(self):
+        engine = get_engine(self.url)
+        self.assertIs(get_engine(self.url), engine)
+        self.assertIsNot(get_engine(f"sqlite:///{os.path.join(self.tmp.name, 'other.db')}"), engine)
+        dispose_engines()
+        self.assertIsNot(get_engine(self.url), engine)
+
+    def test_pooled_connections_are_reused(self):
+        engine = get_engine(self.url)
+        with engine.connect() as connection:
+            first = connection.connection.dbapi_connection
+        with engine.connect() as connection:
+            self.assertIs(connection.connection.dbapi_connection, first)
+
+    def test_engine_kwargs_by_dialect(self):
+        sqlite_kwargs = EngineConfig.get_engine_kwargs(self.url)
+        self.assertEqual(sqlite_kwargs, {"pool_pre_ping": True})
+        postgres_kwargs = EngineConfig.get_engine_kwargs("postgresql://user:pw@db/app")
+        self.assertEqual(postgres_kwargs["pool_size"], EngineConfig.POOL_SIZE)
+        self.assertTrue(postgres_kwargs["pool_pre_ping"])
+        self.assertEqual(postgres_kwargs["connect_args"],
+                         {"options": f"-c statement_timeout={EngineConfig.STATEMENT_TIMEOUT_MS}"})
+
+
+class TestStreamResultText(unittest.TestCase):
+    def test_stops_pulling_rows_at_the_cap(self):
+        result = CountingResult((i, f"row {i}") for i in range(100000))
+        rendered = stream_result_text(result, max_rows=5, max_bytes=10000)
+        self.assertEqual(result.pulled, 6)
+        self.assertTrue(result.closed)
+        self.assertTrue(rendered.startswith("[(0, 'row 0'), "))
+        self.assertTrue(rendered.endswith("(truncated to the first 5 rows)"))
+
+    def test_streams_with_yield_per(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = get_engine(f"sqlite:///{os.path.join(tmp, 'rows.db')}")
+            with engine.begin() as connection:
+                connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+                connection.execute(text("INSERT INTO items (id) VALUES " + ", ".join(f"({i})" for i in range(2000))))
+            with engine.connect() as connection:
+                result = connection.execution_options(yield_per=100).execute(text("SELECT id FROM items"))
+                rendered = stream_result_text(result, max_rows=3, max_bytes=10000)
+            self.assertEqual(rendered, "[(0,), (1,), (2,)] (truncated to the first 3 rows)")
+            dispose_engines()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import time
+import unittest
+from vectara.fanout import query_corpora, reciprocal_rank_fusion
+from vectara.vectara_client import VectaraError
+
+
+class FakeClient:
+    def __init__(self, shards):
+        self.shards = shards  # corpus_id -> (delay, results or exception)
+
+    def query(self, query, corpus_id=None, page_size=10):
+        delay, results = self.shards[corpus_id]
+        time.sleep(delay)
+        if isinstance(results, Exception):
+            raise results
+        return results
+
+
+class TestFanOut(unittest.TestCase):
+    def test_rrf_merges_duplicates(self):
+        fused = reciprocal_rank_fusion([
+            ("a", [{"documentId": "x"}, {"documentId": "y"}]),
+            ("b", [{"documentId": "y"}, {"documentId": "z"}]),
+        ], k=60)
+        self.assertEqual([r["documentId"] for r in fused], ["y", "x", "z"])
+        self.assertEqual(fused[0]["shards"], ["a", "b"])
+
+    def test_concurrent_with_partial_results(self):
+        client = FakeClient({
+            "policy": (0.1, [{"documentId": "p1"}]),
+            "product": (0.1, [{"documentId": "d1"}]),
+            "support": (0.1, VectaraError("HTTP 503")),
+            "slow": (2.0, [{"documentId": "s1"}]),
+        })
+        start = time.monotonic()
+        result = query_corpora("refund", ["policy", "product", "support", "slow"], deadline=0.5, client=client)
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertTrue(result.partial)
+        self.assertEqual(sorted(r["documentId"] for r in result.results), ["d1", "p1"])
+        self.assertEqual(result.failed, [("refund", "support")])
+        self.assertEqual(result.timed_out, [("refund", "slow")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from llm_censor.index_manifest import (
+    atomic_persist,
+    diff_manifests,
+    load_manifest,
+    recover_persist_dir,
+    save_manifest,
+    scan_directory,
+)
+
+try:
+    from llama_index.core.embeddings import MockEmbedding
+except ImportError:  # The incremental index update test needs llama_index
+    MockEmbedding = None
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, "data")
+        write(os.path.join(self.data_dir, "a.txt"), "alpha")
+        write(os.path.join(self.data_dir, "sub", "b.txt"), "beta")
+        write(os.path.join(self.data_dir, ".hidden"), "skipped")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_diff(self):
+        before = scan_directory(self.data_dir)
+        self.assertEqual(sorted(before), ["a.txt", "sub/b.txt"])
+        write(os.path.join(self.data_dir, "a.txt"), "alpha v2")
+        os.remove(os.path.join(self.data_dir, "sub", "b.txt"))
+        write(os.path.join(self.data_dir, "c.txt"), "gamma")
+        diff = diff_manifests(before, scan_directory(self.data_dir, before))
+        self.assertEqual((diff.added, diff.changed, diff.removed), (["c.txt"], ["a.txt"], ["sub/b.txt"]))
+        self.assertEqual(sorted(diff.to_delete), ["a.txt", "sub/b.txt"])
+        self.assertEqual(sorted(diff.to_embed), ["a.txt", "c.txt"])
+
+    def test_touch_without_content_change_is_not_a_change(self):
+        before = scan_directory(self.data_dir)
+        path = os.path.join(self.data_dir, "a.txt")
+        os.utime(path, (1, 1))
+        diff = diff_manifests(before, scan_directory(self.data_dir, before))
+        self.assertFalse(diff)
+        self.assertEqual(len(diff.unchanged), 2)
+
+    def test_unchanged_stat_reuses_hash(self):
+        before = scan_directory(self.data_dir)
+        before["a.txt"]["sha256"] = "remembered"
+        self.assertEqual(scan_directory(self.data_dir, before)["a.txt"]["sha256"], "remembered")
+
+    def test_atomic_persist(self):
+        persist_dir = os.path.join(self.tmp.name, "storage")
+        atomic_persist(persist_dir, lambda path: save_manifest(path, {"a.txt": {"sha256": "1"}}))
+        self.assertEqual(load_manifest(persist_dir), {"a.txt": {"sha256": "1"}})
+
+        def crash(path):
+            save_manifest(path, {"a.txt": {"sha256": "2"}})
+            raise RuntimeError("crashed mid-update")
+
+        with self.assertRaises(RuntimeError):
+            atomic_persist(persist_dir, crash)
+        self.assertEqual(load_manifest(persist_dir), {"a.txt": {"sha256": "1"}})
+        self.assertFalse(os.path.exists(f"{persist_dir}.new"))
+
+        atomic_persist(persist_dir, lambda path: save_manifest(path, {"a.txt": {"sha256": "3"}}))
+        self.assertEqual(load_manifest(persist_dir), {"a.txt": {"sha256": "3"}})
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["data", "storage"])
+
+    def test_recover_interrupted_swap(self):
+        persist_dir = os.path.join(self.tmp.name, "storage")
+        os.makedirs(f"{persist_dir}.old")
+        save_manifest(f"{persist_dir}.old", {"a.txt": {"sha256": "1"}})
+        os.makedirs(f"{persist_dir}.new")
+        recover_persist_dir(persist_dir)
+        self.assertEqual(load_manifest(persist_dir), {"a.txt": {"sha256": "1"}})
+        self.assertFalse(os.path.exists(f"{persist_dir}.new"))
+
+
+@unittest.skipIf(MockEmbedding is None, "llama_index is not installed")
+class TestIncrementalIndexUpdate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, "data")
+        self.persist_dir = os.path.join(self.tmp.name, "storage")
+        write(os.path.join(self.data_dir, "a.txt"), "alpha")
+        write(os.path.join(self.data_dir, "b.txt"), "beta")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def texts(self, index):
+        return sorted(node.get_content() for node in index.docstore.docs.values())
+
+    def test_changed_and_removed_files_are_replaced(self):
+        from llm_censor.censor_entity_service import create_and_persist_index
+        embed_model = MockEmbedding(embed_dim=8, embed_batch_size=10)
+        index = create_and_persist_index(self.data_dir, self.persist_dir, embed_batch_size=2, embed_model=embed_model)
+        self.assertEqual(self.texts(index), ["alpha", "beta"])
+        self.assertEqual(embed_model.embed_batch_size, 10)
+
+        write(os.path.join(self.data_dir, "a.txt"), "alpha v2")
+        os.remove(os.path.join(self.data_dir, "b.txt"))
+        write(os.path.join(self.data_dir, "c.txt"), "gamma")
+        index = create_and_persist_index(self.data_dir, self.persist_dir, embed_model=embed_model)
+        self.assertEqual(self.texts(index), ["alpha v2", "gamma"])
+        self.assertEqual(sorted(load_manifest(self.persist_dir)), ["a.txt", "c.txt"])
+        self.assertEqual(len(index.ref_doc_info), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
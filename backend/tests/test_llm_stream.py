@@ -0,0 +1,34 @@
+import unittest
+from llm_stream import DONE, parse_openai_sse_line, sse_event
+
+
+class TestLLMStream(unittest.TestCase):
+    def test_parse_content_delta(self):
+        line = b'data: {"choices": [{"delta": {"content": "Hel"}}]}'
+        self.assertEqual(parse_openai_sse_line(line), "Hel")
+
+    def test_parse_non_content_lines(self):
+        self.assertIsNone(parse_openai_sse_line(b""))
+        self.assertIsNone(parse_openai_sse_line(b": keep-alive"))
+        self.assertIsNone(parse_openai_sse_line('data: {"choices": [{"delta": {"role": "assistant"}}]}'))
+
+    def test_parse_done(self):
+        self.assertIs(parse_openai_sse_line(b"data: [DONE]"), DONE)
+
+        def tokens(lines):
+            for line in lines:
+                token = parse_openai_sse_line(line)
+                if token is DONE:
+                    return
+                yield token
+
+        # Called from inside a generator, the end of the stream must not become a RuntimeError
+        self.assertEqual(list(tokens([b'data: {"choices": [{"delta": {"content": "Hi"}}]}', b"data: [DONE]"])),
+                         ["Hi"])
+
+    def test_sse_event(self):
+        self.assertEqual(sse_event("token", {"token": "a"}), 'event: token\ndata: {"token": "a"}\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+import numpy as np
+from vectara import local_index
+from vectara.local_index import LocalIndexConfig, LocalVectorIndex, get_local_index
+
+
+def clustered_vectors(count, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=count)] + 0.3 * rng.normal(size=(count, dim))).astype(np.float32)
+
+
+class TestLocalVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.vectors = clustered_vectors(3000)
+        self.texts = [f"passage {row}" for row in range(len(self.vectors))]
+        self.metadata = [{"source": f"doc{row // 10}.pdf", "part": row % 10} for row in range(len(self.vectors))]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def exact(self, queries, top_k):
+        normalized = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        return np.argsort(-(queries @ normalized.T), axis=1)[:, :top_k]
+
+    def test_flat_search_is_exact(self):
+        index = LocalVectorIndex.build(self.tmp.name, self.vectors, self.texts, dtype="float32", block_rows=700)
+        queries = self.vectors[[5, 1234, 2999]]
+        scores, rows = index.search(queries, top_k=5)
+        self.assertEqual(rows.tolist(), self.exact(queries, 5).tolist())
+        self.assertTrue(np.all(np.diff(scores, axis=1) <= 0))
+        self.assertAlmostEqual(float(scores[0, 0]), 1.0, places=5)
+
+    def test_ivf_recall_and_results(self):
+        ids = [f"id-{row}" for row in range(len(self.vectors))]
+        index = LocalVectorIndex.build(self.tmp.name, self.vectors, self.texts, ids, self.metadata,
+                                       dtype="float16", nlist=32, nprobe=8,
+                                       embed_fn=lambda texts: self.vectors[[int(t.split()[-1]) for t in texts]])
+        queries = self.vectors[:100] + 0.05
+        _, rows = index.search(queries, top_k=10)
+        exact = self.exact(queries, 10)
+        found = [index.result(row, 0)["documentId"] for row in rows.ravel() if row >= 0]
+        expected = {f"id-{row}" for row in exact.ravel()}
+        self.assertGreater(len(expected.intersection(found)) / len(expected), 0.9)
+
+        results = index.query("find passage 42", top_k=3)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["documentId"], "id-42")
+        self.assertEqual(results[0]["text"], "passage 42")
+        self.assertIn({"name": "source", "value": "doc4.pdf"}, results[0]["metadata"])
+        self.assertGreaterEqual(results[0]["score"], results[1]["score"])
+
+        reopened = LocalVectorIndex(self.tmp.name, nprobe=32)
+        self.assertEqual(len(reopened), len(self.vectors))
+        # Probing every list is exhaustive (up to float16 rounding of near ties).
+        _, all_lists = reopened.search(queries[:1], top_k=3)
+        self.assertEqual([reopened.result(row, 0)["documentId"] for row in all_lists[0]],
+                         [f"id-{row}" for row in exact[0, :3]])
+
+    def test_fewer_vectors_than_top_k(self):
+        index = LocalVectorIndex.build(self.tmp.name, self.vectors[:3], self.texts[:3])
+        scores, rows = index.search(self.vectors[0], top_k=5)
+        self.assertEqual(rows[0, 3:].tolist(), [-1, -1])
+        self.assertEqual(sorted(rows[0, :3].tolist()), [0, 1, 2])
+
+
+class StubSentenceTransformer:
+    """
+    Embeds every query as the same vector.
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def get_sentence_embedding_dimension(self):
+        return 32
+
+    def encode(self, texts):
+        return np.ones((len(texts), 32), dtype=np.float32)
+
+
+class TestGetLocalIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for patcher in (patch.object(local_index, "_local_index", None),
+                        patch.dict(sys.modules, {"sentence_transformers":
+                                                 SimpleNamespace(SentenceTransformer=StubSentenceTransformer)}),
+                        patch.object(LocalIndexConfig, "INDEX_DIR", self.tmp.name),
+                        patch.object(LocalIndexConfig, "EMBED_MODEL", "model-a")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, embed_model):
+        LocalVectorIndex.build(self.tmp.name, clustered_vectors(50), [f"passage {row}" for row in range(50)],
+                               embed_model=embed_model)
+
+    def test_opens_index_built_with_the_configured_model(self):
+        self.build("model-a")
+        index = get_local_index()
+        self.assertEqual(index.info["embed_model"], "model-a")
+        self.assertEqual(len(index.query("anything", top_k=3)), 3)
+        self.assertIs(get_local_index(), index)
+
+    def test_model_mismatch_is_refused(self):
+        self.build("model-b")
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertIsNone(get_local_index())
+        self.assertIn("was built with model-b", logs.output[0])
+
+    def test_missing_sentence_transformers_is_reported(self):
+        self.build("model-a")
+        with patch.dict(sys.modules, {"sentence_transformers": None}), self.assertLogs(level="WARNING") as logs:
+            self.assertIsNone(get_local_index())
+        self.assertIn("sentence-transformers is required to embed queries", logs.output[0])
+
+    def test_failure_is_remembered(self):
+        with patch.object(local_index, "LocalVectorIndex", side_effect=OSError("no index")) as opened, \
+                self.assertLogs(level="WARNING"):
+            self.assertIsNone(get_local_index())
+            self.assertIsNone(get_local_index())
+        self.assertEqual(opened.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
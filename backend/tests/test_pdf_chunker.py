@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+import unittest
+from vectara import pdf_chunker
+from vectara.pdf_chunker import chunk_pages, is_heading, iter_pdf_documents
+
+
+def fake_pages(count, paragraphs_per_page=4):
+    for number in range(1, count + 1):
+        blocks = []
+        if number % 3 == 1:
+            blocks.append(f"{number // 3 + 1}. Section {number // 3 + 1}")
+        for paragraph in range(paragraphs_per_page):
+            blocks.append(f"Page {number} paragraph {paragraph} " + "word " * 30)
+        yield number, "\n\n".join(blocks)
+
+
+class TestChunkPages(unittest.TestCase):
+    def test_headings(self):
+        self.assertTrue(is_heading("2.1 Billing"))
+        self.assertTrue(is_heading("REFUND POLICY"))
+        self.assertFalse(is_heading("This is an ordinary sentence."))
+        self.assertFalse(is_heading("2024 revenue grew 10 percent"))
+        self.assertFalse(is_heading("To reset your password:"))
+        self.assertFalse(is_heading(""))
+
+    def test_numbered_steps_and_headings_stay_in_the_text(self):
+        text = ("To reset your password:\n1. Open the app\n2. Click Settings\n3 Choose Reset password\n\n"
+                "IMPORTANT NOTE\n2024 revenue grew 10 percent\nThanks.")
+        chunks = list(chunk_pages([(1, text)], chunk_chars=2000, overlap_chars=0))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0]["text"], "To reset your password: 1. Open the app 2. Click Settings "
+                                            "3 Choose Reset password IMPORTANT NOTE 2024 revenue grew 10 percent Thanks.")
+        self.assertEqual(chunks[0]["section"], "IMPORTANT NOTE")
+
+    def test_list_at_the_start_of_a_paragraph_is_not_a_heading(self):
+        chunks = list(chunk_pages([(1, "1. Open the app\n2. Click Settings")], chunk_chars=2000, overlap_chars=0))
+        self.assertEqual(chunks[0]["text"], "1. Open the app 2. Click Settings")
+        self.assertIsNone(chunks[0]["section"])
+
+    def test_chunks_overlap_and_cover_every_paragraph(self):
+        chunks = list(chunk_pages(fake_pages(9), chunk_chars=500, overlap_chars=200))
+        self.assertGreater(len(chunks), 5)
+        for chunk in chunks[:-1]:
+            self.assertGreaterEqual(len(chunk["text"]), 500)
+        for previous, current in zip(chunks, chunks[1:]):
+            # The last paragraph of a chunk (with its heading, if any) starts the next one.
+            tail = "Page " + previous["text"].split("Page ")[-1]
+            repeated = current["text"][:current["text"].index(tail) + len(tail)]
+            self.assertTrue(previous["text"].endswith(repeated))
+        text = " ".join(chunk["text"] for chunk in chunks)
+        for number in range(1, 10):
+            for paragraph in range(4):
+                self.assertIn(f"Page {number} paragraph {paragraph} ", text)
+
+    def test_page_ranges_and_sections(self):
+        chunks = list(chunk_pages(fake_pages(9), chunk_chars=500, overlap_chars=0))
+        self.assertEqual(chunks[0]["page_start"], 1)
+        self.assertEqual(chunks[-1]["page_end"], 9)
+        for chunk in chunks:
+            self.assertLessEqual(chunk["page_start"], chunk["page_end"])
+            last_page = chunk["page_end"]
+            self.assertEqual(chunk["section"], f"{(last_page - 1) // 3 + 1}. Section {(last_page - 1) // 3 + 1}")
+
+    def test_long_paragraph_is_split_on_words(self):
+        chunks = list(chunk_pages([(1, "word " * 1000)], chunk_chars=300, overlap_chars=0))
+        self.assertGreater(len(chunks), 10)
+        self.assertTrue(all(len(chunk["text"]) <= 300 for chunk in chunks))
+
+    def test_no_trailing_overlap_only_chunk(self):
+        chunks = list(chunk_pages([(1, "a " * 150)], chunk_chars=300, overlap_chars=400))
+        self.assertEqual(len(chunks), 1)
+
+    def test_consumes_pages_lazily(self):
+        consumed = []
+
+        def pages():
+            for number, text in fake_pages(1000):
+                consumed.append(number)
+                yield number, text
+
+        next(chunk_pages(pages(), chunk_chars=500, overlap_chars=100))
+        self.assertLess(len(consumed), 5)
+
+
+class TestIterPdfDocuments(unittest.TestCase):
+    def test_documents(self):
+        documents = list(iter_pdf_documents(["/data/manual.pdf"], chunk_chars=500, overlap_chars=100,
+                                            pages_fn=lambda path: fake_pages(6)))
+        ids = [document["documentId"] for document in documents]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertTrue(ids[0].startswith("manual-") and ids[0].endswith("-00000"))
+        metadata = json.loads(documents[-1]["metadataJson"])
+        self.assertEqual(metadata["source"], "manual.pdf")
+        self.assertEqual(metadata["part"], len(documents) - 1)
+        self.assertEqual(metadata["page_end"], 6)
+        self.assertEqual(documents[-1]["title"], metadata["section"])
+
+    @unittest.skipIf(pdf_chunker.PdfReader is None, "pypdf is not installed")
+    def test_reads_pdf(self):
+        from benchmarks.bench_pdf_chunking import write_synthetic_pdf
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "synthetic.pdf")
+            write_synthetic_pdf(path, pages=12, lines_per_page=10)
+            pages = list(pdf_chunker.iter_pdf_pages(path))
+            self.assertEqual([number for number, _ in pages], list(range(1, 13)))
+            self.assertIn("SECTION 1", pages[0][1])
+            documents = list(iter_pdf_documents([path], chunk_chars=800, overlap_chars=100))
+            metadata = [json.loads(document["metadataJson"]) for document in documents]
+            self.assertEqual(metadata[-1]["page_end"], 12)
+            self.assertEqual(metadata[-1]["section"], "2. SECTION 2")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import stat
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from vectara.pdf_converter import PDFConverter, url_filename
+
+# Stand-in for wkhtmltopdf: downloads the page and writes it as the "PDF"; hangs on /hang,
+# fails without output on /broken and writes a truncated file on /partial.
+FAKE_RENDERER = """#!{python}
+import sys, time, urllib.request
+url, output = sys.argv[-2], sys.argv[-1]
+with open({log!r}, "a") as log:
+    log.write(url + "\\n")
+if url.endswith("/hang"):
+    time.sleep(30)
+if url.endswith("/broken"):
+    sys.exit(2)
+if url.endswith("/partial"):
+    open(output, "wb").write(b"%PD")
+    sys.exit(1)
+with urllib.request.urlopen(url) as response, open(output, "wb") as f:
+    f.write(b"%PDF-" + response.read())
+"""
+
+
+class StubSiteHandler(BaseHTTPRequestHandler):
+    """
+    Serves /a with an ETag, /b without validators and /hang (renders of it never finish).
+    """
+    def do_GET(self):
+        body = self.server.pages.get(self.path, b"<html>hang</html>")
+        etag = '"a-v1"' if self.path == "/a" else None
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPDFConverter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubSiteHandler)
+        self.server.pages = {"/a": b"<html>page a</html>", "/b": b"<html>page b</html>"}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.log = os.path.join(self.tmp.name, "renders.log")
+        self.renderer = os.path.join(self.tmp.name, "fake-wkhtmltopdf")
+        with open(self.renderer, "w") as f:
+            f.write(FAKE_RENDERER.format(python=sys.executable, log=self.log))
+        os.chmod(self.renderer, os.stat(self.renderer).st_mode | stat.S_IEXEC)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def converter(self, **kwargs):
+        return PDFConverter(wkhtmltopdf_path=self.renderer, cache_dir=os.path.join(self.tmp.name, "cache"),
+                            max_workers=3, **kwargs)
+
+    def renders(self):
+        with open(self.log) as f:
+            return [line.strip().rsplit("/", 1)[-1] for line in f]
+
+    def test_batch_converts_then_serves_unchanged_pages_from_cache(self):
+        urls = [f"{self.base}/a", f"{self.base}/b"]
+        output_dir = os.path.join(self.tmp.name, "out")
+        report = self.converter().convert_batch(urls, output_dir)
+        self.assertEqual([r.status for r in report.results], ["converted", "converted"])
+        with open(report.results[0].filename, "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-<html>page a</html>")
+
+        # /a answers 304 to its ETag, /b has the same content hash: neither is re-rendered.
+        report = self.converter().convert_batch(urls, os.path.join(self.tmp.name, "out2"))
+        self.assertEqual([r.status for r in report.results], ["cached", "cached"])
+        self.assertTrue(os.path.exists(report.results[1].filename))
+        self.assertEqual(sorted(self.renders()), ["a", "b"])
+
+        # Changed content is rendered again.
+        self.server.pages["/b"] = b"<html>page b, edited</html>"
+        report = self.converter().convert_batch(urls, output_dir)
+        self.assertEqual([r.status for r in report.results], ["cached", "converted"])
+
+    def test_hung_render_is_killed_and_retried(self):
+        report = self.converter(timeout=0.5, retries=1).convert_batch([f"{self.base}/hang", f"{self.base}/a"],
+                                                                     os.path.join(self.tmp.name, "out"))
+        hung, ok = report.results
+        self.assertEqual((hung.status, hung.attempts), ("failed", 2))
+        self.assertIn("timed out", hung.error)
+        self.assertEqual(ok.status, "converted")
+        self.assertLess(hung.seconds, 5)
+
+    def test_failed_render_does_not_count_a_stale_pdf(self):
+        output_dir = os.path.join(self.tmp.name, "out")
+        os.makedirs(output_dir)
+        urls = [f"{self.base}/broken", f"{self.base}/partial"]
+        for url in urls:
+            with open(os.path.join(output_dir, url_filename(url)), "wb") as f:
+                f.write(b"%PDF-stale")
+        report = self.converter(retries=1).convert_batch(urls, output_dir)
+        self.assertEqual([(r.status, r.attempts) for r in report.results], [("failed", 2), ("failed", 2)])
+        for result in report.results:
+            self.assertIn("no PDF output", result.error)
+            with open(result.filename, "rb") as f:
+                self.assertEqual(f.read(), b"%PDF-stale")
+        self.assertEqual(sorted(os.listdir(output_dir)), sorted(url_filename(url) for url in urls))
+
+if __name__ == '__main__':
+    unittest.main()
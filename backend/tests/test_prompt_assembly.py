@@ -0,0 +1,32 @@
+import unittest
+from prompt_assembly import SnippetCache, assemble_context
+
+PASSAGE = "the hotel has clean rooms friendly staff and a great breakfast buffet every morning for all guests"
+
+
+class TestPromptAssembly(unittest.TestCase):
+    def test_orders_by_score_and_drops_near_duplicates(self):
+        results = [
+            {"text": "refunds are possible up to a day before check in", "score": 0.2},
+            {"text": PASSAGE, "score": 0.9},
+            {"text": PASSAGE + " too", "score": 0.8},
+        ]
+        context = assemble_context(results, token_budget=1000, dedup_threshold=0.6, cache=SnippetCache())
+        self.assertEqual(context.passages, [PASSAGE, results[0]["text"]])
+        self.assertEqual(context.dropped_duplicates, 1)
+
+    def test_respects_token_budget(self):
+        cache = SnippetCache()
+        results = [{"text": PASSAGE, "score": 0.9}, {"text": "short answer", "score": 0.1}]
+        context = assemble_context(results, token_budget=5, cache=cache)
+        self.assertEqual(context.passages, ["short answer"])
+        self.assertLessEqual(context.tokens, 5)
+        self.assertEqual(context.dropped_budget, 1)
+
+    def test_accepts_plain_strings(self):
+        context = assemble_context(["a b c", "d e f"], token_budget=100, cache=SnippetCache())
+        self.assertEqual(context.text, "a b c\n\nd e f")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import time
+import unittest
+from sqlalchemy import create_engine, text
+from sql_agent.query_cache import TextToSQLCache, is_read_only, parameterize
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE tasks (id INTEGER, owner TEXT, due DATE)"))
+            connection.execute(text("INSERT INTO tasks VALUES (1, 'Alice', '2024-01-02'), (2, 'Bob', '2024-01-03')"))
+
+    def test_parameterize_literals(self):
+        entry = parameterize("tasks for Alice since 2024-01-01, top 5",
+                             "SELECT id FROM tasks WHERE owner = 'Alice' AND due >= '2024-01-01' LIMIT 5")
+        self.assertEqual(entry.sql, "SELECT id FROM tasks WHERE owner = :p0 AND due >= :p1 LIMIT :p2")
+        self.assertEqual(entry.bind("tasks for  bob since 2023-12-31, top 10"),
+                         {"p0": "bob", "p1": "2023-12-31", "p2": 10})
+        self.assertIsNone(entry.bind("tasks for bob due today since 2023-12-31, top 10"))
+        self.assertIsNone(entry.bind("tasks for bob since yesterday, top 10"))
+
+    def test_pronouns_and_invalid_values_do_not_bind(self):
+        entry = parameterize("tasks for Alice due 2024-01-01, top 5",
+                             "SELECT id FROM tasks WHERE owner = 'Alice' AND due = '2024-01-01' LIMIT 5")
+        self.assertEqual(entry.bind("tasks for Bob due 2024-02-29, top 3"), {"p0": "Bob", "p1": "2024-02-29", "p2": 3})
+        self.assertIsNone(entry.bind("tasks for me due 2024-01-01, top 5"))
+        self.assertIsNone(entry.bind("tasks for everyone due 2024-01-01, top 5"))
+        self.assertIsNone(entry.bind("tasks for Bob due 2023-02-30, top 5"))
+        self.assertIsNone(entry.bind("tasks for Bob due 2024-01-01, top 0"))
+        self.assertIsNone(entry.bind("tasks for Bob due 2024-01-01, top -5"))
+        self.assertIsNone(entry.bind("tasks for ?! due 2024-01-01, top 5"))
+
+    def test_only_verbatim_literals_are_parameterized(self):
+        entry = parameterize("tasks for alice", "SELECT id FROM tasks WHERE owner = 'Alice'")
+        self.assertEqual(entry.sql, "SELECT id FROM tasks WHERE owner = 'Alice'")
+        self.assertIsNone(entry.bind("tasks for bob"))
+        entry = parameterize("tasks for me", "SELECT id FROM tasks WHERE owner = 'me'")
+        self.assertEqual(entry.sql, "SELECT id FROM tasks WHERE owner = 'me'")
+        self.assertIsNone(entry.bind("tasks for Bob"))
+
+    def test_templated_variants_hit_and_run(self):
+        cache = TextToSQLCache()
+        with self.engine.connect() as connection:
+            sql, params = cache.store("tasks for Alice", "v1", "SELECT id FROM tasks WHERE owner = 'Alice';", connection)
+            self.assertEqual(params, {"p0": "Alice"})
+            sql, params = cache.lookup("Tasks for Bob", "v1")
+            self.assertEqual(connection.execute(text(sql), params).fetchall(), [(2,)])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["llm_calls_avoided"], stats["hit_rate"]), (1, 1, 1.0))
+
+    def test_invalid_sql_is_not_cached(self):
+        cache = TextToSQLCache()
+        with self.engine.connect() as connection:
+            self.assertIsNone(cache.store("tasks for Alice", "v1", "SELECT nope FROM missing", connection))
+        self.assertIsNone(cache.lookup("tasks for Alice", "v1"))
+        self.assertEqual(cache.stats()["validation_failures"], 1)
+
+    def test_schema_change_invalidates(self):
+        cache = TextToSQLCache()
+        with self.engine.connect() as connection:
+            cache.store("all tasks", "v1", "SELECT id FROM tasks", connection)
+        cache.put_result("SELECT id FROM tasks", {}, "[(1,), (2,)]")
+        self.assertIsNotNone(cache.lookup("all tasks", "v1"))
+        self.assertIsNone(cache.lookup("all tasks", "v2"))
+        self.assertIsNone(cache.get_result("SELECT id FROM tasks", {}))
+
+    def test_result_cache_ttl_and_read_only(self):
+        cache = TextToSQLCache(result_ttl=0.05)
+        cache.put_result("SELECT 1", {}, "[(1,)]")
+        cache.put_result("DELETE FROM tasks", {}, "done")
+        self.assertEqual(cache.get_result("SELECT 1", {}), "[(1,)]")
+        self.assertIsNone(cache.get_result("DELETE FROM tasks", {}))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get_result("SELECT 1", {}))
+
+    def test_is_read_only(self):
+        self.assertTrue(is_read_only("WITH t AS (SELECT 1) SELECT * FROM t;"))
+        self.assertTrue(is_read_only("SELECT * FROM tasks WHERE name = 'delete me'"))
+        self.assertFalse(is_read_only("SELECT 1; DROP TABLE tasks"))
+        self.assertFalse(is_read_only("UPDATE tasks SET owner = 'x'"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from llm_censor.redaction import RedactionEngine, iban_valid, luhn_valid
+
+
+class TestRedaction(unittest.TestCase):
+    def setUp(self):
+        self.engine = RedactionEngine(terms={"Project Falcon": "PROJECT"})
+
+    def test_structured_pii(self):
+        text = ("Reach alice.j@example.com or +1 415-555-0134. Card 4111 1111 1111 1111, "
+                "IBAN GB82 WEST 1234 5698 7654 32, ssn 123-45-6789, user 123456789012345678.")
+        self.assertEqual(self.engine.redact(text).text,
+                         "Reach <EMAIL> or <PHONE>. Card <CARD>, IBAN <IBAN>, ssn <SSN>, user <ID>.")
+
+    def test_keeps_ordinary_numbers_and_dates(self):
+        text = "Ship 1500 units on 2024-01-02 at 10:30, order #42."
+        self.assertEqual(self.engine.redact(text).text, text)
+        text = "Revenue grew from 1990-2000 and we sold 10 000 units"
+        self.assertEqual(self.engine.redact(text).text, text)
+
+    def test_phone_shapes(self):
+        for phone in ("(555) 123-4567", "415.555.0134", "+44 20 7946 0958", "+49 (0)30 1234567"):
+            self.assertEqual(self.engine.redact(f"call {phone} today").text, "call <PHONE> today")
+
+    def test_checksums(self):
+        self.assertTrue(luhn_valid("4111 1111 1111 1111"))
+        self.assertFalse(luhn_valid("4111 1111 1111 1112"))
+        self.assertTrue(iban_valid("GB82 WEST 1234 5698 7654 32"))
+        self.assertFalse(iban_valid("GB83 WEST 1234 5698 7654 32"))
+
+    def test_entity_spans_are_merged_with_typed_placeholders(self):
+        text = "Alice Johnson moved to Berlin for project falcon."
+        spans = [(0, 5, "PERSON"), (0, 13, "PERSON"), (23, 29, "GPE"), (34, 48, "ORG"), (49, 49, "CARDINAL")]
+        result = self.engine.redact(text, spans)
+        self.assertEqual(result.text, "<NAME> moved to <GPE> for <PROJECT>.")
+        self.assertEqual([span[3] for span in result.spans], ["Alice Johnson", "Berlin", "project falcon"])
+
+    def test_unconfigured_labels_are_kept(self):
+        engine = RedactionEngine(entity_types={"PERSON": "NAME"})
+        self.assertEqual(engine.redact("Bob in Paris", [(0, 3, "PERSON"), (7, 12, "GPE")]).text, "<NAME> in Paris")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import time
+import unittest
+from unittest.mock import patch
+import response_cache
+from response_cache import ResponseCache, ResponseCacheConfig, hashed_embedding, normalize_query
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_exact_hit_on_normalized_query(self):
+        cache = ResponseCache()
+        cache.put("What makes a great hotel?", "1", "Clean rooms.", cost_seconds=2.0)
+        self.assertEqual(cache.get("  what makes a GREAT hotel ", "1"), "Clean rooms.")
+        self.assertIsNone(cache.get("What makes a great hotel?", "2"))
+        stats = cache.stats()
+        self.assertEqual((stats["exact_hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["latency_saved_seconds"], 2.0)
+
+    def test_semantic_hit_above_threshold(self):
+        cache = ResponseCache(similarity_threshold=0.7, embed_fn=hashed_embedding)
+        cache.put("what makes a great hotel stay for families", "1", "Space and pools.")
+        self.assertEqual(cache.get("what makes a great hotel stay for big families", "1"), "Space and pools.")
+        self.assertIsNone(cache.get("how do I reset my password", "1"))
+        self.assertEqual(cache.stats()["semantic_hits"], 1)
+
+    def test_semantic_tier_off_without_embed_fn(self):
+        with patch.object(ResponseCacheConfig, "ENABLED", True), \
+                patch.object(ResponseCacheConfig, "SEMANTIC_ENABLED", False), \
+                patch.object(response_cache, "_response_cache", None), \
+                patch.object(response_cache, "load_query_embedder") as load_query_embedder:
+            self.assertIsNone(response_cache.get_response_cache().embed_fn)
+        load_query_embedder.assert_not_called()
+        cache = ResponseCache(similarity_threshold=0.1)
+        cache.put("what makes a great hotel stay for families", "1", "Space and pools.")
+        self.assertIsNone(cache.get("what makes a great hotel stay for big families", "1"))
+
+    def test_different_entities_or_negation_do_not_match(self):
+        cache = ResponseCache(similarity_threshold=0.5, embed_fn=hashed_embedding)
+        cache.put("What is the best hotel in Paris for families?", "1", "Paris answer.")
+        cache.put("Which hotels allow pets?", "1", "Pet answer.")
+        cache.put("Show bookings from 2023 for the spa", "1", "2023 answer.")
+        self.assertIsNone(cache.get("What is the best hotel in London for families?", "1"))
+        self.assertIsNone(cache.get("Which hotels do not allow pets?", "1"))
+        self.assertIsNone(cache.get("Which hotels don't allow pets?", "1"))
+        self.assertIsNone(cache.get("Show bookings from 2024 for the spa", "1"))
+        self.assertEqual(cache.get("what is the best hotel in Paris for big families", "1"), "Paris answer.")
+
+    def test_ttl_expiry(self):
+        cache = ResponseCache(ttl=0.01)
+        cache.put("q", "1", "a")
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("q", "1"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_lru_eviction_by_bytes(self):
+        cache = ResponseCache(max_bytes=30)
+        cache.put("a", "1", "x" * 10)
+        cache.put("b", "1", "y" * 10)
+        cache.get("a", "1")
+        cache.put("c", "1", "z" * 10)
+        self.assertIsNotNone(cache.get("a", "1"))
+        self.assertIsNone(cache.get("b", "1"))
+        self.assertLessEqual(cache.stats()["bytes"], 30)
+
+    def test_invalidate_corpus(self):
+        cache = ResponseCache()
+        cache.put("q", "1", "a")
+        cache.put("q", "2", "b")
+        cache.invalidate("1")
+        self.assertIsNone(cache.get("q", "1"))
+        self.assertEqual(cache.get("q", "2"), "b")
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("Hello,   World!"), "hello world")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import threading
+import time
+import unittest
+from sql_agent.safety_checks import DELETE_REFUSAL, SafetyCheckEngine, delete_prefilter
+
+
+class TestSafetyChecks(unittest.TestCase):
+    def test_delete_prefilter(self):
+        self.assertEqual(delete_prefilter("DROP TABLE tasks;"), DELETE_REFUSAL)
+        self.assertEqual(delete_prefilter("please delete from tasks where id = 3"), DELETE_REFUSAL)
+        self.assertEqual(delete_prefilter("show my tasks due this week", fast_pass=True), "True")
+        self.assertIsNone(delete_prefilter("remove my last task", fast_pass=True))
+        self.assertIsNone(delete_prefilter("show my tasks", fast_pass=False))
+
+    def test_only_statement_shaped_sql_is_refused(self):
+        for statement in ("drop table tasks", "DROP TABLE IF EXISTS public.tasks;", "truncate table users",
+                          "delete from tasks;", "DELETE FROM tasks WHERE id = 3",
+                          "alter table tasks drop column owner;", "run this:\ndrop database app;\nthanks"):
+            self.assertEqual(delete_prefilter(statement, fast_pass=False), DELETE_REFUSAL, statement)
+        for prose in ("truncate long titles", "delete from cart fails", "drop index cards",
+                      "why does delete from cart fail for me?", "drop table of contents from the report"):
+            self.assertIsNone(delete_prefilter(prose, fast_pass=False), prose)
+
+    def test_fast_pass_is_off_by_default(self):
+        self.assertIsNone(delete_prefilter("show my tasks due this week"))
+
+    def test_first_failure_short_circuits(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(input):
+            started.set()
+            release.wait(5)
+            return "True"
+
+        engine = SafetyCheckEngine({"slow": slow, "fail": lambda input: "missing project"}, max_workers=2)
+        start = time.monotonic()
+        self.assertEqual(engine.run("add a task"), "missing project")
+        self.assertLess(time.monotonic() - start, 1.0)
+        release.set()
+
+    def test_all_pass_and_verdicts_are_memoized(self):
+        calls = []
+
+        def check(input):
+            calls.append(input)
+            return "True"
+
+        engine = SafetyCheckEngine({"a": check, "b": check})
+        self.assertEqual(engine.run("Add a  task"), "True")
+        self.assertEqual(engine.run("add a task"), "True")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(engine.stats["memo_hits"], 2)
+
+    def test_prefilter_skips_llm_call(self):
+        def check(input):
+            raise AssertionError("LLM check should not run")
+
+        engine = SafetyCheckEngine({"delete": check}, prefilters={"delete": delete_prefilter})
+        self.assertEqual(engine.run("truncate table users"), DELETE_REFUSAL)
+        self.assertEqual(engine.stats["prefiltered"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine, text
+from sql_agent.schema_catalog import SchemaCatalog
+from sql_agent.schema_retrieval import get_schema_index
+
+
+class TestSchemaCatalog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.url = f"sqlite:///{os.path.join(self.tmp.name, 'test.db')}"
+        self.engine = create_engine(self.url)
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE tasks (id INTEGER PRIMARY KEY, name VARCHAR(50))"))
+            connection.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(80))"))
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_reflects_once(self):
+        catalog = SchemaCatalog(self.url, ttl=3600, engine=self.engine)
+        schema = catalog.get_schema()
+        self.assertEqual(schema["tasks"], [("id", "INTEGER"), ("name", "VARCHAR(50)")])
+        catalog.get_schema()
+        self.assertEqual(catalog.stats["checks"], 1)
+        self.assertIn('"tasks"', catalog.schema_str)
+
+    def test_refreshes_only_changed_tables(self):
+        catalog = SchemaCatalog(self.url, ttl=0, engine=self.engine)
+        catalog.get_schema()
+        version = catalog.version
+        with self.engine.begin() as connection:
+            connection.execute(text("ALTER TABLE tasks ADD COLUMN due DATE"))
+            connection.execute(text("DROP TABLE users"))
+        schema = catalog.get_schema()
+        self.assertIn(("due", "DATE"), schema["tasks"])
+        self.assertNotIn("users", schema)
+        self.assertEqual(catalog.stats["full_reflections"], 1)
+        self.assertEqual(catalog.stats["tables_reflected"], 3)
+        self.assertNotEqual(catalog.version, version)
+
+    def test_foreign_key_change_refreshes_details(self):
+        catalog = SchemaCatalog(self.url, ttl=0, engine=self.engine)
+        catalog.get_schema()
+        self.assertEqual(catalog.details["tasks"]["foreign_keys"], {})
+        version, index = catalog.version, get_schema_index(catalog)
+        with self.engine.begin() as connection:
+            connection.execute(text("DROP TABLE tasks"))
+            connection.execute(text("CREATE TABLE tasks (id INTEGER PRIMARY KEY, "
+                                    "name VARCHAR(50) REFERENCES users(email))"))
+        catalog.get_schema()
+        self.assertEqual(catalog.details["tasks"]["foreign_keys"], {"name": "users.email"})
+        # The schema index (and the query cache) are keyed on the version.
+        self.assertNotEqual(catalog.version, version)
+        self.assertIsNot(get_schema_index(catalog), index)
+        self.assertEqual(get_schema_index(catalog).neighbors["tasks"], {"users"})
+
+    def test_disk_cache(self):
+        cache_path = os.path.join(self.tmp.name, "schema.json")
+        SchemaCatalog(self.url, ttl=0, cache_path=cache_path, engine=self.engine).get_schema()
+        catalog = SchemaCatalog(self.url, ttl=0, cache_path=cache_path, engine=self.engine)
+        self.assertEqual(sorted(catalog.get_schema()), ["tasks", "users"])
+        self.assertEqual(catalog.stats["full_reflections"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
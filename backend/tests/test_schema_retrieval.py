@@ -0,0 +1,56 @@
+import unittest
+from sql_agent.schema_retrieval import SchemaIndex, tokenize_identifier
+
+SCHEMA = {
+    "users": [("id", "INTEGER"), ("email", "VARCHAR(80)")],
+    "tasks": [("id", "INTEGER"), ("name", "VARCHAR"), ("dueDate", "DATE"), ("user_id", "INTEGER")],
+    "invoices": [("id", "INTEGER"), ("amount", "NUMERIC")],
+}
+DETAILS = {
+    "users": {"comment": "People with a discord account", "column_comments": {}, "foreign_keys": {}},
+    "tasks": {"comment": None, "column_comments": {}, "foreign_keys": {"user_id": "users.id"}},
+    "invoices": {"comment": None, "column_comments": {}, "foreign_keys": {}},
+}
+
+
+class TestSchemaRetrieval(unittest.TestCase):
+    def test_tokenize_identifier(self):
+        self.assertEqual(tokenize_identifier("dueDate_utc tasks"), ["due", "date", "utc", "task"])
+
+    def test_selects_relevant_tables_with_fk_neighbors(self):
+        index = SchemaIndex(SCHEMA, DETAILS)
+        self.assertEqual(index.select("tasks due this week", top_k=1), ["tasks", "users"])
+        self.assertEqual(index.select("tasks due this week", top_k=1, include_fk_neighbors=False), ["tasks"])
+
+    def test_fk_neighbors_are_capped(self):
+        schema = {"users": [("id", "INTEGER"), ("name", "VARCHAR")]}
+        schema.update({f"table_{i}": [("id", "INTEGER"), ("user_id", "INTEGER")] for i in range(499)})
+        schema["user_names"] = [("id", "INTEGER"), ("user_id", "INTEGER"), ("name", "VARCHAR")]
+        details = {name: {"foreign_keys": {"user_id": "users.id"}} for name in schema if name != "users"}
+        index = SchemaIndex(schema, details)
+        selected = index.select("list user names", top_k=2)
+        self.assertEqual(selected, ["user_names", "users", "table_0", "table_1", "table_10"])
+        self.assertEqual(len(index.select("list user names", top_k=2, max_neighbors=50, max_tables=10)), 10)
+
+    def test_comments_are_indexed(self):
+        index = SchemaIndex(SCHEMA, DETAILS)
+        self.assertEqual(index.select("which discord account", top_k=1, include_fk_neighbors=False), ["users"])
+
+    def test_no_match_returns_most_connected_tables(self):
+        index = SchemaIndex(SCHEMA, DETAILS)
+        self.assertEqual(index.select("hello there", top_k=2), ["users", "tasks"])
+
+        schema = {f"table_{i}": [("id", "INTEGER")] for i in range(500)}
+        details = {f"table_{i}": {"foreign_keys": {"hub_id": "table_0.id"}} for i in range(1, 500)}
+        selected = SchemaIndex(schema, details).select("hello there", top_k=8)
+        self.assertEqual(len(selected), 8)
+        self.assertEqual(selected[0], "table_0")
+
+    def test_compact_serialization(self):
+        index = SchemaIndex(SCHEMA, DETAILS)
+        self.assertEqual(index.serialize(["tasks"]),
+                         "tasks(id INTEGER, name VARCHAR, dueDate DATE, user_id INTEGER -> users.id)")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+try:
+    from sql_agent import runtime
+    from sql_agent.runtime import PROMPT_TEMPLATES, SQLAgentRuntime
+except ImportError:  # langchain is not installed
+    runtime = None
+
+
+def slow_factory(calls, name):
+    """
+    Returns a constructor stand-in that records each build and yields the thread, so
+    concurrent callers overlap inside the double-checked locks.
+    """
+    def build(*args, **kwargs):
+        calls.append(name)
+        threading.Event().wait(0.01)
+        return SimpleNamespace(name=name, args=args, kwargs=kwargs)
+    return build
+
+
+@unittest.skipIf(runtime is None, "langchain is not installed")
+class TestSQLAgentRuntime(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        for name in ("ChatOpenAI", "LLMChain", "initialize_agent"):
+            patcher = patch.object(runtime, name, side_effect=slow_factory(self.calls, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for name in ("PromptTemplate", "AgentType"):
+            patcher = patch.object(runtime, name, MagicMock())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.runtime = SQLAgentRuntime(tools=[], http_pool_size=2)
+
+    def run_concurrently(self, target, threads=8):
+        start = threading.Barrier(threads)
+        results = []
+
+        def worker():
+            start.wait()
+            results.append(target())
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return results
+
+    def test_concurrent_callers_build_each_object_once(self):
+        chains = self.run_concurrently(lambda: self.runtime.chain("sql_generation"))
+        agents = self.run_concurrently(lambda: self.runtime.agent)
+        self.assertTrue(all(chain is chains[0] for chain in chains))
+        self.assertTrue(all(agent is agents[0] for agent in agents))
+        self.assertEqual(self.calls, ["ChatOpenAI", "LLMChain", "initialize_agent"])
+        self.assertIs(chains[0].kwargs["llm"], self.runtime.llm)
+
+    def test_warm_up_builds_everything_and_logs_failures(self):
+        steps = []
+
+        def failing_step():
+            raise RuntimeError("database down")
+
+        with self.assertLogs(level="WARNING") as logs:
+            self.runtime.warm_up([lambda: steps.append("schema"), failing_step, lambda: steps.append("connection")])
+        self.assertEqual(steps, ["schema", "connection"])
+        self.assertIn("database down", logs.output[0])
+        self.assertEqual(self.calls.count("LLMChain"), len(PROMPT_TEMPLATES))
+        self.assertEqual(self.calls.count("ChatOpenAI"), 1)
+        self.assertEqual(self.calls.count("initialize_agent"), 1)
+        self.runtime.warm_up()
+        self.assertEqual(len(self.calls), len(PROMPT_TEMPLATES) + 2)
+
+    @unittest.skipIf(runtime is not None and runtime.openai is None, "openai is not installed")
+    def test_session_is_installed_once_at_construction(self):
+        self.assertIs(runtime.openai.requestssession, self.runtime.session)
+        other = SQLAgentRuntime(tools=[], http_pool_size=2)
+        self.runtime.llm
+        self.assertIs(runtime.openai.requestssession, other.session)
+
+
+if __name__ == '__main__':
+    unittest.main()
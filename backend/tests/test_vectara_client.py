@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import MagicMock
+import requests
+from vectara.vectara_client import CircuitBreaker, CircuitOpenError, VectaraClient, VectaraError
+
+
+def make_response(status, body=None):
+    response = MagicMock()
+    response.status_code = status
+    response.json.return_value = body or {}
+    response.text = ""
+    return response
+
+
+class TestVectaraClient(unittest.TestCase):
+    def make_client(self, **kwargs):
+        client = VectaraClient("key", "1", "2", backoff=0, **kwargs)
+        client.session = MagicMock()
+        return client
+
+    def test_retries_transient_failures(self):
+        client = self.make_client(max_retries=2)
+        client.session.post.side_effect = [requests.ConnectionError("reset"), make_response(503),
+                                           make_response(200, {"results": ["hit"]})]
+        self.assertEqual(client.query("q"), ["hit"])
+        self.assertEqual(client.session.post.call_count, 3)
+        self.assertEqual(client.metrics()["endpoints"]["/v1/query"]["count"], 3)
+
+    def test_client_errors_are_not_retried(self):
+        client = self.make_client(max_retries=2)
+        client.session.post.return_value = make_response(400)
+        with self.assertRaises(VectaraError):
+            client.query("q")
+        self.assertEqual(client.session.post.call_count, 1)
+        self.assertEqual(client.breaker.state, "closed")
+
+    def test_circuit_opens_and_fails_fast(self):
+        client = self.make_client(max_retries=0, failure_threshold=2, reset_timeout=60)
+        client.session.post.side_effect = requests.Timeout("read timed out")
+        for _ in range(2):
+            with self.assertRaises(VectaraError):
+                client.query("q")
+        with self.assertRaises(CircuitOpenError):
+            client.query("q")
+        self.assertEqual(client.session.post.call_count, 2)
+
+    def test_half_open_trial_closes_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_half_open_trial_with_unexpected_error_reopens_circuit(self):
+        client = self.make_client(max_retries=0, failure_threshold=1, reset_timeout=0)
+        client.session.post.side_effect = requests.Timeout("read timed out")
+        with self.assertRaises(VectaraError):
+            client.query("q")
+        for error in (requests.exceptions.ChunkedEncodingError("truncated"), RuntimeError("bug")):
+            client.session.post.side_effect = error
+            with self.assertRaises(Exception):
+                client.query("q")
+            self.assertEqual(client.breaker.state, "half-open")
+        client.session.post.side_effect = None
+        client.session.post.return_value = make_response(200, {"results": ["hit"]})
+        self.assertEqual(client.query("q"), ["hit"])
+        self.assertEqual(client.breaker.state, "closed")
+
+
+if __name__ == '__main__':
+    unittest.main()
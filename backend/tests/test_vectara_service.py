@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from vectara import vectara_service
+from vectara.vectara_client import VectaraError
+
+
+class TestQueryVectara(unittest.TestCase):
+    def setUp(self):
+        self.local = MagicMock()
+        self.local.query.return_value = [{"documentId": "local", "text": "offline answer", "score": 0.5}]
+
+    def test_falls_back_when_credentials_are_missing(self):
+        with patch.object(vectara_service, "get_vectara_client", side_effect=KeyError("VECTARA_API_KEY")), \
+                patch.object(vectara_service, "get_local_index", return_value=self.local), \
+                self.assertLogs(level="WARNING"):
+            results = vectara_service.query_vectara("refund policy")
+        self.assertEqual(results[0]["documentId"], "local")
+        self.local.query.assert_called_once_with("refund policy")
+
+    def test_falls_back_when_the_query_fails(self):
+        client = MagicMock()
+        client.query.side_effect = VectaraError("HTTP 503")
+        with patch.object(vectara_service, "get_vectara_client", return_value=client), \
+                patch.object(vectara_service, "get_local_index", return_value=self.local), \
+                self.assertLogs(level="WARNING"):
+            self.assertEqual(vectara_service.query_vectara("refund policy")[0]["documentId"], "local")
+
+    def test_without_local_index_returns_no_results(self):
+        with patch.object(vectara_service, "get_vectara_client", side_effect=KeyError("VECTARA_API_KEY")), \
+                patch.object(vectara_service, "get_local_index", return_value=None), \
+                self.assertLogs(level="WARNING"):
+            self.assertEqual(vectara_service.query_vectara("refund policy"), [])
+
+    def test_uses_vectara_when_available(self):
+        client = MagicMock()
+        client.query.return_value = [{"documentId": "remote"}]
+        with patch.object(vectara_service, "get_vectara_client", return_value=client), \
+                patch.object(vectara_service, "get_local_index") as get_local_index:
+            self.assertEqual(vectara_service.query_vectara("refund policy"), [{"documentId": "remote"}])
+        get_local_index.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
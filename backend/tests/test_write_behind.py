@@ -0,0 +1,64 @@
+import threading
+import time
+import unittest
+from database.write_behind import BufferFull, WriteBehindBuffer
+
+
+class TestWriteBehindBuffer(unittest.TestCase):
+    def test_flushes_by_size(self):
+        batches = []
+        buffer = WriteBehindBuffer(batches.append, max_batch_size=3, flush_interval=60)
+        for i in range(6):
+            buffer.enqueue(i)
+        self.assertTrue(buffer.flush(timeout=2))
+        buffer.close()
+        self.assertEqual(batches, [[0, 1, 2], [3, 4, 5]])
+        self.assertEqual(buffer.metrics()["rows_written"], 6)
+
+    def test_flushes_by_time(self):
+        flushed = threading.Event()
+        buffer = WriteBehindBuffer(lambda batch: flushed.set(), max_batch_size=100, flush_interval=0.05)
+        buffer.enqueue("row")
+        self.assertTrue(flushed.wait(2))
+        buffer.close()
+
+    def test_close_flushes_pending_rows(self):
+        batches = []
+        buffer = WriteBehindBuffer(batches.append, max_batch_size=100, flush_interval=60)
+        buffer.enqueue("a")
+        buffer.enqueue("b")
+        buffer.close()
+        self.assertEqual(batches, [["a", "b"]])
+        with self.assertRaises(RuntimeError):
+            buffer.enqueue("c")
+
+    def test_backpressure(self):
+        release = threading.Event()
+        buffer = WriteBehindBuffer(lambda batch: release.wait(), max_batch_size=1, flush_interval=0.01,
+                                   max_pending=1, enqueue_timeout=0.05)
+        buffer.enqueue(1)
+        time.sleep(0.05)  # worker takes row 1 and blocks writing it
+        buffer.enqueue(2)
+        with self.assertRaises(BufferFull):
+            buffer.enqueue(3)
+        release.set()
+        buffer.close()
+        self.assertEqual(buffer.metrics()["rows_written"], 2)
+
+    def test_failed_flush_is_retried(self):
+        calls = []
+
+        def flaky(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise ConnectionError("database unavailable")
+
+        buffer = WriteBehindBuffer(flaky, max_batch_size=10, flush_interval=60, retry_backoff=0)
+        buffer.enqueue("row")
+        buffer.close()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(buffer.metrics()["rows_failed"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,13 +12,16 @@ class TestEntityProcessing(unittest.TestCase):
         extracted_entities = extract_entities(test_text)
         self.assertEqual(sorted(extracted_entities), sorted(expected_entities))
 
-    @patch('src.llm_censor.censor_entity_service.nlp')
-    def test_censor_sensitive_information(self, mocked_nlp):
+    @patch('src.llm_censor.censor_entity_service.get_ner_pipeline')
+    def test_censor_sensitive_information(self, mocked_get_ner_pipeline):
         """Test censoring of sensitive information using mocked NLP model."""
-        # Setup mock for Spacy NLP model
+        # Setup mock for the lazily loaded Spacy NLP model
+        mocked_nlp = MagicMock()
         mocked_doc = MagicMock()
-        mocked_doc.ents = [MagicMock(text="John Doe", label_="PERSON"), MagicMock(text="New York", label_="GPE")]
+        mocked_doc.ents = [MagicMock(text="John Doe", label_="PERSON", start_char=0, end_char=8),
+                           MagicMock(text="New York", label_="GPE", start_char=18, end_char=26)]
         mocked_nlp.return_value = mocked_doc
+        mocked_get_ner_pipeline.return_value = (mocked_nlp, [])
 
         test_text = "John Doe lives in New York."
         censored_text, entities = censor_sensitive_information(test_text)
@@ -35,13 +38,10 @@ class TestEntityProcessing(unittest.TestCase):
         
         mocked_db_creation.assert_called_with(censored_content, entities)
 
-    @patch('src.llm_censor.censor_entity_service.VectorStoreIndex')
-    @patch('src.llm_censor.censor_entity_service.QdrantVectorStore')
-    @patch('src.llm_censor.censor_entity_service.qdrant_client.QdrantClient')
-    def test_create_entity_related_memory(self, mocked_client, mocked_vector_store, mocked_index):
+    def test_create_entity_related_memory(self):
         """Test creation of entity-related memory with mocked vector database."""
         entities = [('SpaceX', 'ORG')]
-        mock_index_instance = mocked_index.return_value
+        mock_index_instance = MagicMock()
         mock_index_instance.as_query_engine.return_value.query.return_value = [
             {"content": "SpaceX", "relation": "similar"}
         ]
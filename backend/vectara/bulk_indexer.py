@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class IndexReport:
+    """
+    Outcome of a bulk indexing run.
+    """
+    def __init__(self):
+        self.succeeded = 0
+        self.skipped = 0
+        self.retries = 0
+        self.failed = {}  # documentId -> last error
+        self.started_at = time.monotonic()
+        self.elapsed = 0.0
+
+    @property
+    def docs_per_second(self):
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"<IndexReport(succeeded={self.succeeded}, failed={len(self.failed)}, skipped={self.skipped}, "
+                f"retries={self.retries}, elapsed={self.elapsed:.1f}s, docs_per_second={self.docs_per_second:.1f})>")
+
+
+class Checkpoint:
+    """
+    Append-only file of successfully indexed documentIds, so interrupted runs can resume.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+        self._file = open(path, "a") if path else None
+
+    def mark(self, document_id):
+        with self._lock:
+            self.done.add(document_id)
+            if self._file is not None:
+                self._file.write(f"{document_id}\n")
+                self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class BulkIndexer:
+    """
+    Uploads documents to Vectara with bounded concurrency over a pooled session.
+
+    Requests failing with 429/5xx or a connection error are retried with exponential
+    backoff and jitter (honouring Retry-After). Successful documentIds are appended to
+    an optional checkpoint file and skipped on the next run.
+    """
+    def __init__(self, api_key, customer_id, corpus_id, api_url="https://api.vectara.io", max_workers=8,
+                 max_retries=5, backoff=0.5, max_backoff=30.0, timeout=(5, 60), checkpoint_path=None,
+                 progress_every=100):
+        self.endpoint = f"{api_url}/v1/index"
+        self.customer_id = customer_id
+        self.corpus_id = corpus_id
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.checkpoint_path = checkpoint_path
+        self.progress_every = progress_every
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "x-api-key": api_key,
+            "customer-id": str(customer_id),
+            "Content-Type": "application/json",
+        })
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """
+        Creates a BulkIndexer from the VECTARA_* environment variables.
+        """
+        return cls(
+            api_key=os.environ['VECTARA_API_KEY'],
+            customer_id=os.environ['VECTARA_CUSTOMER_ID'],
+            corpus_id=os.environ['VECTARA_CORPUS_ID'],
+            api_url=os.environ.get('VECTARA_API_URL', 'https://api.vectara.io'),
+            **kwargs
+        )
+
+    def _upload(self, document):
+        """
+        Posts one document, retrying transient failures. Returns (error or None, retries).
+        """
+        body = json.dumps({"customerId": self.customer_id, "corpusId": self.corpus_id, "document": document})
+        for attempt in range(self.max_retries + 1):
+            delay = None
+            try:
+                response = self.session.post(self.endpoint, data=body, timeout=self.timeout)
+                if response.status_code == 200:
+                    return None, attempt
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    return error, attempt
+                retry_after = response.headers.get("Retry-After")
+                if retry_after and retry_after.isdigit():
+                    delay = min(float(retry_after), self.max_backoff)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            if attempt < self.max_retries:
+                if delay is None:
+                    delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+                time.sleep(delay)
+        return error, self.max_retries
+
+    def index(self, documents):
+        """
+        Uploads every document from the iterable and returns an IndexReport.
+        Documents are consumed lazily; at most 2 * max_workers are held in memory.
+        """
+        report = IndexReport()
+        checkpoint = Checkpoint(self.checkpoint_path)
+        lock = threading.Lock()
+
+        def upload(document):
+            document_id = document["documentId"]
+            try:
+                error, retries = self._upload(document)
+            except Exception as e:  # A bad document must not abort the rest of the run
+                error, retries = f"{type(e).__name__}: {e}", 0
+            with lock:
+                report.retries += retries
+                if error is None:
+                    report.succeeded += 1
+                    checkpoint.mark(document_id)
+                else:
+                    report.failed[document_id] = error
+                    logging.error(f"Error uploading document ID {document_id}: {error}")
+                done = report.succeeded + len(report.failed)
+                if self.progress_every and done % self.progress_every == 0:
+                    elapsed = time.monotonic() - report.started_at
+                    logging.info(f"Indexed {report.succeeded} documents ({len(report.failed)} failed, "
+                                 f"{report.succeeded / elapsed:.1f} docs/s)")
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                in_flight = set()
+                for document in documents:
+                    if document["documentId"] in checkpoint.done:
+                        report.skipped += 1
+                        continue
+                    if len(in_flight) >= 2 * self.max_workers:
+                        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            future.result()
+                    in_flight.add(executor.submit(upload, document))
+                for future in in_flight:
+                    future.result()
+        finally:
+            checkpoint.close()
+            report.elapsed = time.monotonic() - report.started_at
+        logging.info(f"Bulk indexing finished: {report}")
+        return report
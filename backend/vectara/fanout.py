@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from vectara.vectara_client import get_vectara_client
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(max_workers=32):
+    """
+    Returns the shared thread pool used for fan-out, so threads are not re-created per request.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vectara-fanout")
+        return _executor
+
+
+def result_key(result):
+    """
+    Identity used to de-duplicate results returned by several shards.
+    """
+    if isinstance(result, dict):
+        for field in ("documentId", "id"):
+            if result.get(field) is not None:
+                return result[field]
+        return result.get("text")
+    return result
+
+
+class FanOutResult:
+    """
+    Merged results of a fan-out query plus which shards failed or missed the deadline.
+    """
+    def __init__(self, results, failed, timed_out, elapsed):
+        self.results = results
+        self.failed = failed
+        self.timed_out = timed_out
+        self.elapsed = elapsed
+
+    @property
+    def partial(self):
+        return bool(self.failed or self.timed_out)
+
+    def __repr__(self):
+        return (f"<FanOutResult(results={len(self.results)}, failed={self.failed}, "
+                f"timed_out={self.timed_out}, elapsed={self.elapsed:.3f}s)>")
+
+
+def reciprocal_rank_fusion(ranked_lists, k=60, top_k=10):
+    """
+    Merges ranked result lists with reciprocal-rank fusion: score = sum(1 / (k + rank)).
+    Duplicates (by result_key) are merged and keep the copy from their best-ranked list.
+
+    Args:
+        ranked_lists (list): (shard, results) pairs, results ordered best first.
+        k (int): RRF damping constant.
+        top_k (int): Number of fused results to return.
+
+    Returns:
+        list: Result dicts with added "fusedScore" and "shards" fields, best first.
+    """
+    scores = {}
+    best = {}
+    shards = {}
+    for shard, results in ranked_lists:
+        for rank, result in enumerate(results, start=1):
+            key = result_key(result)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            shards.setdefault(key, []).append(shard)
+            if key not in best or rank < best[key][0]:
+                best[key] = (rank, result)
+    fused = []
+    for key in sorted(scores, key=scores.get, reverse=True)[:top_k]:
+        result = best[key][1]
+        result = dict(result) if isinstance(result, dict) else {"text": result}
+        result["fusedScore"] = scores[key]
+        result["shards"] = shards[key]
+        fused.append(result)
+    return fused
+
+
+def fan_out(shards, deadline=5.0, rrf_k=60, top_k=10, page_size=10, client=None):
+    """
+    Runs (query, corpus_id) shards concurrently and fuses whatever returns before the deadline.
+    Wall-clock time is bounded by the slowest shard or the deadline, not the sum.
+    """
+    shards = list(shards)
+    client = client or get_vectara_client()
+    executor = _get_executor()
+    start = time.monotonic()
+    futures = {
+        executor.submit(client.query, query, corpus_id, page_size): (query, corpus_id)
+        for query, corpus_id in shards
+    }
+    done, not_done = wait(futures, timeout=deadline)
+
+    ranked_lists, failed = [], []
+    for future in done:
+        shard = futures[future]
+        try:
+            ranked_lists.append((shard, future.result()))
+        except Exception as e:
+            logging.warning(f"Vectara shard {shard} failed: {e}")
+            failed.append(shard)
+    timed_out = [futures[future] for future in not_done]
+    for future in not_done:
+        # Shards still queued are dropped; running ones are bounded by the client's read timeout.
+        future.cancel()
+    if timed_out:
+        logging.warning(f"Vectara shards {timed_out} missed the {deadline}s deadline, returning partial results")
+
+    # Keep the fused order independent of completion order.
+    ranked_lists.sort(key=lambda item: shards.index(item[0]))
+    results = reciprocal_rank_fusion(ranked_lists, k=rrf_k, top_k=top_k)
+    return FanOutResult(results, failed, timed_out, time.monotonic() - start)
+
+
+def query_corpora(query, corpus_ids, **kwargs):
+    """
+    Issues one query against several corpora concurrently and fuses the results.
+    """
+    return fan_out([(query, corpus_id) for corpus_id in corpus_ids], **kwargs)
+
+
+def query_rewrites(queries, corpus_id=None, **kwargs):
+    """
+    Issues several rewrites of a query against one corpus concurrently and fuses the results.
+    """
+    return fan_out([(query, corpus_id) for query in queries], **kwargs)
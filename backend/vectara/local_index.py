@@ -0,0 +1,358 @@
+import json
+import logging
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for the local index
+    np = None
+
+FORMAT_VERSION = 1
+
+
+class LocalIndexConfig:
+    """
+    Configuration for the local, memory-mapped vector index used when Vectara is unavailable.
+    """
+    INDEX_DIR = os.getenv('LOCAL_INDEX_DIR')
+    EMBED_MODEL = os.getenv('LOCAL_INDEX_EMBED_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+    NPROBE = int(os.getenv('LOCAL_INDEX_NPROBE', '16'))
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of local index parameters.
+        """
+        return {"index_dir": cls.INDEX_DIR, "embed_model": cls.EMBED_MODEL, "nprobe": cls.NPROBE}
+
+
+def normalize_rows(vectors):
+    """
+    Scales rows to unit length (zero rows are left as they are), so dot products are cosines.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores, k):
+    """
+    Column indices of the k highest scores of each row, best first.
+    """
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def train_centroids(vectors, nlist, iterations=10, sample_size=None, block_rows=65536, seed=0):
+    """
+    Spherical k-means on a sample of the (unit-length) vectors.
+
+    Returns:
+        ndarray: (nlist, dim) float32 unit-length centroids.
+    """
+    rng = np.random.default_rng(seed)
+    count = vectors.shape[0]
+    sample_size = min(count, sample_size or max(nlist * 64, 10000))
+    sample = normalize_rows(vectors[np.sort(rng.choice(count, sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = assign_lists(sample, centroids, block_rows)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=nlist) == 0
+        # Empty lists restart from random points instead of staying dead.
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def assign_lists(vectors, centroids, block_rows=65536):
+    """
+    Index of the nearest centroid of each vector, computed block by block.
+    """
+    assignment = np.empty(vectors.shape[0], dtype=np.int32)
+    for start in range(0, vectors.shape[0], block_rows):
+        block = np.asarray(vectors[start:start + block_rows], dtype=np.float32)
+        assignment[start:start + block_rows] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+def _write_table(path, rows):
+    """
+    Writes strings as one UTF-8 blob plus an int64 offsets array (row i is blob[o[i]:o[i+1]]).
+    """
+    offsets = [0]
+    with open(f"{path}.bin", "wb") as f:
+        for row in rows:
+            data = row.encode()
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    np.save(f"{path}.offsets.npy", np.asarray(offsets, dtype=np.int64))
+
+
+class _Table:
+    """
+    Read side of _write_table, memory-mapped.
+    """
+    def __init__(self, path):
+        self.offsets = np.load(f"{path}.offsets.npy", mmap_mode="r")
+        size = os.path.getsize(f"{path}.bin")
+        self.blob = np.memmap(f"{path}.bin", dtype=np.uint8, mode="r") if size else np.zeros(0, dtype=np.uint8)
+
+    def __getitem__(self, row):
+        return self.blob[self.offsets[row]:self.offsets[row + 1]].tobytes().decode()
+
+
+class LocalVectorIndex:
+    """
+    In-process vector search over embeddings stored in a memory-mapped .npy file.
+
+    Vectors are stored unit-length as float16 or float32 and scored by cosine similarity
+    with blocked matrix products, so only the blocks being scored need to be in memory.
+    With nlist > 0 the index is IVF-partitioned: vectors are grouped by their nearest of
+    nlist k-means centroids, stored contiguously per list, and a query only scores the
+    nprobe lists closest to it. Texts, document ids and metadata live in memory-mapped
+    side tables, read only for the returned rows.
+
+    Directory layout: index.json, vectors.npy, centroids.npy and list_offsets.npy (IVF),
+    texts.bin/.offsets.npy and records.bin/.offsets.npy.
+    """
+    def __init__(self, path, embed_fn=None, nprobe=16, block_rows=65536):
+        if np is None:
+            raise ImportError("numpy is required for the local vector index")
+        self.path = path
+        self.embed_fn = embed_fn
+        self.nprobe = nprobe
+        self.block_rows = block_rows
+        with open(os.path.join(path, "index.json")) as f:
+            self.info = json.load(f)
+        if self.info.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported local index version in {path}: {self.info.get('version')}")
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.centroids = self.list_offsets = None
+        if self.info["nlist"]:
+            self.centroids = np.load(os.path.join(path, "centroids.npy"))
+            self.list_offsets = np.load(os.path.join(path, "list_offsets.npy"))
+        self.texts = _Table(os.path.join(path, "texts"))
+        self.records = _Table(os.path.join(path, "records"))
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @classmethod
+    def build(cls, path, embeddings, texts, document_ids=None, metadata=None, dtype="float16", nlist=0,
+              block_rows=65536, embed_model=None, **kwargs):
+        """
+        Writes an index to path and opens it.
+
+        Args:
+            path (str): Directory to write (created if needed).
+            embeddings: (n, dim) array-like; may itself be a memmap, it is read block by block.
+            texts (list): n passage texts.
+            document_ids (list, optional): n document ids. Defaults to the row numbers.
+            metadata (list, optional): n dicts of metadata values.
+            dtype (str): "float16" or "float32" storage.
+            nlist (int): Number of IVF lists; 0 for exhaustive search.
+            embed_model (str, optional): Name of the model that produced the embeddings, recorded
+                so queries are not embedded with a different one.
+            kwargs: Passed to the constructor (embed_fn, nprobe).
+
+        Returns:
+            LocalVectorIndex
+        """
+        if np is None:
+            raise ImportError("numpy is required for the local vector index")
+        count, dim = embeddings.shape
+        if len(texts) != count:
+            raise ValueError(f"Got {count} embeddings but {len(texts)} texts")
+        os.makedirs(path, exist_ok=True)
+
+        order = None
+        if nlist:
+            nlist = min(nlist, count)
+            centroids = train_centroids(embeddings, nlist, block_rows=block_rows)
+            assignment = np.empty(count, dtype=np.int32)
+            for start in range(0, count, block_rows):
+                block = normalize_rows(embeddings[start:start + block_rows])
+                assignment[start:start + block_rows] = np.argmax(block @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind="stable")
+            list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))])
+            np.save(os.path.join(path, "centroids.npy"), centroids)
+            np.save(os.path.join(path, "list_offsets.npy"), list_offsets.astype(np.int64))
+
+        vectors = np.lib.format.open_memmap(os.path.join(path, "vectors.npy"), mode="w+",
+                                            dtype=np.dtype(dtype), shape=(count, dim))
+        for start in range(0, count, block_rows):
+            rows = order[start:start + block_rows] if order is not None else slice(start, start + block_rows)
+            vectors[start:start + block_rows] = normalize_rows(embeddings[rows])
+        vectors.flush()
+        del vectors
+
+        rows = order if order is not None else range(count)
+        _write_table(os.path.join(path, "texts"), (texts[row] for row in rows))
+        _write_table(os.path.join(path, "records"), (json.dumps({
+            "documentId": str(document_ids[row]) if document_ids is not None else str(row),
+            "metadata": metadata[row] if metadata is not None else {},
+        }) for row in rows))
+        with open(os.path.join(path, "index.json"), "w") as f:
+            json.dump({"version": FORMAT_VERSION, "count": count, "dim": dim, "dtype": dtype, "nlist": nlist,
+                       "embed_model": embed_model}, f)
+        return cls(path, block_rows=block_rows, **kwargs)
+
+    def _search_flat(self, queries, top_k):
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self), self.block_rows):
+            block = np.asarray(self.vectors[start:start + self.block_rows], dtype=np.float32)
+            scores = queries @ block.T
+            top = _top_k(scores, top_k)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            keep = _top_k(best_scores, top_k)
+            best_scores = np.take_along_axis(best_scores, keep, axis=1)
+            best_rows = np.take_along_axis(best_rows, keep, axis=1)
+        return best_scores, best_rows
+
+    def _search_ivf(self, queries, top_k, nprobe):
+        nprobe = min(nprobe, len(self.centroids))
+        probes = _top_k(queries @ self.centroids.T, nprobe)
+        # Score each probed list once against every query that probes it.
+        pairs_query = np.repeat(np.arange(len(queries)), nprobe)
+        pairs_list = probes.ravel()
+        grouping = np.argsort(pairs_list, kind="stable")
+        pairs_query, pairs_list = pairs_query[grouping], pairs_list[grouping]
+        boundaries = np.flatnonzero(np.diff(pairs_list)) + 1
+        candidate_query, candidate_row, candidate_score = [], [], []
+        for group in np.split(np.arange(len(pairs_list)), boundaries):
+            if not len(group):
+                continue
+            start, end = self.list_offsets[pairs_list[group[0]]], self.list_offsets[pairs_list[group[0]] + 1]
+            if start == end:
+                continue
+            members = pairs_query[group]
+            scores = queries[members] @ np.asarray(self.vectors[start:end], dtype=np.float32).T
+            top = _top_k(scores, top_k)
+            candidate_query.append(np.repeat(members, top.shape[1]))
+            candidate_row.append((top + start).ravel())
+            candidate_score.append(np.take_along_axis(scores, top, axis=1).ravel())
+
+        best_scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), top_k), -1, dtype=np.int64)
+        if candidate_query:
+            query_ids = np.concatenate(candidate_query)
+            rows = np.concatenate(candidate_row)
+            scores = np.concatenate(candidate_score)
+            order = np.lexsort((-scores, query_ids))
+            query_ids, rows, scores = query_ids[order], rows[order], scores[order]
+            firsts = np.searchsorted(query_ids, np.arange(len(queries)))
+            rank = np.arange(len(query_ids)) - firsts[query_ids]
+            keep = rank < top_k
+            best_scores[query_ids[keep], rank[keep]] = scores[keep]
+            best_rows[query_ids[keep], rank[keep]] = rows[keep]
+        return best_scores, best_rows
+
+    def search(self, query_vectors, top_k=10, nprobe=None):
+        """
+        Finds the top_k most similar stored vectors of each query vector.
+
+        Args:
+            query_vectors: (q, dim) or (dim,) array.
+            top_k (int): Results per query.
+            nprobe (int, optional): IVF lists scored per query. Defaults to self.nprobe.
+
+        Returns:
+            tuple: (scores, rows), two (q, top_k) arrays, best first. Rows are -1 (and scores
+            -inf) where the probed lists hold fewer than top_k vectors.
+        """
+        queries = normalize_rows(np.atleast_2d(query_vectors))
+        if len(self) == 0:
+            return (np.full((len(queries), top_k), -np.inf, dtype=np.float32),
+                    np.full((len(queries), top_k), -1, dtype=np.int64))
+        if self.centroids is not None:
+            return self._search_ivf(queries, top_k, nprobe or self.nprobe)
+        scores, rows = self._search_flat(queries, top_k)
+        if rows.shape[1] < top_k:
+            padding = top_k - rows.shape[1]
+            scores = np.pad(scores, ((0, 0), (0, padding)), constant_values=-np.inf)
+            rows = np.pad(rows, ((0, 0), (0, padding)), constant_values=-1)
+        return scores, rows
+
+    def result(self, row, score):
+        """
+        One result shaped like a Vectara query result.
+        """
+        record = json.loads(self.records[row])
+        return {
+            "documentId": record["documentId"],
+            "text": self.texts[row],
+            "score": float(score),
+            "metadata": [{"name": name, "value": str(value)} for name, value in record["metadata"].items()],
+        }
+
+    def query(self, query, top_k=10, nprobe=None):
+        """
+        Embeds the query with embed_fn and returns results like query_vectara: a list of
+        dicts with documentId, text, score and metadata (name/value pairs), best first.
+        """
+        if self.embed_fn is None:
+            raise ValueError("LocalVectorIndex.query needs an embed_fn; use search() with vectors")
+        scores, rows = self.search(self.embed_fn([query]), top_k, nprobe)
+        return [self.result(row, score) for row, score in zip(rows[0], scores[0]) if row >= 0]
+
+
+_local_index = None
+_local_index_lock = threading.Lock()
+_UNAVAILABLE = object()
+
+
+def open_local_index(index_dir, embed_model, nprobe=16):
+    """
+    Opens the index in index_dir with queries embedded by the sentence-transformers model
+    embed_model, which must be the model recorded when the index was built. sentence-transformers
+    (and torch) are imported here, so processes without a local index never load them.
+
+    Raises:
+        ImportError: If sentence-transformers is not installed.
+        OSError: If the index or the model cannot be read.
+        ValueError: If the index was built with another model or dimension.
+    """
+    index = LocalVectorIndex(index_dir, nprobe=nprobe)
+    built_with = index.info.get("embed_model")
+    if built_with is None:
+        logging.warning(f"Local index in {index_dir} does not record its embedding model, assuming {embed_model}")
+    elif built_with != embed_model:
+        raise ValueError(f"Local index in {index_dir} was built with {built_with}, not {embed_model}")
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError("sentence-transformers is required to embed queries") from e
+    model = SentenceTransformer(embed_model)
+    dim = model.get_sentence_embedding_dimension()
+    if dim is not None and dim != index.info["dim"]:
+        raise ValueError(f"{embed_model} embeds in {dim} dimensions, the local index has {index.info['dim']}")
+    index.embed_fn = model.encode
+    return index
+
+
+def get_local_index():
+    """
+    Returns the process-wide LocalVectorIndex from LOCAL_INDEX_DIR, or None if it is not
+    configured or cannot be opened. Queries are embedded with LOCAL_INDEX_EMBED_MODEL.
+    A failure to open it is remembered, so it is not retried on every query.
+    """
+    global _local_index
+    config = LocalIndexConfig.get_config()
+    if not config["index_dir"]:
+        return None
+    with _local_index_lock:
+        if _local_index is None:
+            try:
+                _local_index = open_local_index(config["index_dir"], config["embed_model"], config["nprobe"])
+            except (ImportError, OSError, ValueError) as e:
+                logging.warning(f"Local vector index unavailable: {e}")
+                _local_index = _UNAVAILABLE
+        return None if _local_index is _UNAVAILABLE else _local_index
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import re
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # Only needed to read PDFs; chunk_pages works on any page iterator
+    PdfReader = None
+
+# Numbered ("2.1 Billing", "3. Refunds": at most three levels of one- or two-digit numbers,
+# so years and amounts do not qualify) or upper-case ("REFUND POLICY") headings.
+_HEADING_RE = re.compile(r"^(?:\d{1,2}(?:\.\d{1,2}){0,2}\.?\s+[A-Z].*|[A-Z][A-Z0-9 ,:&'-]{2,})$")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_LIST_ITEM_RE = re.compile(r"^(?:\d{1,2}[.)]?|[-*\u2022])\s")
+
+
+class ChunkingConfig:
+    """
+    Configuration for splitting PDFs into upload-ready parts.
+    """
+    CHUNK_CHARS = int(os.getenv('PDF_CHUNK_CHARS', '2000'))
+    OVERLAP_CHARS = int(os.getenv('PDF_CHUNK_OVERLAP_CHARS', '200'))
+
+    @classmethod
+    def get_config(cls):
+        """
+        Returns a dictionary of chunking parameters.
+        """
+        return {"chunk_chars": cls.CHUNK_CHARS, "overlap_chars": cls.OVERLAP_CHARS}
+
+
+def iter_pdf_pages(path):
+    """
+    Yields (page_number, text) for each page, extracting one page at a time.
+    """
+    if PdfReader is None:
+        raise ImportError("pypdf is required to extract text from PDFs")
+    # An open file is read with seeks; given a path, pypdf would load the whole file.
+    with open(path, "rb") as f:
+        reader = PdfReader(f)
+        for number, page in enumerate(reader.pages, start=1):
+            text = page.extract_text() or ""
+            # The reader caches every parsed object; drop this page's content streams so
+            # memory does not grow with the page count.
+            contents = page.raw_get("/Contents") if "/Contents" in page else None
+            for reference in (contents if isinstance(contents, list) else [contents]):
+                if hasattr(reference, "idnum"):
+                    reader.resolved_objects.pop((reference.generation, reference.idnum), None)
+            yield number, text
+
+
+def is_heading(line):
+    """
+    Heuristic for section headings: short numbered ("2.1 Billing") or upper-case lines.
+    """
+    line = line.strip()
+    return 0 < len(line) <= 80 and not line.endswith((".", ",", ";", ":")) and bool(_HEADING_RE.match(line))
+
+
+def _units(pages):
+    """
+    Yields (page_number, section, paragraph, is_heading) units, tracking the current section
+    heading across pages. Paragraphs are split on blank lines. Only the first line of a
+    paragraph (text extraction often drops the blank line after a heading) can be a heading,
+    and not when the next line continues a list, so numbered steps stay in their paragraph.
+    Headings are yielded as units of their own and stay in the chunk text.
+    """
+    section = None
+    for number, text in pages:
+        for block in _PARAGRAPH_RE.split(text):
+            lines = [line.strip() for line in block.splitlines() if line.strip()]
+            if lines and is_heading(lines[0]) and not (len(lines) > 1 and _LIST_ITEM_RE.match(lines[1])):
+                section = lines.pop(0)
+                yield number, section, section, True
+            if lines:
+                yield number, section, " ".join(lines), False
+
+
+def _split_long(unit, limit):
+    number, section, text, heading = unit
+    if len(text) <= limit:
+        yield unit
+        return
+    words, size = [], 0
+    for word in text.split():
+        if words and size + len(word) + 1 > limit:
+            yield number, section, " ".join(words), heading
+            words, size = [], 0
+        words.append(word)
+        size += len(word) + 1
+    if words:
+        yield number, section, " ".join(words), heading
+
+
+def chunk_pages(pages, chunk_chars=2000, overlap_chars=200):
+    """
+    Splits an iterator of (page_number, text) into overlapping chunks without holding
+    more than one chunk's worth of text.
+
+    Chunks end on paragraph boundaries once they reach chunk_chars (paragraphs longer than
+    that are split on words), but never right after a heading, which stays with the text it
+    introduces; the trailing paragraphs of each chunk, up to overlap_chars, are repeated at
+    the start of the next one.
+
+    Yields:
+        dict: {"text", "page_start", "page_end", "section"} per chunk.
+    """
+    buffer, size, fresh = [], 0, 0
+    for unit in _units(pages):
+        for piece in _split_long(unit, chunk_chars):
+            buffer.append(piece)
+            size += len(piece[2]) + 1
+            fresh += 1
+            if size >= chunk_chars and not piece[3]:
+                yield _make_chunk(buffer)
+                overlap, overlap_size = [], 0
+                for kept in reversed(buffer):
+                    if overlap_size + len(kept[2]) + 1 > overlap_chars:
+                        break
+                    overlap.insert(0, kept)
+                    overlap_size += len(kept[2]) + 1
+                buffer, size, fresh = overlap, overlap_size, 0
+    # Only the overlap of an already emitted chunk left: nothing new to emit.
+    if fresh:
+        yield _make_chunk(buffer)
+
+
+def _make_chunk(units):
+    return {
+        "text": " ".join(unit[2] for unit in units),
+        "page_start": units[0][0],
+        "page_end": units[-1][0],
+        "section": units[-1][1],
+    }
+
+
+def iter_pdf_documents(paths, chunk_chars=None, overlap_chars=None, pages_fn=iter_pdf_pages):
+    """
+    Streams upload-ready documents for upload_data_to_vectara from PDF files, one chunk at
+    a time, so memory use does not grow with the size of the PDFs.
+
+    Args:
+        paths (iterable): PDF file paths.
+        chunk_chars (int, optional): Target chunk size. Defaults to PDF_CHUNK_CHARS.
+        overlap_chars (int, optional): Text repeated between chunks. Defaults to PDF_CHUNK_OVERLAP_CHARS.
+        pages_fn (callable): Yields (page_number, text) for a path.
+
+    Yields:
+        dict: Documents with documentId, title, content and metadataJson (source, part,
+        page range and section).
+    """
+    config = ChunkingConfig.get_config()
+    chunk_chars = config["chunk_chars"] if chunk_chars is None else chunk_chars
+    overlap_chars = config["overlap_chars"] if overlap_chars is None else overlap_chars
+    for path in paths:
+        source = os.path.basename(path)
+        base_id = f"{os.path.splitext(source)[0]}-{hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]}"
+        for part, chunk in enumerate(chunk_pages(pages_fn(path), chunk_chars, overlap_chars)):
+            yield {
+                "documentId": f"{base_id}-{part:05d}",
+                "title": chunk["section"] or source,
+                "content": chunk["text"],
+                "metadataJson": json.dumps({
+                    "source": source,
+                    "part": part,
+                    "page_start": chunk["page_start"],
+                    "page_end": chunk["page_end"],
+                    "section": chunk["section"],
+                }),
+            }
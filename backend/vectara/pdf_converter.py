@@ -1,13 +1,173 @@
+import hashlib
+import json
 import logging
+import os
+import re
+import shutil
+import signal
 import subprocess
-import pdfkit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import pdfkit
+except ImportError:  # Only needed for use_pdfkit=True
+    pdfkit = None
+
+
+class ConversionResult:
+    """
+    Outcome of converting one URL: status is "converted", "cached" or "failed".
+    """
+    def __init__(self, url, filename):
+        self.url = url
+        self.filename = filename
+        self.status = "failed"
+        self.attempts = 0
+        self.seconds = 0.0
+        self.error = None
+
+    def __repr__(self):
+        return f"<ConversionResult({self.url}, status={self.status}, attempts={self.attempts}, seconds={self.seconds:.2f})>"
+
+
+class BatchReport:
+    """
+    Outcome of a batch conversion, with per-URL results in input order.
+    """
+    def __init__(self):
+        self.results = []
+        self.elapsed = 0.0
+
+    def count(self, status):
+        return sum(result.status == status for result in self.results)
+
+    @property
+    def urls_per_second(self):
+        return len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"<BatchReport(converted={self.count('converted')}, cached={self.count('cached')}, "
+                f"failed={self.count('failed')}, elapsed={self.elapsed:.1f}s, "
+                f"urls_per_second={self.urls_per_second:.2f})>")
+
+
+class RenderCache:
+    """
+    Content-addressed on-disk cache of rendered PDFs.
+
+    PDFs are stored once per SHA-256 of the page's HTML under objects/, and index.json
+    maps each URL to its last ETag, Last-Modified and content hash. A page is re-rendered
+    only if the server reports it changed (no 304) and its content hash is new.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.index = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path) as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable render cache index {self.index_path}: {e}")
+
+    def object_path(self, content_hash):
+        return os.path.join(self.objects_dir, f"{content_hash}.pdf")
+
+    def validators(self, url):
+        """
+        Returns the conditional request headers for the URL's cached version.
+        """
+        with self._lock:
+            entry = self.index.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def lookup(self, url, response):
+        """
+        Returns (cached PDF path or None, content hash or None) for a fetch response.
+        """
+        if response.status_code == 304:
+            with self._lock:
+                content_hash = (self.index.get(url) or {}).get("content_hash")
+        else:
+            content_hash = hashlib.sha256(response.content).hexdigest()
+        if content_hash and os.path.exists(self.object_path(content_hash)):
+            return self.object_path(content_hash), content_hash
+        return None, content_hash
+
+    def store(self, url, response, content_hash, pdf_path=None):
+        """
+        Records the URL's validators and, if given, copies the rendered PDF into objects/.
+        """
+        if pdf_path is not None:
+            tmp_path = f"{self.object_path(content_hash)}.{threading.get_ident()}.tmp"
+            shutil.copyfile(pdf_path, tmp_path)
+            os.replace(tmp_path, self.object_path(content_hash))
+        with self._lock:
+            self.index[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_hash": content_hash,
+            }
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_path)
+
+
+WKHTMLTOPDF_OK_RETURN_CODES = {0, 1}
+
+
+def is_pdf(path):
+    """
+    True if path is a non-empty file starting with the PDF header.
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read(5) == b"%PDF-"
+    except OSError:
+        return False
+
+
+def url_filename(url):
+    """
+    Stable, filesystem-safe PDF filename for a URL.
+    """
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", url.split("://", 1)[-1]).strip("-")[:80]
+    return f"{slug}-{hashlib.sha1(url.encode()).hexdigest()[:10]}.pdf"
+
 
 class PDFConverter:
     """
     Helper class for converting web pages to PDF.
     """
-    def __init__(self, use_pdfkit: bool = False):
+    def __init__(self, use_pdfkit: bool = False, wkhtmltopdf_path: str = "wkhtmltopdf", cache_dir: str = None,
+                 max_workers: int = 4, timeout: float = 120, retries: int = 1):
         self.use_pdfkit = use_pdfkit
+        self.wkhtmltopdf_path = wkhtmltopdf_path
+        self.cache = RenderCache(cache_dir) if cache_dir else None
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def from_url(self, url: str, filename: str, title: str = "No Title") -> bool:
         """
@@ -29,9 +189,9 @@ class PDFConverter:
                     options={'load-error-handling': 'ignore'}
                 )
             else:
-                cmd = ["wkhtmltopdf", "--quiet", "--load-error-handling", "ignore", '--title', title, url, filename]
+                cmd = [self.wkhtmltopdf_path, "--quiet", "--load-error-handling", "ignore", '--title', title, url, filename]
                 try:
-                    subprocess.call(cmd, timeout=120)
+                    subprocess.call(cmd, timeout=self.timeout)
                 except subprocess.TimeoutExpired:
                     logging.warning(f"Timeout converting {url} to PDF")
                     return False
@@ -41,4 +201,104 @@ class PDFConverter:
         except Exception as e:
             logging.error(f"Error {e} converting {url} to PDF")
             return False
-        
\ No newline at end of file
+
+    def _render(self, url, filename, title, result):
+        """
+        Runs wkhtmltopdf in its own process group, killing the whole group if it hangs
+        past the timeout and retrying up to self.retries times.
+
+        Each attempt renders to a fresh temporary file that replaces filename only if it
+        looks like a PDF, so a stale file from an earlier run never counts as converted.
+        """
+        tmp_path = f"{filename}.{threading.get_ident()}.tmp.pdf"
+        cmd = [self.wkhtmltopdf_path, "--quiet", "--load-error-handling", "ignore", "--title", title, url, tmp_path]
+        try:
+            for attempt in range(self.retries + 1):
+                result.attempts += 1
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                           start_new_session=True)
+                try:
+                    process.wait(timeout=self.timeout)
+                except subprocess.TimeoutExpired:
+                    os.killpg(process.pid, signal.SIGKILL)
+                    process.wait()
+                    result.error = f"render timed out after {self.timeout}s"
+                    logging.warning(f"Killed hung render of {url} (attempt {attempt + 1})")
+                    continue
+                # wkhtmltopdf exits with 1 on ignored load errors but still writes the PDF.
+                if process.returncode in WKHTMLTOPDF_OK_RETURN_CODES and is_pdf(tmp_path):
+                    os.replace(tmp_path, filename)
+                    result.error = None
+                    return True
+                result.error = f"wkhtmltopdf exited with {process.returncode} and no PDF output"
+            return False
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _convert(self, url, filename, title):
+        result = ConversionResult(url, filename)
+        start = time.monotonic()
+        try:
+            response = content_hash = None
+            if self.cache is not None:
+                try:
+                    response = self.session.get(url, headers=self.cache.validators(url), timeout=(5, 30))
+                    response.raise_for_status()
+                except requests.RequestException as e:
+                    logging.warning(f"Could not fetch {url} for cache validation: {e}")
+                    response = None
+            if response is not None:
+                cached_path, content_hash = self.cache.lookup(url, response)
+                if cached_path is not None:
+                    shutil.copyfile(cached_path, filename)
+                    if response.status_code != 304:
+                        self.cache.store(url, response, content_hash)
+                    result.status = "cached"
+                    return result
+            if self._render(url, filename, title, result):
+                result.status = "converted"
+                if response is not None and content_hash is not None:
+                    self.cache.store(url, response, content_hash, filename)
+            return result
+        except Exception as e:
+            result.error = str(e)
+            return result
+        finally:
+            result.seconds = time.monotonic() - start
+            if result.status == "failed":
+                logging.error(f"Error {result.error} converting {url} to PDF")
+
+    def convert_batch(self, urls, output_dir: str, titles: dict = None) -> BatchReport:
+        """
+        Convert many webpages to PDF with at most max_workers renders running at once.
+
+        Args:
+            urls (iterable): The URLs to convert.
+            output_dir (str): Directory for the PDFs (named by url_filename).
+            titles (dict, optional): PDF titles by URL.
+
+        Returns:
+            BatchReport: Per-URL status, attempts and timings, in input order.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        titles = titles or {}
+        report = BatchReport()
+        start = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(self._convert, url, os.path.join(output_dir, url_filename(url)),
+                                    titles.get(url, "No Title"))
+                    for url in urls
+                ]
+                for future in futures:
+                    report.results.append(future.result())
+        finally:
+            report.elapsed = time.monotonic() - start
+            if self.cache is not None:
+                self.cache.save()
+        logging.info(f"PDF batch conversion finished: {report}")
+        return report
@@ -0,0 +1,240 @@
+import bisect
+import json
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class VectaraError(Exception):
+    """
+    Raised when a Vectara request fails after all retries.
+    """
+
+
+class CircuitOpenError(VectaraError):
+    """
+    Raised without calling Vectara while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and fails fast for reset_timeout
+    seconds, then lets a single trial request through (half-open) to probe recovery.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram (milliseconds) with approximate percentiles.
+    """
+    BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 75, 100, 150, 250, 500, 750, 1000, 2500, 5000, 10000, 30000, float("inf"))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * len(self.BUCKETS_MS)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.total += 1
+            self.sum_ms += ms
+
+    def percentile(self, p):
+        """
+        Returns the upper bound of the bucket containing the p-th percentile.
+        """
+        with self._lock:
+            if not self.total:
+                return 0.0
+            rank = p / 100 * self.total
+            seen = 0
+            for bound, count in zip(self.BUCKETS_MS, self.counts):
+                seen += count
+                if seen >= rank:
+                    return bound
+            return self.BUCKETS_MS[-1]
+
+    def snapshot(self):
+        return {
+            "count": self.total,
+            "mean_ms": self.sum_ms / self.total if self.total else 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+        }
+
+
+class VectaraClient:
+    """
+    Long-lived Vectara client that owns a keep-alive connection pool.
+
+    Config and headers are built once. Queries use separate
+    connect/read timeouts, are retried with jittered exponential backoff on connection
+    errors, timeouts and 429/5xx, and go through a circuit breaker that fails fast while
+    the backend is unhealthy.
+    """
+    def __init__(self, api_key, customer_id, corpus_id, api_url="https://api.vectara.io", connect_timeout=3.05,
+                 read_timeout=30.0, max_retries=2, backoff=0.2, pool_maxsize=32, failure_threshold=5,
+                 reset_timeout=30.0):
+        self.api_url = api_url
+        self.customer_id = customer_id
+        self.corpus_id = corpus_id
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.histograms = {}
+        self._histograms_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "x-api-key": api_key,
+            "customer-id": str(customer_id),
+            "Content-Type": "application/json",
+        })
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """
+        Creates a VectaraClient from the VECTARA_* environment variables.
+        """
+        return cls(
+            api_key=os.environ['VECTARA_API_KEY'],
+            customer_id=os.environ['VECTARA_CUSTOMER_ID'],
+            corpus_id=os.environ['VECTARA_CORPUS_ID'],
+            api_url=os.environ.get('VECTARA_API_URL', 'https://api.vectara.io'),
+            **kwargs
+        )
+
+    def _histogram(self, endpoint):
+        with self._histograms_lock:
+            histogram = self.histograms.get(endpoint)
+            if histogram is None:
+                histogram = self.histograms[endpoint] = LatencyHistogram()
+            return histogram
+
+    def post(self, endpoint, payload):
+        """
+        POSTs an idempotent request to the endpoint and returns the decoded JSON body.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Vectara circuit is open, not calling {endpoint}")
+        body = json.dumps(payload)
+        histogram = self._histogram(endpoint)
+        error = None
+        recorded = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                start = time.perf_counter()
+                try:
+                    response = self.session.post(f"{self.api_url}{endpoint}", data=body, timeout=self.timeout)
+                    histogram.observe(time.perf_counter() - start)
+                    if response.status_code == 200:
+                        recorded = True
+                        self.breaker.record_success()
+                        return response.json()
+                    error = VectaraError(f"HTTP {response.status_code}: {response.text[:200]}")
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        # The request itself is wrong, the backend is fine.
+                        recorded = True
+                        self.breaker.record_success()
+                        raise error
+                except requests.RequestException as e:
+                    histogram.observe(time.perf_counter() - start)
+                    error = VectaraError(str(e))
+                if attempt < self.max_retries:
+                    time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            raise error
+        finally:
+            # Any other outcome counts as a failure, which also ends a half-open trial.
+            if not recorded:
+                self.breaker.record_failure()
+
+    def query(self, query, corpus_id=None, page_size=10):
+        """
+        Queries a corpus (the client's default unless given) and returns the results.
+        """
+        payload = {
+            "customerId": self.customer_id,
+            "corpusId": corpus_id if corpus_id is not None else self.corpus_id,
+            "query": query,
+            "page": 1,
+            "pageSize": page_size
+        }
+        return self.post("/v1/query", payload)['results']
+
+    def metrics(self):
+        """
+        Returns latency histograms per endpoint and the circuit breaker state.
+        """
+        with self._histograms_lock:
+            histograms = dict(self.histograms)
+        return {
+            "circuit": self.breaker.state,
+            "endpoints": {endpoint: histogram.snapshot() for endpoint, histogram in histograms.items()},
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_vectara_client():
+    """
+    Returns the process-wide VectaraClient, created from the environment on first use.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = VectaraClient.from_env()
+        return _client
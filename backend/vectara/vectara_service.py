@@ -1,32 +1,35 @@
-import requests
-import json
+import logging
 import os
+from response_cache import get_response_cache
+from vectara.bulk_indexer import BulkIndexer
+from vectara.local_index import get_local_index
+from vectara.pdf_chunker import iter_pdf_documents
+from vectara.vectara_client import VectaraError, get_vectara_client
 
-def upload_data_to_vectara(document_list):
+def upload_data_to_vectara(document_list, max_workers=8, checkpoint_path=None):
     """
     Uploads data to Vectara for indexing.
-    Each document in the list is expected to be a dict with necessary fields.
+    Each document in the list (or any iterable) is expected to be a dict with necessary fields.
+    Uploads run concurrently with retries; see BulkIndexer. Returns the IndexReport.
     """
-    api_endpoint = "https://api.vectara.io/v1/index"
-    headers = {
-        "x-api-key": os.environ['VECTARA_API_KEY'],
-        "customer-id": os.environ['VECTARA_CUSTOMER_ID'],
-        "Content-Type": "application/json",
-    }
+    indexer = BulkIndexer.from_env(max_workers=max_workers, checkpoint_path=checkpoint_path)
+    # Failed documents are logged by the indexer and listed in report.failed
+    report = indexer.index(document_list)
 
-    session = requests.Session()
-    for document in document_list:
-        payload = {
-            "customerId": os.environ['VECTARA_CUSTOMER_ID'],
-            "corpusId": os.environ['VECTARA_CORPUS_ID'],
-            "document": document
-        }
+    # Cached answers may be stale once the corpus content changed
+    response_cache = get_response_cache()
+    if report.succeeded and response_cache is not None:
+        response_cache.invalidate(os.environ['VECTARA_CORPUS_ID'])
+    return report
 
-        response = session.post(api_endpoint, headers=headers, data=json.dumps(payload), timeout=250, verify=True)
-        if response.status_code != 200:
-            print(f"Error uploading document ID {document['documentId']}: {response.text}")
-        else:
-            print(f"Document ID {document['documentId']} uploaded successfully.")
+def upload_pdfs_to_vectara(pdf_paths, max_workers=8, checkpoint_path=None):
+    """
+    Uploads PDFs (e.g. produced by PDFConverter) to Vectara as overlapping page-range chunks.
+    Pages are extracted and chunked lazily while the indexer uploads, so memory stays flat
+    regardless of PDF size. Returns the IndexReport.
+    """
+    return upload_data_to_vectara(iter_pdf_documents(pdf_paths), max_workers=max_workers,
+                                  checkpoint_path=checkpoint_path)
 
 def index_documents_vectara():
     """
@@ -48,28 +51,24 @@ def index_documents_vectara():
 def query_vectara(query):
     """
     Queries Vectara with the provided query string and returns the results.
+    Uses the shared, pooled VectaraClient. If the query fails, or the client cannot be
+    created because VECTARA_* credentials are missing, falls back to the local vector
+    index when LOCAL_INDEX_DIR is configured, otherwise returns an empty list.
     """
-    api_endpoint = f"https://api.vectara.io/v1/query"
-    headers = {
-        "x-api-key": os.environ['VECTARA_API_KEY'],
-        "customer-id": os.environ['VECTARA_CUSTOMER_ID'],
-        "Content-Type": "application/json",
-    }
-
-    payload = {
-        "customerId": os.environ['VECTARA_CUSTOMER_ID'],
-        "corpusId": os.environ['VECTARA_CORPUS_ID'],
-        "query": query,
-        "page": 1,
-        "pageSize": 10
-    }
-
-    response = requests.post(api_endpoint, headers=headers, data=json.dumps(payload), timeout=250, verify=True)
-    if response.status_code == 200:
-        return response.json()['results']
-    else:
-        print(f"Error querying Vectara: {response.text}")
+    try:
+        client = get_vectara_client()
+    except KeyError as e:
+        logging.warning(f"Vectara is not configured, missing environment variable {e}")
+        client = None
+    if client is not None:
+        try:
+            return client.query(query)
+        except VectaraError as e:
+            logging.warning(f"Error querying Vectara: {e}")
+    local_index = get_local_index()
+    if local_index is None:
         return []
+    return local_index.query(query)
 
 # Example usage of the indexing function
 # index_documents_vectara()